@@ -0,0 +1,151 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+# Analytic block and bit error probabilities of a code, every function is vectorized over an array of error probabilities
+
+import numpy as np
+from scipy.stats import binom, norm
+
+
+
+def _weights(code, ndim):
+    """
+    Non-zero weights w of the code and their multiplicities A_w, as columns broadcasting against an ndim-dimensional array
+    """
+    A = np.array(code.weight_distribution, dtype=np.float64)
+    w = np.flatnonzero(A)[1:]
+    shape = (-1,) + (1,) * ndim
+    return w.reshape(shape), A[w].reshape(shape)
+
+
+def block_error_bdd(n, t, p):
+    """
+    Exact block error probability of a bounded distance decoder on the BSC, the block fails when more than t bits are flipped
+
+        @type  n: int
+        @param n: code length
+
+        @type  t: int
+        @param t: number of correctable errors
+
+        @type  p: float or ndarray
+        @param p: error probability of the BSC
+
+        @rtype:   ndarray
+        @return:  block error probability for every p
+    """
+    return binom.sf(t, n, np.asarray(p, dtype=np.float64))
+
+
+def bit_error_bdd(n, t, p):
+    """
+    Approximate message bit error probability of a bounded distance decoder on the BSC.
+    A block with i > t errors leaves at most i + t wrong bits, spread evenly over the codeword.
+
+        @type  n: int
+        @param n: code length
+
+        @type  t: int
+        @param t: number of correctable errors
+
+        @type  p: float or ndarray
+        @param p: error probability of the BSC
+
+        @rtype:   ndarray
+        @return:  bit error probability for every p
+    """
+    p = np.asarray(p, dtype=np.float64)
+    i = np.arange(t + 1, n + 1).reshape((-1,) + (1,) * p.ndim)
+    return np.sum(np.minimum(i + t, n) / n * binom.pmf(i, n, p), axis=0)
+
+
+def pairwise_error_bsc(w, p):
+    """
+    Probability that a hard-decision ML decoder on the BSC prefers a codeword at distance w over the sent one, ties broken at random
+
+        @type  w: ndarray
+        @param w: distances
+
+        @type  p: ndarray
+        @param p: error probability of the BSC, broadcast against w
+
+        @rtype:   ndarray
+        @return:  pairwise error probability
+    """
+    w = np.asarray(w)
+    tie = np.where(w % 2 == 0, 0.5 * binom.pmf(w // 2, w, p), 0.0)
+    return binom.sf(w // 2, w, p) + tie
+
+
+def union_bound(code, p):
+    """
+    Union bound of the block error probability of ML decoding on the BSC, from the weight distribution
+
+        @type  code: Linear_Code
+        @param code: Linear_Code, Cyclic_Code or BCH_Code
+
+        @type  p: float or ndarray
+        @param p: error probability of the BSC
+
+        @rtype:   ndarray
+        @return:  upper bound of the block error probability for every p
+    """
+    p = np.asarray(p, dtype=np.float64)
+    w, A = _weights(code, p.ndim)
+    return np.minimum(np.sum(A * pairwise_error_bsc(w, p), axis=0), 1.0)
+
+
+def bhattacharyya_bound(code, p):
+    """
+    Bhattacharyya (Chernoff) union bound of the block error probability of ML decoding on the BSC, sum of A_w * (2 sqrt(p(1-p)))^w
+
+        @type  code: Linear_Code
+        @param code: Linear_Code, Cyclic_Code or BCH_Code
+
+        @type  p: float or ndarray
+        @param p: error probability of the BSC
+
+        @rtype:   ndarray
+        @return:  upper bound of the block error probability for every p
+    """
+    p = np.asarray(p, dtype=np.float64)
+    w, A = _weights(code, p.ndim)
+    return np.minimum(np.sum(A * (2 * np.sqrt(p * (1 - p))) ** w, axis=0), 1.0)
+
+
+def union_bound_awgn(code, ebn0_db):
+    """
+    Union bound of the block error probability of soft-decision ML decoding with BPSK on the AWGN channel, sum of A_w * Q(sqrt(2 w R Eb/N0))
+
+        @type  code: Linear_Code
+        @param code: Linear_Code, Cyclic_Code or BCH_Code
+
+        @type  ebn0_db: float or ndarray
+        @param ebn0_db: Eb/N0 per message bit, in dB
+
+        @rtype:   ndarray
+        @return:  upper bound of the block error probability for every Eb/N0
+    """
+    ebn0 = 10 ** (np.asarray(ebn0_db, dtype=np.float64) / 10)
+    w, A = _weights(code, ebn0.ndim)
+    rate = code.k / code.n
+    return np.minimum(np.sum(A * norm.sf(np.sqrt(2 * w * rate * ebn0)), axis=0), 1.0)
+
+
+def estimate(code, p):
+    """
+    All BSC estimates of a code for every p, in one call
+
+        @type  code: Linear_Code
+        @param code: Linear_Code, Cyclic_Code or BCH_Code
+
+        @type  p: float or ndarray
+        @param p: error probability of the BSC
+
+        @rtype:   dict
+        @return:  fer_bdd, ber_bdd, fer_union, fer_bhattacharyya
+    """
+    return {
+        'fer_bdd': block_error_bdd(code.n, code.nECC, p),
+        'ber_bdd': bit_error_bdd(code.n, code.nECC, p),
+        'fer_union': union_bound(code, p),
+        'fer_bhattacharyya': bhattacharyya_bound(code, p),
+    }
@@ -0,0 +1,140 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+# Toolbox for bit-packed codewords, bit i of a codeword is bit (i % 64) of word (i // 64)
+
+import numpy as np
+
+# Number of codewords packed or unpacked at once, bounds the size of the temporary one-bit-per-byte arrays
+CHUNK_ROWS = 1 << 16
+
+
+
+def num_words(n):
+    """
+    Number of uint64 words needed to hold n bits
+
+        @type  n: int
+        @param n: number of bits
+
+        @rtype:   int
+        @return:  number of words
+    """
+    return (n + 63) // 64
+
+
+def pack_bits(bits, n):
+    """
+    Pack a bit stream into uint64 words, one row of words per n bits
+
+        @type  bits: ndarray
+        @param bits: bit stream, length divisible by n
+
+        @type  n: int
+        @param n: number of bits per row
+
+        @rtype:   ndarray
+        @return:  (len(bits) // n, num_words(n)) packed array
+    """
+    rows = bits.reshape(-1, n)
+    packed = np.empty((rows.shape[0], num_words(n)), dtype='<u8')
+    for start in range(0, rows.shape[0], CHUNK_ROWS):
+        chunk = rows[start:start + CHUNK_ROWS]
+        # Pad every row to a whole number of words, then pack LSB first
+        padded = np.zeros((chunk.shape[0], packed.shape[1] * 64), dtype=np.uint8)
+        padded[:, :n] = chunk
+        packed[start:start + CHUNK_ROWS] = np.packbits(padded, axis=1, bitorder='little').view('<u8')
+    return packed
+
+
+def unpack_bits(packed, n):
+    """
+    Unpack uint64 words back into a bit stream, n bits per row
+
+        @type  packed: ndarray
+        @param packed: packed array, one row per codeword
+
+        @type  n: int
+        @param n: number of bits per row
+
+        @rtype:   ndarray
+        @return:  bit stream
+    """
+    packed = np.ascontiguousarray(packed, dtype='<u8')
+    bits = np.empty((packed.shape[0], n), dtype=np.uint8)
+    for start in range(0, packed.shape[0], CHUNK_ROWS):
+        chunk = packed[start:start + CHUNK_ROWS].view(np.uint8)
+        bits[start:start + CHUNK_ROWS] = np.unpackbits(chunk, axis=1, count=n, bitorder='little')
+    return bits.flatten()
+
+
+def pack_rows(matrix):
+    """
+    Pack every row of a binary matrix (e.g. the generator matrix) into uint64 words
+
+        @type  matrix: ndarray
+        @param matrix: binary matrix
+
+        @rtype:   ndarray
+        @return:  packed matrix
+    """
+    return pack_bits(np.ascontiguousarray(matrix, dtype=np.uint8), matrix.shape[1])
+
+
+def popcount(x):
+    """
+    Count the set bits of every element of a uint64 array
+
+        @type  x: ndarray
+        @param x: uint64 array
+
+        @rtype:   ndarray
+        @return:  number of set bits
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x)
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+def parity(x):
+    """
+    Parity (XOR of all bits) of every element of a uint64 array
+
+        @type  x: ndarray
+        @param x: uint64 array
+
+        @rtype:   ndarray
+        @return:  0 or 1 per element
+    """
+    return (popcount(x) & 1).astype(np.uint8)
+
+
+def extract_bits(packed, start, length):
+    """
+    Extract the bit field [start, start + length) of every packed row
+
+        @type  packed: ndarray
+        @param packed: packed array, one row per codeword
+
+        @type  start: int
+        @param start: first bit of the field
+
+        @type  length: int
+        @param length: number of bits in the field
+
+        @rtype:   ndarray
+        @return:  packed field, (rows, num_words(length))
+    """
+    field = np.zeros((packed.shape[0], num_words(length)), dtype=np.uint64)
+    for word in range(field.shape[1]):
+        offset = start + 64 * word
+        src, shift = divmod(offset, 64)
+        field[:, word] = packed[:, src] >> np.uint64(shift)
+        if shift and src + 1 < packed.shape[1]:
+            field[:, word] |= packed[:, src + 1] << np.uint64(64 - shift)
+
+    # Clear the bits beyond the field
+    if length % 64:
+        field[:, -1] &= np.uint64((1 << (length % 64)) - 1)
+    return field
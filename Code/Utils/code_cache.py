@@ -0,0 +1,225 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import contextlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# File locking is OS specific, fcntl on POSIX and msvcrt on Windows
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+from Utils import polyTools as pt
+
+# Create a logger in this module
+logger = logging.getLogger(__name__)
+
+# Bump when the stored entries change meaning, old cache files are then ignored
+CACHE_VERSION = 1
+
+# Entries already read in this process
+_memory = {}
+
+
+
+def cache_path():
+    """
+    Path of the cache file, under $EEC269A_CACHE_DIR, $XDG_CACHE_HOME/eec269a or ~/.cache/eec269a
+
+        @rtype:   string
+        @return:  cache file path
+    """
+    directory = os.environ.get('EEC269A_CACHE_DIR')
+    if not directory:
+        base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+        directory = os.path.join(base, 'eec269a')
+    return os.path.join(directory, f'cyclic-codes-v{CACHE_VERSION}.json')
+
+
+def writes_enabled():
+    """
+    Whether store() writes the cache file, $EEC269A_CACHE_WRITE=0 keeps every entry in memory only
+
+        @rtype:   bool
+        @return:  cache file writes enabled
+    """
+    return os.environ.get('EEC269A_CACHE_WRITE', '1') != '0'
+
+
+def _key(n, k, nECC):
+    return f'{n},{k},{nECC}'
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """
+    Hold an exclusive lock on the lock file next to the cache file, blocks until other processes release it
+    """
+    with open(path + '.lock', 'a+') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read():
+    """
+    Read every entry of the cache file, an unreadable or missing file is an empty cache
+    """
+    try:
+        with open(cache_path(), 'r') as file:
+            content = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if content.get('version') != CACHE_VERSION:
+        return {}
+    return content.get('codes', {})
+
+
+def load(n, k, nECC):
+    """
+    Look up a cyclic code in the cache
+
+        @type  n, k: int
+        @param n, k: code length and information length of the code
+
+        @type  nECC: int or None
+        @param nECC: number of correctable errors requested from polyTools.findMatrix
+
+        @rtype:   dict or None
+        @return:  genPoly, G_dec, HT_dec, d_min and nECC of the code, None if not cached
+    """
+    key = _key(n, k, nECC)
+    if key not in _memory:
+        _memory.update(_read())
+    return _memory.get(key)
+
+
+def store(n, k, nECC, entry, write=True):
+    """
+    Add a cyclic code to the cache file, the file is replaced atomically so concurrent readers never see a partial file,
+    and writers hold a lock from reading the file to replacing it so concurrent writers do not drop each other's entries
+
+        @type  n, k: int
+        @param n, k: code length and information length of the code
+
+        @type  nECC: int or None
+        @param nECC: number of correctable errors requested from polyTools.findMatrix
+
+        @type  entry: dict
+        @param entry: entry built by build()
+
+        @type  write: bool
+        @param write: write the cache file, otherwise (or when writes_enabled() is false) the entry is only kept in this process
+    """
+    _memory[_key(n, k, nECC)] = entry
+    if not write or not writes_enabled():
+        return
+    path = cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _locked(path):
+            codes = _read()
+            codes[_key(n, k, nECC)] = entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as file:
+                    json.dump({'version': CACHE_VERSION, 'codes': codes}, file)
+                os.replace(tmp_path, path)
+            except BaseException:
+                # Do not leave the partial temporary file behind
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+                raise
+    except OSError as error:
+        logger.warning('Cannot write code cache %s: %s', path, error)
+
+
+def build(n, k, nECC):
+    """
+    Search the generator of a cyclic code with polyTools.findMatrix and derive the cached parameters
+
+        @type  n, k: int
+        @param n, k: code length and information length of the code
+
+        @type  nECC: int or None
+        @param nECC: number of correctable errors the code must have, None for the best possible code
+
+        @rtype:   dict
+        @return:  genPoly, G_dec, HT_dec, d_min and nECC of the code
+    """
+    G_dec = pt.findMatrix(n, k, nECC)
+    if G_dec is None:
+        raise ValueError(f"No ({n}, {k}) cyclic code corrects {nECC} errors")
+    d_min = pt.minimumDistance(n, k, G_dec)
+    return {
+        'genPoly': pt.bitRev(G_dec[0], n-1),
+        'G_dec': G_dec,
+        'HT_dec': pt.buildParityMatrix(n, k, G_dec),
+        'd_min': d_min,
+        'nECC': (d_min - 1) // 2,
+    }
+
+
+def get(n, k, nECC, write=True):
+    """
+    Look up a cyclic code in the cache, build and store it on a miss
+
+        @type  n, k: int
+        @param n, k: code length and information length of the code
+
+        @type  nECC: int or None
+        @param nECC: number of correctable errors requested from polyTools.findMatrix
+
+        @type  write: bool
+        @param write: write a code built on a miss to the cache file
+
+        @rtype:   dict
+        @return:  genPoly, G_dec, HT_dec, d_min and nECC of the code
+    """
+    entry = load(n, k, nECC)
+    if entry is None:
+        entry = build(n, k, nECC)
+        store(n, k, nECC, entry, write)
+    return entry
+
+
+def prewarm(codes, processes=None):
+    """
+    Build and store every code that is not cached yet, in parallel
+
+        @type  codes: list
+        @param codes: (n, k, nECC) tuples
+
+        @type  processes: int
+        @param processes: number of worker processes (default: number of CPUs)
+    """
+    missing = [code for code in codes if load(*code) is None]
+    if not missing:
+        return
+    with ProcessPoolExecutor(processes) as executor:
+        for code, entry in zip(missing, executor.map(build, *zip(*missing))):
+            logger.info('Cached (%d, %d) cyclic code, d_min = %d', code[0], code[1], entry['d_min'])
+            store(*code, entry)
+
+
+
+if __name__ == '__main__':
+    # Pre-warm the codes used by cyclic-code.py and demo.py, run from Code/ with: python -m Utils.code_cache
+    prewarm([(3, 1, None), (7, 4, None), (15, 11, None), (31, 26, None), (63, 57, None),
+             (15, 7, None), (15, 5, None), (31, 21, None), (31, 16, None), (31, 11, None), (31, 6, None)])
+    print(cache_path())
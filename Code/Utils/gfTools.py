@@ -0,0 +1,138 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+# Toolbox for the Galois field GF(2^m) and minimal polynomials
+
+import numpy as np
+import logging
+
+from Utils import polyTools as pt
+
+# Create a logger in this module
+logger = logging.getLogger(__name__)
+
+
+# primitive polynomial of GF(2^m) in integer form, lowest order coeff as the LSB
+PRIMITIVE_POLYS = {
+	2: 0b111,
+	3: 0b1011,
+	4: 0b10011,
+	5: 0b100101,
+	6: 0b1000011,
+	7: 0b10001001,
+	8: 0b100011101,
+	9: 0b1000010001,
+	10: 0b10000001001,
+	11: 0b100000000101,
+	12: 0b1000001010011,
+	13: 0b10000000011011,
+	14: 0b100010001000011,
+	15: 0b1000000000000011,
+	16: 0b10001000000001011,
+}
+
+
+class Galois_Field:
+	"""
+	GF(2^m) with log/antilog tables, every operation works elementwise on ndarrays
+	"""
+	def __init__(self, m):
+		if m not in PRIMITIVE_POLYS:
+			raise ValueError(f"No primitive polynomial for GF(2^{m})")
+		self.m = m
+		self.order = (1 << m) - 1
+		self.prim_poly = PRIMITIVE_POLYS[m]
+
+		# antilog table, doubled so the sum of two logs never needs a modulo
+		self.exp = np.zeros(2 * self.order, dtype=np.int64)
+		self.log = np.zeros(1 << m, dtype=np.int64)
+		element = 1
+		for i in range(self.order):
+			self.exp[i] = element
+			self.log[element] = i
+			element <<= 1
+			if element >> m:
+				element ^= self.prim_poly
+		if element != 1:
+			raise ValueError(f"{self.prim_poly:b} is not primitive")
+		self.exp[self.order:] = self.exp[:self.order]
+
+
+	def mul(self, a, b):
+		"""
+		Multiply two arrays of field elements
+
+			@type  a, b: ndarray
+			@param a, b: field elements
+
+			@rtype:   ndarray
+			@return:  a * b
+		"""
+		a, b = np.asarray(a), np.asarray(b)
+		return np.where((a != 0) & (b != 0), self.exp[self.log[a] + self.log[b]], 0)
+
+
+	def div(self, a, b):
+		"""
+		Divide two arrays of field elements, b must be non-zero
+
+			@type  a, b: ndarray
+			@param a, b: field elements
+
+			@rtype:   ndarray
+			@return:  a / b
+		"""
+		a, b = np.asarray(a), np.asarray(b)
+		return np.where(a != 0, self.exp[(self.log[a] - self.log[b]) % self.order], 0)
+
+
+	def power(self, exponent):
+		"""
+		Powers of the primitive element alpha
+
+			@type  exponent: ndarray
+			@param exponent: integer exponents, may be negative
+
+			@rtype:   ndarray
+			@return:  alpha^exponent
+		"""
+		return self.exp[np.asarray(exponent) % self.order]
+
+
+# find the cyclotomic cosets of 2 modulo n, each coset sorted, cosets sorted by their smallest element
+def cyclotomicCosets(n):
+	cosets = []
+	seen = set()
+	for start in range(n):
+		if start in seen:
+			continue
+		coset = []
+		c = start
+		while c not in coset:
+			coset.append(c)
+			c = (c * 2) % n
+		seen.update(coset)
+		cosets.append(sorted(coset))
+	return cosets
+
+# find the minimal polynomial over GF(2) of the roots beta^c, c in coset, where beta = alpha^step
+# returns the polynomial in integer form, lowest order coeff as the LSB
+def minimalPolynomial(field, coset, step = 1):
+	# coefficients in GF(2^m), lowest order first
+	coeffs = np.array([1], dtype=np.int64)
+	for c in coset:
+		root = field.power(step * c)
+		# multiply by (x + root)
+		coeffs = np.concatenate(([0], coeffs)) ^ np.concatenate((field.mul(coeffs, root), [0]))
+	if np.any(coeffs > 1):
+		raise ValueError(f"coset {coset} does not give a binary polynomial")
+	return int(''.join(str(int(c)) for c in coeffs[::-1]), 2)
+
+# build the generator polynomial of the narrow-sense binary BCH code of length n = 2^m - 1 designed to correct t errors
+# the product of the minimal polynomials of alpha^1, ..., alpha^2t
+def bchGenerator(field, t):
+	n = field.order
+	genPoly = 1
+	for coset in cyclotomicCosets(n):
+		if any(1 <= c <= 2 * t for c in coset):
+			genPoly = pt.polyMul(genPoly, minimalPolynomial(field, coset))
+	logger.debug('BCH generator = %s', f'{genPoly:b}')
+	return genPoly
@@ -0,0 +1,185 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+# Opt-in per-stage timing, throughput and allocation instrumentation, every call is a no-op until enable()
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Create a logger in this module
+logger = logging.getLogger(__name__)
+
+# The run being recorded, None when instrumentation is disabled
+_run = None
+
+
+
+class Stage:
+    """
+    One timed execution of a pipeline stage
+    """
+    def __init__(self, name, bits=None):
+        self.name = name
+        # Number of bits processed, may be set inside the with block when it is only known afterwards
+        self.bits = bits
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.allocated_bytes = 0
+        # Highest traced memory seen by the stages nested in this one
+        self.nested_peak = 0
+
+
+class Run:
+    """
+    Stages and counters recorded between enable() and disable()
+    """
+    def __init__(self, name):
+        self.name = name
+        self.stages = []
+        self.counters = {}
+        self.active = []
+        # Highest traced memory seen by any stage, the stages reset the tracemalloc peak
+        self.peak = 0
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+
+def enable(name='run'):
+    """
+    Start recording a run, replacing the previous one
+
+        @type  name: string
+        @param name: name of the run in the report
+    """
+    global _run
+    disable()
+    _run = Run(name)
+
+
+def disable():
+    """
+    Stop recording, the report of the run is discarded
+    """
+    global _run
+    if _run is not None and _run.started_tracing:
+        tracemalloc.stop()
+    _run = None
+
+
+def enabled():
+    """
+    Whether a run is being recorded, lets callers skip the work of computing a counter
+
+        @rtype:   bool
+        @return:  True when enabled
+    """
+    return _run is not None
+
+
+@contextmanager
+def stage(name, bits=None):
+    """
+    Record the wall time, CPU time and peak allocated bytes of the with block as one execution of stage name
+
+        @type  name: string
+        @param name: stage name, e.g. 'encoder_systematic'
+
+        @type  bits: int
+        @param bits: number of bits processed, None if set later through the yielded Stage
+
+        @rtype:   Stage
+        @return:  the record of this execution
+    """
+    record = Stage(name, bits)
+    if _run is None:
+        yield record
+        return
+
+    run = _run
+    run.active.append(record)
+    start_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall = time.perf_counter() - wall_start
+        record.cpu = time.process_time() - cpu_start
+        peak = max(tracemalloc.get_traced_memory()[1], record.nested_peak)
+        record.allocated_bytes = max(peak - start_memory, 0)
+        run.active.pop()
+        run.peak = max(run.peak, peak)
+        # An enclosing stage must not lose the peak reset by this one
+        if run.active:
+            run.active[-1].nested_peak = max(run.active[-1].nested_peak, peak)
+        run.stages.append(record)
+
+
+def count(name, value=1):
+    """
+    Add value to the counter name, e.g. 'corrector_trapping.corrected_words'
+
+        @type  name: string
+        @param name: counter name
+
+        @type  value: int
+        @param value: amount to add
+    """
+    if _run is not None:
+        _run.counters[name] = _run.counters.get(name, 0) + int(value)
+
+
+def report():
+    """
+    Summary of the run: totals, every stage aggregated over its executions, and the counters
+
+        @rtype:   dict
+        @return:  run, stages and counters, None when disabled
+    """
+    if _run is None:
+        return None
+
+    stages = {}
+    for record in _run.stages:
+        summary = stages.setdefault(record.name, {'name': record.name, 'calls': 0, 'wall_seconds': 0.0,
+                                                  'cpu_seconds': 0.0, 'bits': 0, 'allocated_bytes': 0})
+        summary['calls'] += 1
+        summary['wall_seconds'] += record.wall
+        summary['cpu_seconds'] += record.cpu
+        summary['bits'] += record.bits or 0
+        summary['allocated_bytes'] = max(summary['allocated_bytes'], record.allocated_bytes)
+    for summary in stages.values():
+        summary['mbps'] = summary['bits'] / summary['wall_seconds'] / 1e6 if summary['bits'] and summary['wall_seconds'] else None
+
+    return {
+        'run': {
+            'name': _run.name,
+            'wall_seconds': time.perf_counter() - _run.wall_start,
+            'cpu_seconds': time.process_time() - _run.cpu_start,
+            'peak_traced_bytes': max(_run.peak, tracemalloc.get_traced_memory()[1]),
+        },
+        'stages': list(stages.values()),
+        'counters': dict(_run.counters),
+    }
+
+
+def write_json(dest_path):
+    """
+    Write the report of the run as JSON
+
+        @type  dest_path: string
+        @param dest_path: destination file path, with extension
+    """
+    content = report()
+    if content is None:
+        return
+    os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+    with open(dest_path, 'w') as file:
+        json.dump(content, file, indent=1)
+    logger.info("Profile written to %s", dest_path)
@@ -0,0 +1,76 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+# Batched GF(2) polynomial arithmetic, every function works elementwise on uint64 arrays of packed polynomials
+# (lowest order coeff as the LSB, degree at most 63)
+
+import numpy as np
+
+from Utils import bitpack as bp
+
+
+# bit-reversed value of every byte
+REVERSE_BYTE = np.array([int(f'{i:08b}'[::-1], 2) for i in range(256)], dtype=np.uint8)
+
+
+def _asarray(a):
+	return np.asarray(a, dtype=np.uint64)
+
+# degree of every polynomial, the degree of 0 is 0 (like polyTools.order)
+def degree(a):
+	x = _asarray(a).copy()
+	result = np.zeros(x.shape, dtype=np.int64)
+	for shift in (32, 16, 8, 4, 2, 1):
+		high = x >> np.uint64(shift)
+		nonzero = high != 0
+		result[nonzero] += shift
+		x = np.where(nonzero, high, x)
+	return result
+
+# hamming weight of every polynomial
+def popcount(a):
+	return bp.popcount(_asarray(a)).astype(np.int64)
+
+# reverse the order of the lowest order+1 bits of every polynomial, through a byte table
+def bitRev(a, order):
+	a = np.ascontiguousarray(_asarray(a), dtype='<u8')
+	reversed_bytes = REVERSE_BYTE[a.view(np.uint8).reshape(a.shape + (8,))][..., ::-1]
+	full = np.ascontiguousarray(reversed_bytes).view('<u8').reshape(a.shape)
+	return full >> (np.uint64(63) - _asarray(order))
+
+# carry-less product of every pair of polynomials, the product must have degree at most 63
+def clmul(a, b):
+	a, b = np.broadcast_arrays(_asarray(a), _asarray(b))
+	result = np.zeros(a.shape, dtype=np.uint64)
+	for i in range(int(degree(b).max(initial=0)) + 1):
+		take = ((b >> np.uint64(i)) & np.uint64(1)).astype(bool)
+		result ^= np.where(take, a << np.uint64(i), np.uint64(0))
+	return result
+
+# long division of every pair of polynomials, returns the quotients and remainders
+def polyDivMod(dividend, divisor):
+	dividend, divisor = np.broadcast_arrays(_asarray(dividend), _asarray(divisor))
+	rem = dividend.copy()
+	quo = np.zeros(rem.shape, dtype=np.uint64)
+	divisorOrder = degree(divisor)
+	for i in range(int(degree(dividend).max(initial=0)), -1, -1):
+		# subtract divisor * x^shift wherever the remainder still has the x^i term
+		shift = i - divisorOrder
+		valid = shift >= 0
+		hit = valid & (((rem >> np.uint64(i)) & np.uint64(1)) == 1)
+		safe_shift = np.where(valid, shift, 0).astype(np.uint64)
+		rem ^= np.where(hit, divisor << safe_shift, np.uint64(0))
+		quo |= np.where(hit, np.uint64(1) << safe_shift, np.uint64(0))
+	return quo, rem
+
+# remainder of every pair of polynomials
+def polyMod(dividend, divisor):
+	return polyDivMod(dividend, divisor)[1]
+
+# x^e mod g for every polynomial g (degree 1 to 63), by e shift-and-reduce steps
+def xPowMod(e, g):
+	g = _asarray(g)
+	top = degree(g).astype(np.uint64)
+	result = np.ones(g.shape, dtype=np.uint64)
+	for _ in range(e):
+		result = result << np.uint64(1)
+		result ^= np.where(((result >> top) & np.uint64(1)) == 1, g, np.uint64(0))
+	return result
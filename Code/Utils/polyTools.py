@@ -3,50 +3,70 @@
 
 import numpy as np
 import logging
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from Utils import gfTools as gf
+from Utils import bitpack as bp
+from Utils import polyArray as pa
 
 # Create a logger in this module
 logger = logging.getLogger(__name__)
 
+# largest number of generator polynomials findGenerators enumerates
+MAX_CANDIDATES = 1 << 16
+# number of messages encoded at once when the codewords are enumerated by message weight
+WEIGHT_CHUNK = 1 << 16
+# cost of a message enumerated by weight, in codewords of the Gray-code enumeration (about 100x slower per word)
+COMBINATION_COST = 100
+
+# bit-reversed value of every byte, as a bytes.translate table
+REVERSE_BYTE = bytes(pa.REVERSE_BYTE)
+
 
 # find the order of a polynomial in integer form
+# also works elementwise on an ndarray of packed polynomials, see polyArray
 def order(p):
-	p = p >> 1
-	order = 0
-	while p:
-		p = p >> 1
-		order += 1
-	return order
+	if isinstance(p, np.ndarray):
+		return pa.degree(p)
+	return max(int(p).bit_length() - 1, 0)
 
 # find the hamming weight of a polynomial in integer form
+# also works elementwise on an ndarray of packed polynomials
 def weight(p):
-	weight = 0
-	while p:
-		if p & 1:
-			weight += 1
-		p = p >> 1
-	return weight
+	if isinstance(p, np.ndarray):
+		return pa.popcount(p)
+	return bin(p).count('1')
 
 # reverse the order of the bits of the polynomial
 # this is used becase some tasks work better with the highest order coeffecient as the least significant bit 
 # if no order is specified, it is found using order(p) from above
+# the bytes are reversed through the polyArray byte table, also works elementwise on an ndarray of packed polynomials
 # returns the reversed polynomial
 def bitRev(p, pOrder = None):
-	if p == 0:
-		return 0
 	if pOrder == None:
 		pOrder = order(p)
+	if isinstance(p, np.ndarray):
+		return pa.bitRev(p, pOrder)
+	if p == 0:
+		return 0
 
-	retVal = 0
-	for i in range(pOrder+1):
-		retVal = (retVal << 1) + (p & 1)
-		p = p >>1
-	return retVal
+	# numpy integer scalars have no to_bytes
+	p = int(p)
+	numBytes = pOrder // 8 + 1
+	p = p & ((1 << (pOrder+1)) - 1)
+	reversedBytes = p.to_bytes(numBytes, 'little').translate(REVERSE_BYTE)
+	return int.from_bytes(reversedBytes, 'big') >> (8*numBytes - pOrder - 1)
 
 # divide two polynomials
 # each polynomial must be with the lowest order coeff as the LSB and the highest order as the MSB
 # if order is not provided it is found automatically
+# ndarrays of packed polynomials are divided elementwise by polyArray
 # returns a tuple of the result and remainder of the division.
 def polyDiv(dividend, divisor, dividendOrder = None, divisorOrder = None):
+	if isinstance(dividend, np.ndarray) or isinstance(divisor, np.ndarray):
+		return pa.polyDivMod(dividend, divisor)
 	if dividendOrder == None or divisorOrder == None:
 		dividendOrder = order(dividend)
 		divisorOrder = order(divisor)
@@ -67,6 +87,32 @@ def polyDiv(dividend, divisor, dividendOrder = None, divisorOrder = None):
 	# 	print(f'{dividend:b}',':',  f'{divisor:b}', '=', f'{result:b}')
 	return result, rem
 
+# multiply two polynomials over GF(2) (carry-less multiplication)
+# each polynomial must be with the lowest order coeff as the LSB and the highest order as the MSB
+# ndarrays of packed polynomials are multiplied elementwise by polyArray
+# returns the product
+def polyMul(a, b):
+	if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+		return pa.clmul(a, b)
+	result = 0
+	while b:
+		if b & 1:
+			result = result ^ a
+		a = a << 1
+		b = b >> 1
+	return result
+
+# build the 256-entry remainder table of a table-driven (CRC-style) division by genPoly
+# entry i is (i * x^r) mod genPoly, r is the order of genPoly
+# returns the table as a numpy array
+def buildRemainderTable(genPoly, r = None):
+	if r == None:
+		r = order(genPoly)
+	table = np.zeros(256, dtype=np.uint64)
+	for i in range(256):
+		table[i] = polyDiv(i << r, genPoly, order(i << r), r)[1]
+	return table
+
 # find a generator polynomial that can create a cyclic code
 # this uses the mathematical rules of a cyclic code and brute force searches for a compatible polynomial
 # returns None if polynomial cannot be found.
@@ -80,12 +126,27 @@ def findGen(n,k, initialGen = None):
 	else:
 		gen = (1 << (n-k)) + 1
 	maxGen = (1 << (n-k+1))
-	rem = 1
-	while rem:
-		gen += 2
-		if gen >= maxGen:
-			return None
-		parity, rem = polyDiv(target, gen, n, n-k)
+	if n-k >= 63:
+		rem = 1
+		while rem:
+			gen += 2
+			if gen >= maxGen:
+				return None
+			parity, rem = polyDiv(target, gen, n, n-k)
+	else:
+		# check a block of candidates at once, gen divides x^n + 1 when x^n mod gen = 1
+		block = 256
+		while True:
+			candidates = np.arange(gen + 2, min(gen + 2 + 2*block, maxGen), 2, dtype=np.uint64)
+			if len(candidates) == 0:
+				return None
+			found = np.flatnonzero(pa.xPowMod(n, candidates) == 1)
+			if len(found):
+				gen = int(candidates[found[0]])
+				break
+			gen = int(candidates[-1])
+			block = min(2*block, 1 << 16)
+		parity = polyDiv(target, gen, n, n-k)[0]
 	logger.debug('generator = %s', f'{gen:b}')
 	logger.debug('parity    = %s', f'{parity:b}')
 	return gen
@@ -124,36 +185,106 @@ def buildParityMatrix(n, k, genMatrix):
 	return Ht
 
 
+# find the multiplicative order of 2 modulo n (n odd), the smallest m such that n divides 2^m - 1
+def multiplicativeOrder(n):
+	m = 1
+	while (1 << m) % n != 1 % n:
+		m += 1
+	return m
+
+# find the irreducible factors of x^n + 1 over GF(2), n must be odd
+# the factors are the minimal polynomials of beta^c for each cyclotomic coset of 2 modulo n,
+# where beta = alpha^((2^m-1)/n) is a primitive nth root of unity in GF(2^m), m the multiplicative order of 2 modulo n
+# returns the list of factors in integer form
+def factorXnPlus1(n):
+	m = multiplicativeOrder(n)
+	field = gf.Galois_Field(m)
+	step = field.order // n
+	return [gf.minimalPolynomial(field, coset, step) for coset in gf.cyclotomicCosets(n)]
+
+# find the generator polynomials of all (n, k) cyclic codes, in increasing order like findGen
+# for odd n they are the products of factors of x^n + 1 whose degree adds up to n-k,
+# even n (and n needing a field larger than gfTools supports) falls back to the brute force search of findGen
+# maxCandidates: stop enumerating after this many products
+# 		the products are found depth first over the factors, not by value, so when there are more than maxCandidates
+# 		(e.g. (255, 131)) only the ones found first are sorted and yielded, which are not the smallest generators
+def findGenerators(n, k, maxCandidates = MAX_CANDIDATES):
+	if n % 2 == 0 or multiplicativeOrder(n) not in gf.PRIMITIVE_POLYS:
+		gen = findGen(n, k)
+		while gen:
+			yield gen
+			gen = findGen(n, k, gen)
+		return
+
+	factors = factorXnPlus1(n)
+	degrees = [order(f) for f in factors]
+	# degrees that the factors from index i on can still add up to
+	reachable = [{0}]
+	for d in reversed(degrees):
+		reachable.insert(0, reachable[0] | {r + d for r in reachable[0] if r + d <= n-k})
+
+	generators = []
+	def search(i, product, degree):
+		if len(generators) >= maxCandidates or (n-k) - degree not in reachable[i]:
+			return
+		if degree == n-k:
+			generators.append(product)
+			return
+		search(i+1, polyMul(product, factors[i]), degree + degrees[i])
+		search(i+1, product, degree)
+	search(0, 1, 0)
+	if len(generators) >= maxCandidates:
+		logger.warning('only the first %d generators of (%d, %d) codes found depth first are searched, '
+			'not necessarily the smallest ones', maxCandidates, n, k)
+
+	# findGen never returns x^(n-k) + 1
+	for gen in sorted(generators):
+		if gen > (1 << (n-k)) + 1:
+			yield gen
+
 # create a generator matrix for a systematic cyclic code that matches the requirements provided by the input
 # returns None if requirements are impossible to meet.
 # n, k: code length and information length of the code
 # nECC: number of correctable errors the code must have
 # 		input of nECC = None means it will search for the best possible code.
-def findMatrix(n,k, nECC = 1):
-	numErrors = 0
+# processes: check that many candidate generators at once in a process pool
+def findMatrix(n,k, nECC = 1, processes = None):
 	bestPoly = 0
-	genPoly = 0
 	bestGen = None
 	maxErrors = 0
-	while nECC == None or numErrors < nECC:
-		genPoly = findGen(n,k,genPoly)
-		if genPoly == None:
-			genMatrix = None
-			break
-		genMatrix = buildGenMatrix(n, k, genPoly)
-		numErrors = correctableErrors(n, k, genMatrix)
-		if numErrors > maxErrors:
-			bestGen = genMatrix 
-			maxErrors = numErrors 
-			bestPoly = genPoly
-	if (nECC == None and bestGen == None) or (nECC and genMatrix == None):
+	matrices = ((genPoly, buildGenMatrix(n, k, genPoly)) for genPoly in findGenerators(n, k))
+
+	if processes and processes > 1:
+		executor = ProcessPoolExecutor(processes)
+	else:
+		executor = None
+	try:
+		while True:
+			batch = list(itertools.islice(matrices, processes if executor else 1))
+			if not batch:
+				break
+			if executor:
+				errors = list(executor.map(correctableErrors, [n]*len(batch), [k]*len(batch), [m for _, m in batch]))
+			else:
+				errors = [correctableErrors(n, k, batch[0][1])]
+			for (genPoly, genMatrix), numErrors in zip(batch, errors):
+				if numErrors > maxErrors:
+					bestGen = genMatrix
+					maxErrors = numErrors
+					bestPoly = genPoly
+				if nECC != None and numErrors >= nECC:
+					break
+			if nECC != None and maxErrors >= nECC:
+				break
+	finally:
+		if executor:
+			executor.shutdown()
+
+	if bestGen == None or (nECC != None and maxErrors < nECC):
 		logger.debug('no viable matrix found')
-		# print('no viable matrix found')
 		return None
 	logger.debug('used polynomial %d', bestPoly)
-	logger.debug('%d correctable errors', maxErrors)	
-	# print('used polynomial', bestPoly)
-	# print(maxErrors,'correctable errors')	
+	logger.debug('%d correctable errors', maxErrors)
 	return bestGen
 
 # encode a data word with the provided generator matrix
@@ -199,19 +330,130 @@ def nCr_Seq(n, r):
 	return seq
 
 def correctableErrors(n, k, genMatrix):
-	minWeight = n
-	for minPossible in range(1, n-k+1, 1):
-		if minWeight <= minPossible:
+	return (minimumDistance(n, k, genMatrix)-1) // 2
+
+# Find the minimum distance of a code, eq to the minimum weight of the non-zero codewords (see minimumWeight)
+def minimumDistance(n, k, genMatrix):
+	return minimumWeight(n, k, genMatrix)
+
+# number of low message bits whose 2^b codewords are enumerated at once by the Gray-code weight engine
+GRAY_TABLE_BITS = 16
+# warn before enumerating codes of more message bits than this
+ENUMERATE_WARN_BITS = 40
+
+# histogram of codeword weights for the messages gray(start) ... gray(end-1), gray(i) = i ^ (i >> 1)
+# the low b message bits are enumerated at once from a table, the high bits follow a Gray code,
+# so each step is a single XOR of a packed generator row and a popcount
+# rows: generator rows packed into uint64 words (see Utils.bitpack), b: number of table bits
+# stopWeight: stop as soon as a non-zero codeword of weight <= stopWeight is found
+def _grayWeights(rows, b, start, end, n, stopWeight = 0):
+	table = np.zeros((1 << b, rows.shape[1]), dtype=np.uint64)
+	for i in range(b):
+		table[1 << i: 2 << i] = table[:1 << i] ^ rows[i]
+
+	high = rows[b:]
+	current = np.zeros(rows.shape[1], dtype=np.uint64)
+	gray = start ^ (start >> 1)
+	for i in range(len(high)):
+		if (gray >> i) & 1:
+			current ^= high[i]
+
+	hist = np.zeros(n+1, dtype=np.int64)
+	for i in range(start, end):
+		if i != start:
+			# gray(i) and gray(i-1) differ in the lowest set bit of i
+			current ^= high[(i & -i).bit_length() - 1]
+		weights = bp.popcount(table ^ current).astype(np.int64).sum(axis=1)
+		hist += np.bincount(weights, minlength=n+1)
+		if stopWeight and np.any(hist[1:stopWeight+1]):
 			break
-		# print(k, 'choose', minPossible)
-		for word in nCr_Seq(k, minPossible):
-			if minWeight <= minPossible:
+	return hist
+
+# weight distribution of the code generated by the rows of the binary matrix G, counting every one of the 2^k codewords
+def _enumerateWeights(G, processes = None, stopWeight = 0):
+	k, n = G.shape
+	if k > ENUMERATE_WARN_BITS:
+		logger.warning('Enumerating the 2^%d codewords of a (%d, %d) code, this may not finish', k, n, k)
+	rows = bp.pack_rows(G)
+	b = min(k, GRAY_TABLE_BITS)
+	steps = 1 << (k - b)
+
+	if not processes or processes == 1 or steps < processes:
+		return _grayWeights(rows, b, 0, steps, n, stopWeight)
+
+	# split the Gray code into contiguous ranges, one per worker
+	bounds = [steps * i // processes for i in range(processes+1)]
+	with ProcessPoolExecutor(processes) as executor:
+		hists = executor.map(_grayWeights, [rows]*processes, [b]*processes, bounds[:-1], bounds[1:], [n]*processes, [stopWeight]*processes)
+		return sum(hists)
+
+# Krawtchouk polynomials of length n, entry [w][j] is K_w(j), kept for every n seen since findMatrix transforms many codes of one length
+_krawtchouk = {}
+
+def krawtchouk(n):
+	if n not in _krawtchouk:
+		_krawtchouk[n] = [[sum((-1)**s * math.comb(j, s) * math.comb(n-j, w-s) for s in range(min(j, w)+1)) for j in range(n+1)] for w in range(n+1)]
+	return _krawtchouk[n]
+
+# MacWilliams identity, weight distribution of a code from the weight distribution of its (n-k)-dimensional dual
+def macWilliams(n, k, dualWeights):
+	table = krawtchouk(n)
+	counts = [(j, int(count)) for j, count in enumerate(dualWeights) if count]
+	return [sum(count * table[w][j] for j, count in counts) >> (n-k) for w in range(n+1)]
+
+# Find the weight distribution of a systematic code, entry w is the number of codewords of weight w
+# the codewords are enumerated in Gray-code order, or the dual code's when it is smaller (n-k < k), through the MacWilliams identity
+# processes: split the enumeration across that many worker processes
+def weightDistribution(n, k, genMatrix, processes = None):
+	G = genMatrixDecmial2Ndarray(genMatrix, n)
+	if n-k < k:
+		# the systematic G = [P | I_k] has the dual generator H = [I_{n-k} | P.T]
+		H = np.hstack((np.eye(n-k, dtype=np.uint8), G[:, :n-k].T))
+		return macWilliams(n, k, _enumerateWeights(H, processes))
+	return [int(count) for count in _enumerateWeights(G, processes)]
+
+# lightest non-zero codeword of the systematic code generated by the rows of the binary matrix G, messages enumerated by increasing weight w
+# a systematic codeword is at least as heavy as its message, so once w reaches the lightest codeword found no lighter one is left
+# budget: largest number of codewords the full enumeration would take, a message of the incremental search costs COMBINATION_COST of them;
+# returns None when the next message weight would take the search past the budget
+# lowerBound: a known lower bound of the minimum distance, stop as soon as a codeword this light is found
+def _lightestCodeword(G, budget, lowerBound = None):
+	k, n = G.shape
+	rows = bp.pack_rows(G)
+	best = n
+	spent = 0
+	for w in range(1, k+1):
+		if w >= best:
+			break
+		spent += math.comb(k, w) * COMBINATION_COST
+		if spent > budget:
+			return None
+		combinations = itertools.combinations(range(k), w)
+		while True:
+			chunk = np.fromiter(itertools.chain.from_iterable(itertools.islice(combinations, WEIGHT_CHUNK)), dtype=np.int64)
+			if len(chunk) == 0:
 				break
-			wordWeight = weight(encode(word, genMatrix))
-			if wordWeight < minWeight:
-				minWeight = wordWeight
-				# print(minWeight, word)
-	return (minWeight-1) // 2
+			codewords = np.bitwise_xor.reduce(rows[chunk.reshape(-1, w)], axis=1)
+			best = min(best, int(bp.popcount(codewords).astype(np.int64).sum(axis=1).min()))
+			if best <= w or (lowerBound and best <= lowerBound):
+				return best
+	return best
+
+# Find the minimum weight of the non-zero codewords of a systematic code
+# the messages are enumerated by increasing weight while that costs less than enumerating every codeword of the code or of its dual,
+# otherwise the cheaper of the two (2^k or 2^(n-k) codewords) is enumerated, the dual through the weight distribution and the MacWilliams identity
+# lowerBound: a known lower bound of the minimum distance, the enumeration of the code stops as soon as a codeword this light is found
+# processes: split the Gray-code enumeration across that many worker processes
+def minimumWeight(n, k, genMatrix, lowerBound = None, processes = None):
+	G = genMatrixDecmial2Ndarray(genMatrix, n)
+	best = _lightestCodeword(G, 1 << min(k, n-k), lowerBound)
+	if best is not None:
+		return best
+	if n-k < k:
+		weights = weightDistribution(n, k, genMatrix, processes)
+		return next(w for w in range(1, n+1) if weights[w])
+	hist = _enumerateWeights(G, processes, lowerBound or 0)
+	return int(np.flatnonzero(hist[1:])[0]) + 1
 
 def genMatrixDecmial2Ndarray(genMatrix_decimal, n):
 	"""
@@ -77,3 +77,147 @@ def num_correct_bits(original_bits, corrupted_bits):
     # Count the number of bits that are exactly the same
     return np.count_nonzero(original_bits == corrupted_bits)
 
+
+
+
+class Error_Statistics:
+    """
+    Fused error statistics of a bit stream cut into blocks of n bits (codewords, or messages with n = k).
+    One pass per update gives the error weight histogram of the blocks, and from it the block error counts.
+    A chunk may end inside a block, its last bits are carried into the next update; flush() counts them as a shortened
+    last block at the end of the stream. Accumulators of chunks or workers that end on block boundaries add up with merge().
+    """
+    def __init__(self, n):
+        """
+        @type  n: int
+        @param n: length of the block
+        """
+        self.n = n
+        # Entry w is the number of blocks with exactly w bit errors
+        self.histogram = np.zeros(n + 1, dtype=np.int64)
+        self.bits = 0
+        self.bit_errors = 0
+        # Error flags of the bits of an unfinished block, waiting for the next update
+        self.pending = np.zeros(0, dtype=bool)
+
+
+    def update(self, original_bits, corrupted_bits):
+        """
+        Count the errors of the next chunk of the stream, the bits after its last whole block wait for the next update
+
+            @type  original_bits: ndarray
+            @param original_bits: original bit stream
+
+            @type  corrupted_bits: ndarray
+            @param corrupted_bits: corrupted bit stream
+
+            @rtype:   Error_Statistics
+            @return:  self
+        """
+        diff = np.asarray(original_bits).reshape(-1) != np.asarray(corrupted_bits).reshape(-1)
+        self.bits += diff.size
+        self.bit_errors += int(np.count_nonzero(diff))
+        if len(self.pending):
+            diff = np.concatenate((self.pending, diff))
+
+        # Error weight of every whole block, then the histogram of the weights
+        whole = len(diff) - len(diff) % self.n
+        weights = np.count_nonzero(diff[:whole].reshape(-1, self.n), axis=1)
+        self.histogram += np.bincount(weights, minlength=self.n + 1)
+        self.pending = diff[whole:].copy()
+        return self
+
+
+    def flush(self):
+        """
+        Count the carried bits as a shortened last block, at the end of the stream
+
+            @rtype:   Error_Statistics
+            @return:  self
+        """
+        if len(self.pending):
+            self.histogram[np.count_nonzero(self.pending)] += 1
+            self.pending = np.zeros(0, dtype=bool)
+        return self
+
+
+    def merge(self, other):
+        """
+        Add the counts of another accumulator of the same block length
+
+            @type  other: Error_Statistics
+            @param other: counts of another chunk or worker
+
+            @rtype:   Error_Statistics
+            @return:  self
+        """
+        if other.n != self.n:
+            raise ValueError(f"Cannot merge statistics of {other.n}-bit blocks into {self.n}-bit blocks")
+        if len(self.pending) or len(other.pending):
+            raise ValueError("Cannot merge statistics with an unfinished block, chunk on block boundaries or flush() the last chunk")
+        self.histogram += other.histogram
+        self.bits += other.bits
+        self.bit_errors += other.bit_errors
+        return self
+
+
+    @property
+    def blocks(self):
+        """
+        Number of blocks counted
+        """
+        return int(self.histogram.sum())
+
+
+    @property
+    def block_errors(self):
+        """
+        Number of blocks with at least one incorrect bit
+        """
+        return self.blocks - int(self.histogram[0])
+
+
+    def num_blocks_with_t_errors(self, t):
+        """
+        Number of blocks with exactly t incorrect bits (like num_codeword_with_t_errors)
+
+            @type  t: int
+            @param t: number of errors
+
+            @rtype:   int
+            @return:  number of blocks
+        """
+        return int(self.histogram[t])
+
+
+    def num_blocks_with_more_errors(self, t):
+        """
+        Number of blocks with more than t incorrect bits, the uncorrectable blocks of a t-error-correcting code
+
+            @type  t: int
+            @param t: number of correctable errors
+
+            @rtype:   int
+            @return:  number of blocks
+        """
+        return int(self.histogram[t + 1:].sum())
+
+
+    def bit_error_rate(self):
+        """
+        Fraction of incorrect bits
+
+            @rtype:   float
+            @return:  bit error rate
+        """
+        return self.bit_errors / self.bits if self.bits else 0.0
+
+
+    def block_error_rate(self):
+        """
+        Fraction of blocks with at least one incorrect bit
+
+            @rtype:   float
+            @return:  block error rate
+        """
+        return self.block_errors / self.blocks if self.blocks else 0.0
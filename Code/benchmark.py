@@ -0,0 +1,326 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import channel
+from Utils import polyTools as pt
+
+
+
+# Work with (7, 4) linear code and (15, 11) (31, 26) (63, 57) cyclic hamming code (t=1)
+CODES = [None, (15, 11), (31, 26), (63, 57)]
+# Work with (15, 7, 2) (15, 5, 3) (31, 16, 3) (31, 6, 7) cyclic code
+TRAPPING_CODES = [(15, 7), (15, 5), (31, 16), (31, 6)]
+# Work with (255, 247) (511, 502) cyclic hamming code, built as t=1 BCH codes
+LFSR_CODES = [(255, 1), (511, 1)]
+# Number of message bits per run
+PAYLOAD_BITS = 1 << 20
+ERROR_PROB = 0.01
+
+# Suite: the (n, k) cyclic codes of cyclic-code.py, and the message sizes in bits
+SUITE_CODES = [(3, 1), (7, 4), (15, 11), (31, 26), (63, 57),
+               (15, 7), (15, 5), (31, 21), (31, 16), (31, 11), (31, 6)]
+SUITE_PAYLOADS = [1 << 16, 1 << 20]
+# Number of timed runs per case, the fastest one is reported
+SUITE_REPEAT = 3
+# A case regresses when it is this fraction slower, or uses this fraction more memory, than the baseline
+REGRESSION_TOLERANCE = 0.2
+# Timing differences below this many seconds are noise, never a regression
+REGRESSION_MIN_SECONDS = 0.005
+SUITE_OUTPUT = 'Result/Benchmark/benchmark.json'
+SUITE_BASELINE = 'Result/Benchmark/baseline.json'
+
+
+def time_call(func, *args):
+    """
+    Run func once and measure its wall time
+
+        @type  func: callable
+        @param func: function to be timed
+
+        @rtype:   tuple
+        @return:  result of func, elapsed seconds
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_syndrome(code, payload_bits, p):
+    """
+    Compare the syndrome look-up table corrector (dict) with the syndrome look-up array corrector
+
+        @type  code: Linear_Code
+        @param code: the code under test
+
+        @type  payload_bits: int
+        @param payload_bits: number of message bits
+
+        @type  p: float
+        @param p: error probability of the BSC
+    """
+    chl = channel.Channel()
+    tx_msg = np.random.randint(0, 2, payload_bits, dtype=np.uint8)
+    tx_codeword = code.encoder_systematic(tx_msg)
+    rx_codeword = chl.binary_symmetric_channel(tx_codeword, p)
+
+    # Build the look-up array outside of the timed region
+    code.syndrome_array
+
+    table_result, table_time = time_call(code.corrector_syndrome, rx_codeword)
+    array_result, array_time = time_call(code.corrector_syndrome_lookup, rx_codeword)
+    assert np.array_equal(table_result, array_result)
+
+    print(f"({code.n}, {code.k}): {len(rx_codeword) // code.n} codewords, "
+          f"table {table_time:.3f} s, array {array_time:.3f} s, speedup {table_time / array_time:.1f}x")
+
+
+def bench_trapping(code, payload_bits, p):
+    """
+    Compare the codeword-by-codeword error trapping corrector with the batch error trapping corrector
+
+        @type  code: Cyclic_Code
+        @param code: the code under test
+
+        @type  payload_bits: int
+        @param payload_bits: number of message bits
+
+        @type  p: float
+        @param p: error probability of the BSC
+    """
+    chl = channel.Channel()
+    tx_msg = np.random.randint(0, 2, payload_bits, dtype=np.uint8)
+    tx_codeword = code.encoder_systematic(tx_msg)
+    rx_codeword = chl.binary_symmetric_channel(tx_codeword, p)
+
+    old_result, old_time = time_call(code.corrector_trapping_old, rx_codeword)
+    batch_result, batch_time = time_call(code.corrector_trapping, rx_codeword)
+    assert np.array_equal(old_result, batch_result)
+
+    print(f"({code.n}, {code.k}): {len(rx_codeword) // code.n} codewords, "
+          f"per codeword {old_time:.3f} s, batch {batch_time:.3f} s, speedup {old_time / batch_time:.1f}x")
+
+
+
+def bench_lfsr(code, payload_bits):
+    """
+    Compare the generator matrix encoder with the table-driven LFSR encoder
+
+        @type  code: Cyclic_Code
+        @param code: the code under test
+
+        @type  payload_bits: int
+        @param payload_bits: number of message bits
+    """
+    tx_msg = np.random.randint(0, 2, payload_bits, dtype=np.uint8)
+
+    # Build the remainder table outside of the timed region
+    code.remainder_table
+
+    matrix_result, matrix_time = time_call(code.encoder_systematic, tx_msg)
+    lfsr_result, lfsr_time = time_call(code.encoder_lfsr, tx_msg)
+    assert np.array_equal(matrix_result, lfsr_result)
+
+    print(f"({code.n}, {code.k}): {len(lfsr_result) // code.n} codewords, "
+          f"matrix {matrix_time:.3f} s, lfsr {lfsr_time:.3f} s, speedup {matrix_time / lfsr_time:.1f}x")
+
+
+
+def measure(func, args, bits=None, repeat=SUITE_REPEAT):
+    """
+    Measure the best wall time of func over repeat runs, and its peak traced memory in one extra run
+
+        @type  func: callable
+        @param func: function to be measured
+
+        @type  args: tuple
+        @param args: arguments of func
+
+        @type  bits: int
+        @param bits: number of message bits processed by one call, None when throughput does not apply
+
+        @type  repeat: int
+        @param repeat: number of timed runs
+
+        @rtype:   dict
+        @return:  seconds, mbps, peak_bytes
+    """
+    seconds = min(time_call(func, *args)[1] for _ in range(repeat))
+
+    # Traced separately, tracemalloc slows down the allocations
+    tracemalloc.start()
+    func(*args)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'mbps': bits / seconds / 1e6 if bits else None,
+        'peak_bytes': peak_bytes,
+    }
+
+
+def run_suite(codes=SUITE_CODES, payloads=SUITE_PAYLOADS, repeat=SUITE_REPEAT):
+    """
+    Measure every encoder, channel, corrector and code search function over every code and payload size.
+    Throughput counts message bits, so stages of the same code and payload are comparable.
+
+        @type  codes: list
+        @param codes: (n, k) cyclic codes
+
+        @type  payloads: list
+        @param payloads: message sizes in bits
+
+        @type  repeat: int
+        @param repeat: number of timed runs per case
+
+        @rtype:   list
+        @return:  result dict of every case: name, n, k, payload_bits, seconds, mbps, peak_bytes
+    """
+    results = []
+    def record(name, n, k, payload_bits, measurement):
+        results.append(dict(name=name, n=n, k=k, payload_bits=payload_bits, **measurement))
+        rate = f"{measurement['mbps']:9.2f} Mbit/s" if measurement['mbps'] else ' ' * 16
+        print(f"{name:28} ({n:3}, {k:3}) {payload_bits or '':>8} {measurement['seconds']:9.4f} s {rate} "
+              f"{measurement['peak_bytes'] / 2**20:9.2f} MB")
+
+    for n, k in codes:
+        code = channel.Cyclic_Code(n, k, None)
+        record('findMatrix', n, k, None, measure(pt.findMatrix, (n, k, None), repeat=1))
+        record('correctableErrors', n, k, None, measure(pt.correctableErrors, (n, k, code.G_dec), repeat=1))
+
+        for payload_bits in payloads:
+            rng = np.random.default_rng(0)
+            tx_msg = rng.integers(0, 2, payload_bits, dtype=np.uint8)
+            tx_codeword = code.encoder_systematic(tx_msg)
+            rx_codeword = channel.Channel(0).binary_symmetric_channel(tx_codeword, ERROR_PROB)
+            padding_length = (- payload_bits) % k
+
+            cases = [
+                ('encoder_systematic', code.encoder_systematic, (tx_msg,)),
+                ('binary_symmetric_channel', channel.Channel(0).binary_symmetric_channel, (tx_codeword, ERROR_PROB)),
+            ]
+            # The syndrome table (dict) holds single errors only, multi-error codes use the look-up array if it is small enough
+            if code.nECC == 1:
+                cases.append(('corrector_syndrome', code.corrector_syndrome, (rx_codeword,)))
+            elif channel.syndrome_array_bytes(n, k) <= channel.SYNDROME_ARRAY_MAX_BYTES:
+                # Build the look-up array outside of the measured region
+                code.syndrome_array
+                cases.append(('corrector_syndrome_lookup', code.corrector_syndrome_lookup, (rx_codeword,)))
+            cases += [
+                ('corrector_trapping', code.corrector_trapping, (rx_codeword,)),
+                ('decoder_systematic', code.decoder_systematic, (rx_codeword, padding_length)),
+            ]
+            for name, func, args in cases:
+                record(name, n, k, payload_bits, measure(func, args, payload_bits, repeat))
+
+    return results
+
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Find the cases that are slower or use more memory than in the baseline
+
+        @type  results: list
+        @param results: results of run_suite
+
+        @type  baseline: list
+        @param baseline: results of an earlier run_suite
+
+        @type  tolerance: float
+        @param tolerance: allowed relative increase of time and memory
+
+        @rtype:   list
+        @return:  description of every regression
+    """
+    def key(result):
+        return result['name'], result['n'], result['k'], result['payload_bits']
+
+    reference = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = reference.get(key(result))
+        if old is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if metric == 'seconds' and result[metric] - old[metric] < REGRESSION_MIN_SECONDS:
+                continue
+            if result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{result['name']} ({result['n']}, {result['k']}) {result['payload_bits']}: "
+                                   f"{metric} {old[metric]:.4g} -> {result[metric]:.4g}")
+    return regressions
+
+
+def write_results(results, path):
+    """
+    Write the suite results as JSON, with the machine they were measured on
+
+        @type  results: list
+        @param results: results of run_suite
+
+        @type  path: string
+        @param path: destination file path
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump({'machine': platform.platform(), 'python': platform.python_version(),
+                   'numpy': np.__version__, 'results': results}, file, indent=1)
+
+
+def read_results(path):
+    """
+    Read suite results written by write_results
+
+        @type  path: string
+        @param path: source file path
+
+        @rtype:   list
+        @return:  results of run_suite
+    """
+    with open(path, 'r') as file:
+        return json.load(file)['results']
+
+
+
+if __name__ == '__main__':
+    # Run from the repository root, e.g. python Code/benchmark.py --baseline Result/Benchmark/baseline.json
+    parser = argparse.ArgumentParser(description='Encoder, channel and corrector benchmarks')
+    parser.add_argument('--output', default=SUITE_OUTPUT, help='JSON file for the suite results')
+    parser.add_argument('--baseline', help='compare against this JSON file, exit with 1 on a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='also store the results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help='allowed relative increase of time and memory')
+    parser.add_argument('--payloads', type=int, nargs='+', default=SUITE_PAYLOADS, help='message sizes in bits')
+    parser.add_argument('--repeat', type=int, default=SUITE_REPEAT, help='timed runs per case')
+    parser.add_argument('--speedups', action='store_true', help='compare the old and new correctors and encoders instead')
+    args = parser.parse_args()
+
+    if args.speedups:
+        for nk in CODES:
+            code = channel.Linear_Code() if nk is None else channel.Cyclic_Code(*nk, None)
+            bench_syndrome(code, PAYLOAD_BITS, ERROR_PROB)
+
+        for nk in TRAPPING_CODES:
+            bench_trapping(channel.Cyclic_Code(*nk, None), PAYLOAD_BITS, ERROR_PROB)
+
+        for nt in LFSR_CODES:
+            bench_lfsr(channel.BCH_Code(*nt), PAYLOAD_BITS)
+        sys.exit()
+
+    results = run_suite(payloads=args.payloads, repeat=args.repeat)
+    write_results(results, args.output)
+    if args.save_baseline:
+        write_results(results, args.baseline or SUITE_BASELINE)
+
+    if args.baseline and not args.save_baseline:
+        regressions = compare(results, read_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION', regression)
+        sys.exit(1 if regressions else 0)
@@ -2,12 +2,33 @@
 
 import numpy as np
 import logging
+import itertools
+from functools import cached_property
 
 from Utils import polyTools as pt
+from Utils import bitpack as bp
+from Utils import gfTools as gf
+from Utils import code_cache
+from Utils import instrument
 
 # Create a logger in this module
 logger = logging.getLogger(__name__)
 
+# Largest dense syndrome look-up array that will be built, in bytes
+SYNDROME_ARRAY_MAX_BYTES = 1 << 28
+# Number of error patterns enumerated at once when building the syndrome look-up array
+SYNDROME_CHUNK = 1 << 16
+# Number of codewords evaluated at once by the BCH Chien search
+CHIEN_CHUNK = 4096
+# Number of test words (codewords x test patterns) corrected at once by the Chase decoder
+CHASE_CHUNK = 1 << 16
+# Number of transmitted bits whose BSC errors come from one random substream
+NOISE_BLOCK_BITS = 1 << 20
+# Noise streams of the Gilbert-Elliott channel: its first state, then the exits from and the flips in the good and bad state
+GE_FIRST_STATE = (1,)
+GE_EXITS = ((2,), (3,))
+GE_FLIPS = ((4,), (5,))
+
 
 
 def create_parity_check_matrix(G):
@@ -51,6 +72,108 @@ def create_syndrome_table(H):
     return syndrome_table
 
 
+def pack_syndromes(syndromes):
+    """
+    Pack each syndrome row into an integer index, the first syndrome bit being the most significant bit
+
+        @type  syndromes: ndarray
+        @param syndromes: syndromes, one row per codeword
+
+        @rtype:   ndarray
+        @return:  integer index of each syndrome
+    """
+    # Weight of each syndrome bit, MSB first
+    weights = 1 << np.arange(syndromes.shape[-1] - 1, -1, -1, dtype=np.int64)
+
+    return syndromes @ weights
+
+
+def error_pattern_chunks(positions, weight):
+    """
+    Enumerate the error patterns with weight error bits among positions, SYNDROME_CHUNK patterns at a time
+
+        @type  positions: iterable
+        @param positions: candidate error positions
+
+        @type  weight: int
+        @param weight: number of error bits
+
+        @rtype:   generator
+        @return:  (patterns, weight) arrays of error positions
+    """
+    combinations = itertools.combinations(positions, weight)
+    while True:
+        chunk = np.fromiter(itertools.chain.from_iterable(itertools.islice(combinations, SYNDROME_CHUNK)), dtype=np.int64)
+        if len(chunk) == 0:
+            return
+        yield chunk.reshape(-1, weight)
+
+
+def syndrome_array_bytes(n, k):
+    """
+    Memory needed by the dense syndrome look-up array of an (n, k) code
+
+        @type  n: int
+        @param n: number of bits per codeword
+
+        @type  k: int
+        @param k: number of bits per message
+
+        @rtype:   int
+        @return:  number of bytes
+    """
+    return (1 << (n - k)) * n
+
+
+def create_syndrome_array(H, t=1, max_bytes=SYNDROME_ARRAY_MAX_BYTES):
+    """
+    Create a dense syndrome look-up array, row i holds the coset leader of the syndrome whose packed index is i.
+    Error patterns are enumerated by increasing weight up to t (or until every syndrome is filled), the first pattern of each syndrome wins.
+    Syndromes without a coset leader of weight up to t map to the zero vector (no correction).
+
+        @type  H: ndarray
+        @param H: parity-check matrix
+
+        @type  t: int
+        @param t: largest error pattern weight
+
+        @type  max_bytes: int
+        @param max_bytes: refuse to build arrays larger than this
+
+        @rtype:   ndarray
+        @return:  (2^(n-k), n) array of coset leaders
+    """
+    # Get the size of the parity-check matrix
+    m, n = H.shape
+    if syndrome_array_bytes(n, n - m) > max_bytes:
+        raise ValueError(f"Syndrome look-up array of a ({n}, {n-m}) code needs {syndrome_array_bytes(n, n - m)} bytes, more than {max_bytes}")
+
+    # The zero syndrome maps to the zero vector
+    syndrome_array = np.zeros((1 << m, n), dtype=np.uint8)
+    filled = np.zeros(1 << m, dtype=bool)
+    filled[0] = True
+
+    # Syndrome of each single-bit error, the syndrome of a pattern is the XOR of its bits' syndromes
+    column_syndromes = pack_syndromes(H.T)
+
+    for weight in range(1, t + 1):
+        for chunk in error_pattern_chunks(range(n), weight):
+            if filled.all():
+                break
+            indices = np.bitwise_xor.reduce(column_syndromes[chunk], axis=1)
+
+            # Keep the first pattern of each syndrome not yet filled
+            indices, first = np.unique(indices, return_index=True)
+            new = ~filled[indices]
+            indices, first = indices[new], first[new]
+            syndrome_array[indices[:, None], chunk[first]] = 1
+            filled[indices] = True
+
+    logger.debug('%d of %d syndromes have a coset leader', np.count_nonzero(filled), len(filled))
+
+    return syndrome_array
+
+
 def pad_bits(bits, k):
     """
     Pad the bits array with zeroes so its length is divisible by k.
@@ -83,6 +206,108 @@ def remove_padding(bits, padding_length):
     return bits[:-padding_length] if padding_length != 0 else bits
 
 
+def flip_positions(length, p, rng=np.random):
+    """
+    Draw the positions of the bit flips of a BSC over length bits, as geometric gaps between consecutive flips.
+    Memory and time scale with the number of flips (about p * length), not with length.
+    The flips below length do not depend on length, so a shorter draw from the same random state is a prefix of a longer one.
+
+        @type  length: int
+        @param length: number of transmitted bits
+
+        @type  p: float
+        @param p: error_probability
+
+        @type  rng: Generator
+        @param rng: random number generator (default: the legacy global numpy random state)
+
+        @rtype:   ndarray
+        @return:  sorted flip positions
+    """
+    if p <= 0 or length == 0:
+        return np.zeros(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(length, dtype=np.int64)
+
+    positions = extend_flip_positions(np.zeros(0, dtype=np.int64), length, p, rng)
+    return positions[:np.searchsorted(positions, length)]
+
+
+def extend_flip_positions(positions, length, p, rng):
+    """
+    Continue a draw of flip positions (see flip_positions) with more geometric gaps from the same random state,
+    until a position reaches length. Every extension draws at least as many gaps as already drawn,
+    so a draw extended in many small steps costs about as much as one draw.
+
+        @type  positions: ndarray
+        @param positions: flip positions drawn so far, all of them including those past the previous length
+
+        @type  length: int
+        @param length: number of transmitted bits to cover
+
+        @type  p: float
+        @param p: error_probability, 0 < p < 1
+
+        @type  rng: Generator
+        @param rng: random number generator the positions were drawn from
+
+        @rtype:   ndarray
+        @return:  every flip position drawn, the last one at or past length
+    """
+    batches = [positions]
+    last = positions[-1] if len(positions) else -1
+    while last < length:
+        # Draw a few standard deviations more gaps than expected, so one batch is almost always enough
+        remaining = (length - 1 - last) * p
+        size = max(int(remaining + 6 * np.sqrt(remaining) + 16), len(positions))
+        batches.append(last + np.cumsum(rng.geometric(p, size), dtype=np.int64))
+        last = batches[-1][-1]
+    return np.concatenate(batches)
+
+
+def cut_runs(run_lengths, length, first_bad):
+    """
+    Cut alternating runs of the good and bad state at the end of a stream of length bits
+
+        @type  run_lengths: ndarray
+        @param run_lengths: lengths of the runs, at least length bits in total
+
+        @type  length: int
+        @param length: number of transmitted bits
+
+        @type  first_bad: bool
+        @param first_bad: the first run is in the bad state
+
+        @rtype:   tuple
+        @return:  start, length and state (True for bad) of every run
+    """
+    run_ends = np.cumsum(run_lengths)
+    num_runs = np.searchsorted(run_ends, length) + 1
+    run_starts = run_ends[:num_runs] - run_lengths[:num_runs]
+    run_lengths = np.minimum(run_ends[:num_runs], length) - run_starts
+    run_bad = (np.arange(num_runs) % 2 == 0) == first_bad
+    return run_starts, run_lengths, run_bad
+
+
+def runs_to_stream(run_starts, run_lengths, local):
+    """
+    Map positions among the bits spent in some runs, counted across the runs, back to positions in the stream
+
+        @type  run_starts, run_lengths: ndarray
+        @param run_starts, run_lengths: start and length of the runs
+
+        @type  local: ndarray
+        @param local: sorted positions among the run_lengths.sum() bits of the runs
+
+        @rtype:   ndarray
+        @return:  positions in the stream
+    """
+    # Offset of every run within the bits spent in the runs
+    offsets = np.cumsum(run_lengths) - run_lengths
+    run = np.searchsorted(offsets, local, side='right') - 1
+    return run_starts[run] + local - offsets[run]
+
+
 
 class Linear_Code:
     """
@@ -90,6 +315,7 @@ class Linear_Code:
     """
     def __init__(self):
         self.n, self.k = 7, 4
+        self.nECC = 1
         self.G = np.array([[1, 1, 0, 1, 0, 0, 0],
                            [0, 1, 1, 0, 1, 0, 0],
                            [1, 1, 1, 0, 0, 1, 0],
@@ -188,12 +414,19 @@ class Linear_Code:
         # Copy reshaped_array to corrected_array for correction
         corrected_array = reshaped_array.copy()
 
-        # Loop over the syndromes
+        # Loop over the syndromes, counting the nonzero coset leaders added
+        corrected_words = 0
         for i, syndrome in enumerate(syndromes):
             if np.any(syndrome):
                 # Convert syndrome to tuple for lookup
                 tuple_syndrome = tuple(syndrome)
                 corrected_array[i] = (reshaped_array[i] + self.syndrome_table[tuple_syndrome]) % 2
+                corrected_words += bool(np.any(self.syndrome_table[tuple_syndrome]))
+
+        if instrument.enabled():
+            instrument.count('corrector_syndrome.words', len(syndromes))
+            instrument.count('corrector_syndrome.corrected_words', corrected_words)
+            instrument.count('corrector_syndrome.uncorrectable_words', np.count_nonzero(np.any(syndromes, axis=1)) - corrected_words)
 
         # Flatten corrected_array to match the shape of the input received_array
         corrected_array = corrected_array.flatten()
@@ -201,34 +434,460 @@ class Linear_Code:
         return corrected_array
 
 
+    @cached_property
+    def syndrome_array(self):
+        """
+        Dense syndrome look-up array indexed by the packed syndrome, coset leaders up to nECC errors, built on first use
+        """
+        return create_syndrome_array(self.H, self.nECC)
+
+
+    def corrector_syndrome_lookup(self, received_array):
+        """
+        Systematic - Correct the received binary bits codeword (up to nECC error bits) with (n,k) syndrome look-up array corrector,
+        all codewords are corrected at once by indexing the coset leaders with the packed syndromes,
+        return the estimated TX codeword = (RX codeword + error pattern)
+
+            @type  received_array: ndarray
+            @param received_array: RX codewords
+
+            @rtype:   ndarray
+            @return:  estimated TX codewords
+        """
+        # Reshape the received_array so each row is a codeword
+        reshaped_array = received_array.reshape(-1, self.n)
+
+        # Compute the syndrome for each codeword, and pack it into an integer index
+        syndromes = np.dot(reshaped_array, self.H.T) % 2
+        indices = pack_syndromes(syndromes)
+
+        # Add the coset leader of every codeword in one go
+        coset_leaders = self.syndrome_array[indices]
+        corrected_array = reshaped_array ^ coset_leaders
+
+        if instrument.enabled():
+            # Nonzero syndromes without a coset leader of weight up to nECC map to the zero vector, left uncorrected
+            corrected_words = np.count_nonzero(np.any(coset_leaders, axis=1))
+            instrument.count('corrector_syndrome_lookup.words', len(indices))
+            instrument.count('corrector_syndrome_lookup.corrected_words', corrected_words)
+            instrument.count('corrector_syndrome_lookup.uncorrectable_words', np.count_nonzero(indices) - corrected_words)
+
+        # Flatten corrected_array to match the shape of the input received_array
+        corrected_array = corrected_array.flatten()
+
+        return corrected_array
+
+
+    def corrector_chase(self, received_array, reliability, corrector=None, num_lrb=None):
+        """
+        Systematic - Chase-II soft-decision corrector on top of a hard-decision corrector.
+        Every codeword gets 2^num_lrb test patterns, its num_lrb least reliable bits flipped in every combination.
+        All test words are corrected in one batch, and the valid codeword that disagrees with the received bits
+        on the least total reliability (the best correlation with the soft values) wins.
+
+            @type  received_array: ndarray
+            @param received_array: RX codewords, hard decisions
+
+            @type  reliability: ndarray
+            @param reliability: reliability of every received bit, e.g. |LLR| or |y| of BPSK over AWGN
+
+            @type  corrector: callable
+            @param corrector: hard-decision corrector of the code (default: corrector_syndrome_lookup)
+
+            @type  num_lrb: int
+            @param num_lrb: number of least reliable bits flipped (default: nECC)
+
+            @rtype:   ndarray
+            @return:  estimated TX codewords
+        """
+        if corrector is None:
+            corrector = self.corrector_syndrome_lookup
+        if num_lrb is None:
+            num_lrb = self.nECC
+        num_lrb = min(num_lrb, self.n)
+
+        # Reshape the arrays so each row is a codeword
+        reshaped_array = received_array.reshape(-1, self.n)
+        reliability = np.asarray(reliability, dtype=np.float64).reshape(-1, self.n)
+        corrected_array = np.empty_like(reshaped_array)
+
+        # Row t flips the least reliable bits selected by the bits of t, row 0 is the plain hard-decision word
+        patterns = ((np.arange(1 << num_lrb)[:, None] >> np.arange(num_lrb)) & 1).astype(reshaped_array.dtype)
+        num_patterns = len(patterns)
+
+        chunk = max(1, CHASE_CHUNK // num_patterns)
+        for start in range(0, len(reshaped_array), chunk):
+            words = reshaped_array[start:start + chunk]
+            weights = reliability[start:start + chunk]
+            rows = np.arange(len(words))[:, None]
+
+            # Positions of the least reliable bits of every codeword
+            if num_lrb == self.n:
+                lrb = np.broadcast_to(np.arange(self.n), words.shape)
+            else:
+                lrb = np.argpartition(weights, num_lrb - 1, axis=1)[:, :num_lrb]
+            flips = np.zeros((len(words), self.n, num_patterns), dtype=words.dtype)
+            flips[rows, lrb] = patterns.T
+            test_words = words[:, None, :] ^ flips.transpose(0, 2, 1)
+
+            # Correct every test word of the chunk in one call
+            candidates = corrector(test_words.reshape(-1)).reshape(test_words.shape)
+
+            # Soft metric, total reliability of the received bits a candidate disagrees with; only codewords qualify
+            metric = np.sum(weights[:, None, :] * (candidates != words[:, None, :]), axis=2)
+            syndromes = np.dot(candidates.reshape(-1, self.n), self.H.T) % 2
+            metric[syndromes.reshape(len(words), num_patterns, -1).any(axis=2)] = np.inf
+            best = np.argmin(metric, axis=1)
+            corrected_array[start:start + chunk] = candidates[rows[:, 0], best]
+
+        if instrument.enabled():
+            instrument.count('corrector_chase.words', len(reshaped_array))
+            instrument.count('corrector_chase.test_words', len(reshaped_array) * num_patterns)
+            instrument.count('corrector_chase.corrected_words', np.count_nonzero((corrected_array != reshaped_array).any(axis=1)))
+
+        # Flatten corrected_array to match the shape of the input received_array
+        corrected_array = corrected_array.flatten()
+
+        return corrected_array
+
+
+    def corrected_weight(self, corrector):
+        """
+        Largest t such that the corrector corrects every pattern of up to t errors.
+        The correctors of this class are bounded-distance decoders, complete up to nECC errors; so is any unknown corrector assumed to be.
+
+            @type  corrector: callable
+            @param corrector: hard-decision corrector of the code, e.g. code.corrector_syndrome_lookup
+
+            @rtype:   int
+            @return:  number of errors always corrected
+        """
+        return self.nECC
+
+
+    @cached_property
+    def weight_distribution(self):
+        """
+        Weight distribution of the code, entry w is the number of codewords of weight w (see polyTools.weightDistribution).
+        A list of Python ints, the counts of long codes do not fit in int64.
+        """
+        # Generator rows in integer form, column 0 as the MSB (like G_dec)
+        G_dec = [int(''.join(str(int(bit)) for bit in row), 2) for row in self.G]
+        return pt.weightDistribution(self.n, self.k, G_dec)
+
+
+    @cached_property
+    def encoder_table(self):
+        """
+        Packed codeword of every byte value of every message byte, built on first use, (ceil(k/8), 256, words)
+        """
+        packed_G = bp.pack_rows(self.G)
+        packed_G = np.vstack((packed_G, np.zeros((-self.k % 8, packed_G.shape[1]), dtype=np.uint64)))
+
+        # Bit b of every byte value
+        byte_bits = (np.arange(256)[:, None] >> np.arange(8)) & 1
+
+        table = np.zeros((len(packed_G) // 8, 256, packed_G.shape[1]), dtype=np.uint64)
+        for group in range(table.shape[0]):
+            for b in range(8):
+                table[group][byte_bits[:, b] == 1] ^= packed_G[8 * group + b]
+        return table
+
+
+    @cached_property
+    def packed_H(self):
+        """
+        Parity-check matrix with every row packed into uint64 words, built on first use
+        """
+        return bp.pack_rows(self.H)
+
+
+    @cached_property
+    def packed_syndrome_array(self):
+        """
+        Syndrome look-up array with every coset leader packed into uint64 words, built on first use
+        """
+        return bp.pack_rows(self.syndrome_array)
+
+
+    def encoder_systematic_packed(self, messages):
+        """
+        Systematic - Encode the packed messages with (n,k) systematic encoder, return the packed to-be-transmitted codewords.
+        Each message byte selects the XOR of 8 generator rows from a precomputed table.
+
+            @type  messages: ndarray
+            @param messages: TX messages, packed with bitpack.pack_bits(pad_bits(bits, k), k)
+
+            @rtype:   ndarray
+            @return:  packed TX codewords
+        """
+        message_bytes = np.ascontiguousarray(messages, dtype='<u8').view(np.uint8)
+
+        codewords = np.zeros((len(messages), bp.num_words(self.n)), dtype=np.uint64)
+        for group, table in enumerate(self.encoder_table):
+            codewords ^= table[message_bytes[:, group]]
+
+        return codewords
+
+
+    def decoder_systematic_packed(self, codewords):
+        """
+        Systematic - Decode the packed codewords with (n,k) systematic decoder, return the packed messages.
+        Unpack with bitpack.unpack_bits and remove_padding.
+
+            @type  codewords: ndarray
+            @param codewords: packed RX codewords
+
+            @rtype:   ndarray
+            @return:  packed RX messages
+        """
+        # Decode by taking the last self.k bits from each codeword
+        return bp.extract_bits(codewords, self.n - self.k, self.k)
+
+
+    def syndrome_packed(self, codewords):
+        """
+        Compute the packed syndrome index of every packed codeword, AND with every parity-check row and take the parity
+
+            @type  codewords: ndarray
+            @param codewords: packed RX codewords
+
+            @rtype:   ndarray
+            @return:  packed syndromes, same index as pack_syndromes
+        """
+        m = self.n - self.k
+        if m > 63:
+            raise ValueError(f"Cannot pack {m} syndrome bits into an integer index")
+
+        indices = np.zeros(len(codewords), dtype=np.int64)
+        for row, check in enumerate(self.packed_H):
+            masked = codewords[:, 0] & check[0]
+            for word in range(1, len(check)):
+                masked ^= codewords[:, word] & check[word]
+            indices |= bp.parity(masked).astype(np.int64) << (m - 1 - row)
+
+        return indices
+
+
+    def corrector_syndrome_packed(self, codewords):
+        """
+        Systematic - Correct the packed codewords with (n,k) syndrome look-up array corrector,
+        return the packed estimated TX codewords
+
+            @type  codewords: ndarray
+            @param codewords: packed RX codewords
+
+            @rtype:   ndarray
+            @return:  packed estimated TX codewords
+        """
+        return codewords ^ self.packed_syndrome_array[self.syndrome_packed(codewords)]
+
+
 
 class Cyclic_Code(Linear_Code):
     """
     (n, k) Systematic Cyclic Code
     """
-    def __init__(self, n, k, nECC = 1):
-        self.n = n
-        self.k = k
-        self.G_dec = pt.findMatrix(self.n, self.k, nECC)
-        self.G = pt.genMatrixDecmial2Ndarray(self.G_dec, self.n)
+    # Tables used by every corrector, built up front by prepare()
+    CORRECTOR_TABLES = {
+        'syndrome': ('H', 'syndrome_table'),
+        'syndrome_lookup': ('H', 'syndrome_array'),
+        'syndrome_packed': ('packed_H', 'packed_syndrome_array'),
+        'chase': ('H', 'syndrome_array'),
+        'trapping': ('HT',),
+        'trapping_packed': ('packed_H', 'HT'),
+        'trapping_old': ('HT',),
+        'meggitt': ('HT', 'meggitt_table'),
+        'bch': ('syndrome_matrix',),
+    }
+
+
+    def __init__(self, n, k, nECC = 1, use_cache = True, correctors = (), write_cache = True):
+        """
+        @type  n, k: int
+        @param n, k: code length and information length
+
+        @type  nECC: int or None
+        @param nECC: number of correctable errors requested from polyTools.findMatrix, None for the best possible code
 
-        # Following used in trapping corrector
-        self.nECC = pt.correctableErrors(self.n, self.k, self.G_dec)
-        self.HT_dec = pt.buildParityMatrix(self.n, self.k, self.G_dec)
-        self.HT = pt.genMatrixDecmial2Ndarray(self.HT_dec, self.n-self.k)
+        @type  use_cache: bool
+        @param use_cache: look the code up in the persistent cache
 
-        # Following used in sydrome look-up table corrector (inherit from Linear_Code)
-        self.H = create_parity_check_matrix(self.G)
-        self.syndrome_table = create_syndrome_table(self.H)
+        @type  correctors: list
+        @param correctors: names of the correctors that will be used (without the corrector_ prefix), their tables are
+                           built now; the other matrices and tables are only built on first use
+
+        @type  write_cache: bool
+        @param write_cache: write a code missing from the persistent cache to it (see also $EEC269A_CACHE_WRITE)
+        """
+        self.n = n
+        self.k = k
+        # Generator search is slow, the result is kept in a persistent cache
+        code = code_cache.get(n, k, nECC, write_cache) if use_cache else code_cache.build(n, k, nECC)
+        self.G_dec = code['G_dec']
+        self.genPoly = code['genPoly']
+        # The cache stores the minimum distance, no weight enumeration here
+        self.d_min = code['d_min']
+        self.nECC = code['nECC']
+        self.HT_dec = code['HT_dec']
 
         logger.info("Generated a (%d, %d) cyclic code", self.n, self.k)
         logger.info("%d correctable errors", self.nECC)
-        logger.info("Generator matrix:\n%s", self.G)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Generator matrix:\n%s", self.G)
+        self.prepare(correctors)
+
+
+    def prepare(self, correctors):
+        """
+        Build the tables of the given correctors now, e.g. before timing them or before forking workers
+
+            @type  correctors: list
+            @param correctors: corrector names without the corrector_ prefix, e.g. ['trapping']
+        """
+        for name in correctors:
+            if name not in self.CORRECTOR_TABLES or not hasattr(type(self), 'corrector_' + name):
+                raise ValueError(f"Unknown corrector {name} of a {type(self).__name__}")
+            for table in self.CORRECTOR_TABLES[name]:
+                getattr(self, table)
+
+
+    @cached_property
+    def G(self):
+        """
+        Generator matrix, built on first use
+        """
+        return pt.genMatrixDecmial2Ndarray(self.G_dec, self.n)
+
+
+    @cached_property
+    def HT(self):
+        """
+        Transposed parity check matrix used by the trapping and Meggitt correctors, built on first use
+        """
+        return pt.genMatrixDecmial2Ndarray(self.HT_dec, self.n-self.k)
+
+
+    @cached_property
+    def H(self):
+        """
+        Systematic parity check matrix used by the syndrome correctors (inherit from Linear_Code), built on first use
+        """
+        return create_parity_check_matrix(self.G)
+
+
+    @cached_property
+    def syndrome_table(self):
+        """
+        Single error syndrome look-up table of corrector_syndrome, built on first use
+        """
+        return create_syndrome_table(self.H)
+
+
+    @cached_property
+    def remainder_table(self):
+        """
+        256-entry remainder table of the division by g(x), built on first use
+        """
+        return pt.buildRemainderTable(self.genPoly, self.n-self.k)
+
+
+    def remainder_lfsr(self, words):
+        """
+        Table-driven (CRC-style) division, 8 bits at a time, compute (x^(n-k) * w(x)) mod g(x) of every word
+
+            @type  words: ndarray
+            @param words: one word per row, column j holds the x^j coefficient
+
+            @rtype:   ndarray
+            @return:  remainders, bit j holds the x^j coefficient
+        """
+        r = self.n - self.k
+        if r > 56:
+            raise ValueError(f"LFSR remainder of degree {r} does not fit in 64 bits")
+
+        # Highest order coefficient first, padded with zeros on top to whole bytes
+        reversed_words = words[:, ::-1]
+        if words.shape[1] % 8:
+            reversed_words = np.hstack((np.zeros((len(words), -words.shape[1] % 8), dtype=np.uint8), reversed_words))
+        data = np.packbits(reversed_words, axis=1)
+
+        table = self.remainder_table
+        mask = np.uint64((1 << r) - 1)
+        remainders = np.zeros(len(words), dtype=np.uint64)
+        for column in data.T:
+            # The 8 bits leaving the register, together with the incoming byte, select the table entry
+            top = remainders >> np.uint64(r - 8) if r >= 8 else remainders << np.uint64(8 - r)
+            remainders = ((remainders << np.uint64(8)) & mask) ^ table[top ^ column]
+
+        return remainders
+
+
+    def encoder_lfsr(self, bits):
+        """
+        Systematic - Encode the to-be-transmitted binary bits message with (n,k) table-driven LFSR encoder, parity = (x^(n-k) * m(x)) mod g(x),
+        pad with zero if not divisible, return the to-be-transmitted codewords
+
+            @type  bits: ndarray
+            @param bits: TX message
+
+            @rtype:   ndarray
+            @return:  TX codewords
+        """
+        # Pad the bits array with zeroes so its length is divisible by self.k
+        padded_bits = pad_bits(bits, self.k)
+
+        # Reshape the bits array to have one row per message
+        messages = padded_bits.reshape(-1, self.k)
+
+        # Parity bits followed by the message bits
+        remainders = self.remainder_lfsr(messages)
+        encoded_array = np.empty((len(messages), self.n), dtype=np.uint8)
+        encoded_array[:, :self.n-self.k] = (remainders[:, None] >> np.arange(self.n-self.k, dtype=np.uint64)) & np.uint64(1)
+        encoded_array[:, self.n-self.k:] = messages
+
+        # Flatten the array
+        encoded_array = encoded_array.flatten()
+
+        return encoded_array
+
+
+    def syndrome_lfsr(self, received_array):
+        """
+        Compute the syndrome r(x) mod g(x) of every codeword with the table-driven LFSR,
+        the parity bits plus the parity recomputed from the message bits, same as np.dot(codewords, HT) % 2
+
+            @type  received_array: ndarray
+            @param received_array: RX codewords
+
+            @rtype:   ndarray
+            @return:  syndromes, one row per codeword
+        """
+        reshaped_array = received_array.reshape(-1, self.n)
+
+        remainders = self.remainder_lfsr(reshaped_array[:, self.n-self.k:])
+        syndromes = (remainders[:, None] >> np.arange(self.n-self.k, dtype=np.uint64)) & np.uint64(1)
+
+        return syndromes.astype(np.uint8) ^ reshaped_array[:, :self.n-self.k]
+
+
+    def corrected_weight(self, corrector):
+        """
+        Largest t such that the corrector corrects every pattern of up to t errors (see Linear_Code.corrected_weight).
+        Error trapping only corrects the patterns that fit in n-k cyclically consecutive bits. The w errors of the worst
+        pattern are spread evenly, leaving no run of zeros longer than ceil((n-w)/w), so every pattern of w errors is
+        trapped only if that run holds the k other bits.
+        """
+        trapping = (Cyclic_Code.corrector_trapping, Cyclic_Code.corrector_trapping_packed, Cyclic_Code.corrector_trapping_old)
+        if getattr(corrector, '__func__', None) in trapping:
+            return max([w for w in range(1, self.nECC + 1) if -(-(self.n - w) // w) >= self.k], default=0)
+        return self.nECC
 
 
     def corrector_trapping(self, received_array):
         """
         Systematic - Correct the received binary bits codeword (up to nECC error bits) with (n, k) Error trapping corrector,
+        all codewords with non-zero syndromes are trapped together, one cyclic shift at a time,
         return the estimated TX codeword = (RX codeword + error pattern)
 
             @type  received_array: ndarray
@@ -238,9 +897,164 @@ class Cyclic_Code(Linear_Code):
             @return:  estimated TX codewords
         """
         reshaped_array = received_array.reshape(-1, self.n)
+        corrected_array = reshaped_array.copy()
+        logger.debug('size = %s', reshaped_array.shape)
+        syndromes = np.dot(reshaped_array, self.HT) % 2
+
+        # Only the codewords with non-zero syndromes need trapping
+        pending = np.flatnonzero(np.any(syndromes, axis=1))
+        syndromes = syndromes[pending]
+        num_errors = len(pending)
+
+        # Syndrome of the codeword cyclically shifted left by one bit: s' = s @ shift_matrix,
+        # since the codeword and [s | 0] share the syndrome, and bit i of [s | 0] moves to bit i-1 (mod n)
+        shift_matrix = self.HT[(np.arange(self.n - self.k) - 1) % self.n]
+
+        shifts_tried = 0
+        for shift in range(self.n):
+            if len(pending) == 0:
+                break
+            shifts_tried += len(pending)
+            # Retire the codewords whose error pattern is trapped in the parity positions
+            trapped = syndromes.sum(axis=1) <= self.nECC
+            if np.any(trapped):
+                error = np.zeros((np.count_nonzero(trapped), self.n), dtype=np.uint8)
+                error[:, :self.n-self.k] = syndromes[trapped]
+                corrected_array[pending[trapped]] ^= np.roll(error, shift, axis=1)
+                pending = pending[~trapped]
+                syndromes = syndromes[~trapped]
+            syndromes = np.dot(syndromes, shift_matrix) % 2
+
+        # Uncorrectable codewords are left as received
+        logger.debug('%d corrected, %d uncorrectable', num_errors - len(pending), len(pending))
+        if instrument.enabled():
+            instrument.count('corrector_trapping.words', len(reshaped_array))
+            instrument.count('corrector_trapping.corrected_words', num_errors - len(pending))
+            instrument.count('corrector_trapping.uncorrectable_words', len(pending))
+            instrument.count('corrector_trapping.shifts_tried', shifts_tried)
+
+        corrected_array = corrected_array.flatten()
+        return corrected_array
+
+
+    @cached_property
+    def meggitt_table(self):
+        """
+        Syndromes of the error patterns up to nECC errors that include the highest bit (n-1), built on first use.
+        A boolean array indexed by the packed syndrome when it fits in SYNDROME_ARRAY_MAX_BYTES, otherwise a sorted array of packed syndromes.
+        """
+        m = self.n - self.k
+        column_syndromes = pack_syndromes(self.HT)
+
+        syndromes = [column_syndromes[self.n-1:]]
+        for weight in range(1, self.nECC):
+            for chunk in error_pattern_chunks(range(self.n-1), weight):
+                syndromes.append(np.bitwise_xor.reduce(column_syndromes[chunk], axis=1) ^ column_syndromes[self.n-1])
+        syndromes = np.unique(np.concatenate(syndromes))
+
+        if (1 << m) > SYNDROME_ARRAY_MAX_BYTES:
+            return syndromes
+        table = np.zeros(1 << m, dtype=bool)
+        table[syndromes] = True
+        return table
+
+
+    def corrector_meggitt(self, received_array):
+        """
+        Systematic - Correct the received binary bits codeword (up to nECC error bits) with (n, k) Meggitt decoder,
+        the syndrome register of all codewords is shifted together (multiply by x mod g(x)), and the highest bit is flipped
+        whenever the syndrome belongs to an error pattern touching it, return the estimated TX codeword = (RX codeword + error pattern)
+
+            @type  received_array: ndarray
+            @param received_array: RX codewords
+
+            @rtype:   ndarray
+            @return:  estimated TX codewords
+        """
+        reshaped_array = received_array.reshape(-1, self.n)
+        corrected_array = reshaped_array.copy()
+        syndromes = pack_syndromes(np.dot(reshaped_array, self.HT) % 2)
+
+        # Only the codewords with non-zero syndromes need decoding
+        pending = np.flatnonzero(syndromes)
+        syndromes = syndromes[pending]
+        num_errors = len(pending)
+
+        table = self.meggitt_table
+        # Syndrome of an error in the highest bit
+        highest = pack_syndromes(self.HT[self.n-1])
+        # Feedback of the syndrome register, the syndrome of x^(n-k) (the LSB of the packed syndrome is the x^(n-k-1) coefficient)
+        feedback = pack_syndromes(self.HT[self.n-self.k])
+
+        shifts_tried = 0
+        for shift in range(self.n):
+            # Retire the codewords whose syndrome has been cleared
+            cleared = syndromes == 0
+            if np.any(cleared):
+                pending = pending[~cleared]
+                syndromes = syndromes[~cleared]
+            if len(pending) == 0:
+                break
+            shifts_tried += len(pending)
+
+            # After shift cyclic shifts, the highest bit of the register holds bit n-1-shift of the codeword
+            if table.dtype == bool:
+                hit = table[syndromes]
+            else:
+                hit = table[np.minimum(np.searchsorted(table, syndromes), len(table)-1)] == syndromes
+            corrected_array[pending[hit], self.n-1-shift] ^= 1
+            syndromes[hit] ^= highest
+
+            # Shift the syndrome register once, s(x) = x * s(x) mod g(x)
+            syndromes = (syndromes >> 1) ^ ((syndromes & 1) * feedback)
+
+        # Uncorrectable codewords are left as received
+        uncorrectable = pending[syndromes != 0]
+        corrected_array[uncorrectable] = reshaped_array[uncorrectable]
+        logger.debug('%d corrected, %d uncorrectable', num_errors - len(uncorrectable), len(uncorrectable))
+        if instrument.enabled():
+            instrument.count('corrector_meggitt.words', len(reshaped_array))
+            instrument.count('corrector_meggitt.corrected_words', num_errors - len(uncorrectable))
+            instrument.count('corrector_meggitt.uncorrectable_words', len(uncorrectable))
+            instrument.count('corrector_meggitt.shifts_tried', shifts_tried)
+
+        corrected_array = corrected_array.flatten()
+        return corrected_array
+
+
+    def corrector_trapping_packed(self, codewords):
+        """
+        Systematic - Correct the packed codewords with (n, k) Error trapping corrector,
+        only the codewords with non-zero syndromes are unpacked, return the packed estimated TX codewords
+
+            @type  codewords: ndarray
+            @param codewords: packed RX codewords
+
+            @rtype:   ndarray
+            @return:  packed estimated TX codewords
+        """
+        corrected = codewords.copy()
+        errors = np.flatnonzero(self.syndrome_packed(codewords))
+        if len(errors):
+            trapped = self.corrector_trapping(bp.unpack_bits(codewords[errors], self.n))
+            corrected[errors] = bp.pack_bits(trapped, self.n)
+        return corrected
+
+
+    def corrector_trapping_old(self, received_array):
+        """
+        Systematic - Correct the received binary bits codeword (up to nECC error bits) with (n, k) Error trapping corrector,
+        one codeword at a time, return the estimated TX codeword = (RX codeword + error pattern)
+
+            @type  received_array: ndarray
+            @param received_array: RX codewords
+
+            @rtype:   ndarray
+            @return:  estimated TX codewords
+        """
+        reshaped_array = received_array.reshape(-1, self.n)
         corrected_array = np.empty(reshaped_array.shape, dtype=np.uint8)
         logger.debug('size = %s', reshaped_array.shape)
-        # print('correcte\n', corrected_array, corrected_array.shape)
         syndromes = np.dot(reshaped_array, self.HT) % 2
 
         for word_count, received_word in enumerate(reshaped_array):
@@ -251,14 +1065,11 @@ class Cyclic_Code(Linear_Code):
                 continue
             syndrome = syndromes[word_count]
             for shift in range(self.n):
-                # print(shift, syndrome)
                 if syndrome.sum() <= self.nECC:
                     padding = np.zeros(self.k, dtype=np.uint8)
                     error = np.concatenate((syndrome, padding))
                     corrected_word = np.bitwise_xor(received_word, error)
                     corrected_word = np.roll(corrected_word, shift)
-                    # print('word', np.roll(received_word, shift))
-                    # print('fix ', corrected_word)
                     corrected_array[word_count] = corrected_word
                     break
                 received_word = np.roll(received_word, -1)
@@ -266,16 +1077,448 @@ class Cyclic_Code(Linear_Code):
                     logger.debug('Uncorrectable Error')
                     corrected_array[word_count] = received_word
                 syndrome = np.dot(received_word, self.HT) % 2
-        # print(syndromes)
         corrected_array = corrected_array.flatten()
         return corrected_array
 
 
+
+class BCH_Code(Cyclic_Code):
+    """
+    (n, k) Systematic narrow-sense binary BCH Code, n = 2^m - 1, designed to correct t errors
+    """
+    def __init__(self, n, t, correctors = ()):
+        """
+        @type  n: int
+        @param n: code length, 2^m - 1
+
+        @type  t: int
+        @param t: designed number of correctable errors
+
+        @type  correctors: list
+        @param correctors: names of the correctors that will be used, their tables are built now (see Cyclic_Code)
+        """
+        m = n.bit_length()
+        if n != (1 << m) - 1:
+            raise ValueError(f"BCH code length must be 2^m - 1, got {n}")
+        self.field = gf.Galois_Field(m)
+        self.genPoly = gf.bchGenerator(self.field, t)
+        self.n = n
+        self.k = n - pt.order(self.genPoly)
+        if self.k <= 0:
+            raise ValueError(f"No ({n}, k) BCH code corrects {t} errors")
+        self.G_dec = pt.buildGenMatrix(self.n, self.k, self.genPoly)
+
+        # Following used in trapping corrector and BCH corrector, nECC and d_min are the designed values (the true d_min may be larger)
+        self.nECC = t
+        self.d_min = 2 * t + 1
+
+        logger.info("Generated a (%d, %d) BCH code", self.n, self.k)
+        logger.info("%d correctable errors", self.nECC)
+        self.prepare(correctors)
+
+
+    @cached_property
+    def HT_dec(self):
+        """
+        Transposed parity check matrix in integer form, built on first use
+        """
+        return pt.buildParityMatrix(self.n, self.k, self.G_dec)
+
+
+    @cached_property
+    def syndrome_matrix(self):
+        """
+        Bits of alpha^(j*p) for every position p and odd j = 1, 3, ..., 2t-1, built on first use.
+        Multiplying the received words by it gives the bits of the syndromes S_j = r(alpha^j).
+        """
+        m = self.field.m
+        exponents = np.outer(np.arange(self.n), np.arange(1, 2 * self.nECC, 2))
+        elements = self.field.power(exponents)
+        bits = (elements[:, :, None] >> np.arange(m)) & 1
+        return bits.reshape(self.n, -1).astype(np.float32)
+
+
+    def corrector_bch(self, received_array):
+        """
+        Systematic - Correct the received binary bits codeword (up to t error bits) with (n, k) BCH decoder,
+        batched syndrome evaluation, Berlekamp-Massey and Chien search over all codewords at once,
+        return the estimated TX codeword = (RX codeword + error pattern)
+
+            @type  received_array: ndarray
+            @param received_array: RX codewords
+
+            @rtype:   ndarray
+            @return:  estimated TX codewords
+        """
+        field, m, t = self.field, self.field.m, self.nECC
+        reshaped_array = received_array.reshape(-1, self.n)
+        corrected_array = reshaped_array.copy()
+
+        # Odd syndromes S_1, S_3, ..., S_2t-1 as field elements, the float product is exact for n < 2^24
+        syndrome_bits = (reshaped_array.astype(np.float32) @ self.syndrome_matrix).astype(np.int64) % 2
+        odd_syndromes = (syndrome_bits.reshape(-1, t, m) << np.arange(m)).sum(axis=2)
+
+        # Only the codewords with non-zero syndromes need decoding
+        pending = np.flatnonzero(np.any(odd_syndromes, axis=1))
+        odd_syndromes = odd_syndromes[pending]
+
+        # All syndromes S_1 ... S_2t, S_2j = S_j^2
+        syndromes = np.zeros((len(pending), 2 * t + 1), dtype=np.int64)
+        syndromes[:, 1::2] = odd_syndromes
+        for j in range(2, 2 * t + 1, 2):
+            syndromes[:, j] = field.mul(syndromes[:, j // 2], syndromes[:, j // 2])
+
+        locator = self._berlekamp_massey(syndromes)
+
+        # Chien search, error at position p when locator(alpha^-p) = 0
+        positions = np.arange(self.n)
+        degree = np.max(np.nonzero(locator)[1], initial=0)
+        uncorrectable = 0
+        for start in range(0, len(pending), CHIEN_CHUNK):
+            chunk = locator[start:start + CHIEN_CHUNK]
+            evaluation = np.zeros((len(chunk), self.n), dtype=np.int64)
+            for i in range(degree + 1):
+                term = field.exp[(field.log[chunk[:, i]][:, None] - i * positions) % field.order]
+                evaluation ^= np.where(chunk[:, i, None] != 0, term, 0)
+            errors = evaluation == 0
+
+            # The error pattern is only accepted when the locator has as many roots as its degree, and at most t of them
+            locator_degree = np.max(np.where(chunk != 0, np.arange(chunk.shape[1]), 0), axis=1)
+            success = (errors.sum(axis=1) == locator_degree) & (locator_degree <= t)
+            uncorrectable += np.count_nonzero(~success)
+            rows = pending[start:start + CHIEN_CHUNK][success]
+            corrected_array[rows] ^= errors[success].astype(np.uint8)
+
+        logger.debug('%d corrected, %d uncorrectable', len(pending) - uncorrectable, uncorrectable)
+        if instrument.enabled():
+            instrument.count('corrector_bch.words', len(reshaped_array))
+            instrument.count('corrector_bch.corrected_words', len(pending) - uncorrectable)
+            instrument.count('corrector_bch.uncorrectable_words', uncorrectable)
+
+        corrected_array = corrected_array.flatten()
+        return corrected_array
+
+
+    def _berlekamp_massey(self, syndromes):
+        """
+        Berlekamp-Massey algorithm run on all codewords at once
+
+            @type  syndromes: ndarray
+            @param syndromes: (codewords, 2t+1) syndromes, column j holds S_j
+
+            @rtype:   ndarray
+            @return:  (codewords, 2t+1) error locator polynomials, lowest order coeff first
+        """
+        field = self.field
+        num, length = syndromes.shape[0], syndromes.shape[1]
+        locator = np.zeros((num, length), dtype=np.int64)
+        locator[:, 0] = 1
+        previous = locator.copy()
+        L = np.zeros(num, dtype=np.int64)
+        shift = np.ones(num, dtype=np.int64)
+        previous_discrepancy = np.ones(num, dtype=np.int64)
+        columns = np.arange(length)
+
+        for r in range(1, length):
+            # Discrepancy d = S_r + sum_i locator_i * S_(r-i)
+            products = field.mul(locator[:, 1:r], syndromes[:, r-1:0:-1])
+            discrepancy = syndromes[:, r] ^ np.bitwise_xor.reduce(products, axis=1) if r > 1 else syndromes[:, r].copy()
+            nonzero = discrepancy != 0
+
+            # locator - d / b * x^shift * previous
+            index = columns[None, :] - shift[:, None]
+            shifted = np.where(index >= 0, np.take_along_axis(previous, np.clip(index, 0, None), axis=1), 0)
+            updated = locator ^ field.mul(field.div(discrepancy, previous_discrepancy)[:, None], shifted)
+
+            grow = nonzero & (2 * L <= r - 1)
+            previous = np.where(grow[:, None], locator, previous)
+            previous_discrepancy = np.where(grow, discrepancy, previous_discrepancy)
+            L = np.where(grow, r - L, L)
+            shift = np.where(grow, 1, shift + 1)
+            locator = np.where(nonzero[:, None], updated, locator)
+
+        return locator
+
+
+class Product_Code:
+    """
+    (n_c * n_r, k_c * k_r) Systematic Product Code of a row code (n_r, k_r) and a column code (n_c, k_c)
+
+    A message block is a k_c x k_r matrix, its rows are encoded with the row code and then the n_r columns with the column code.
+    A codeword is the n_c x n_r matrix, row by row.
+    """
+    def __init__(self, row_code, col_code, row_corrector=None, col_corrector=None, max_iterations=8):
+        """
+        @type  row_code, col_code: Linear_Code
+        @param row_code, col_code: component codes, Linear_Code, Cyclic_Code or BCH_Code
+
+        @type  row_corrector, col_corrector: callable
+        @param row_corrector, col_corrector: hard-decision correctors of the component codes
+                                             (default: corrector_trapping of a cyclic code, corrector_syndrome of the (7, 4) code)
+
+        @type  max_iterations: int
+        @param max_iterations: largest number of row and column passes of corrector_iterative
+        """
+        self.row_code = row_code
+        self.col_code = col_code
+        self.row_corrector = row_corrector or getattr(row_code, 'corrector_trapping', row_code.corrector_syndrome)
+        self.col_corrector = col_corrector or getattr(col_code, 'corrector_trapping', col_code.corrector_syndrome)
+        self.max_iterations = max_iterations
+        self.n = row_code.n * col_code.n
+        self.k = row_code.k * col_code.k
+        # d_min is the product of the component distances. Iterative row/column correction always corrects
+        # (t_r+1)(t_c+1)-1 errors if the component correctors correct every pattern of up to t_r and t_c errors:
+        # after the row pass at most t_c rows are left in error, so no column has more than t_c errors.
+        # t_r and t_c are those of the correctors, below the components' nECC for an incomplete one such as error trapping.
+        self.d_min = getattr(row_code, 'd_min', 2 * row_code.nECC + 1) * getattr(col_code, 'd_min', 2 * col_code.nECC + 1)
+        self.nECC = (row_code.corrected_weight(self.row_corrector) + 1) * (col_code.corrected_weight(self.col_corrector) + 1) - 1
+
+        logger.info("Generated a (%d, %d) product code of (%d, %d) rows and (%d, %d) columns",
+                    self.n, self.k, row_code.n, row_code.k, col_code.n, col_code.k)
+
+
+    def encoder_systematic(self, bits):
+        """
+        Systematic - Encode the to-be-transmitted binary bits message with the (n,k) product encoder, pad with zero if not divisible,
+        return the to-be-transmitted codewords
+
+            @type  bits: ndarray
+            @param bits: TX message
+
+            @rtype:   ndarray
+            @return:  TX codewords
+        """
+        # Pad the bits array with zeroes so its length is divisible by self.k
+        padded_bits = pad_bits(bits, self.k)
+
+        # Encode the rows of every message block in one batch
+        rows = self.row_code.encoder_systematic(padded_bits).reshape(-1, self.col_code.k, self.row_code.n)
+
+        # Then the columns of every block in one batch
+        columns = np.ascontiguousarray(rows.transpose(0, 2, 1)).reshape(-1)
+        encoded_array = self.col_code.encoder_systematic(columns).reshape(-1, self.row_code.n, self.col_code.n)
+
+        # Back to row order, and flatten the array
+        encoded_array = encoded_array.transpose(0, 2, 1).flatten()
+
+        return encoded_array
+
+
+    def decoder_systematic(self, encoded_array, padding_length=0):
+        """
+        Systematic - Decode the received binary bits codeword with the (n,k) product decoder, remove padding, return the received message
+
+            @type  encoded_array: ndarray
+            @param encoded_array: RX codewords
+
+            @type  padding_length: int
+            @param padding_length: length of the padding (default: 0, means no padding)
+
+            @rtype:   ndarray
+            @return:  RX message
+        """
+        # The message rows of every block, then the message bits of every row
+        blocks = encoded_array.reshape(-1, self.col_code.n, self.row_code.n)
+        message_rows = blocks[:, self.col_code.n - self.col_code.k:, :]
+        decoded_array = message_rows[:, :, self.row_code.n - self.row_code.k:].flatten()
+
+        # Remove the padding from the array
+        if padding_length != 0:
+            decoded_array = remove_padding(decoded_array, padding_length)
+
+        return decoded_array
+
+
+    def corrector_iterative(self, received_array):
+        """
+        Systematic - Correct the received binary bits codeword with alternating row and column passes,
+        every pass corrects the rows (columns) with a non-zero syndrome of all blocks in one batch.
+        A block leaves the iteration once none of its rows and columns has a syndrome.
+
+            @type  received_array: ndarray
+            @param received_array: RX codewords
+
+            @rtype:   ndarray
+            @return:  estimated TX codewords
+        """
+        n_r, n_c = self.row_code.n, self.col_code.n
+        corrected_array = received_array.reshape(-1, n_c, n_r).copy()
+        # Blocks that may still hold errors, and the blocks given up on
+        active = np.arange(len(corrected_array))
+        stalled = 0
+        passes = 0
+
+        for _ in range(self.max_iterations):
+            if len(active) == 0:
+                break
+            passes += 1
+            blocks = corrected_array[active]
+
+            # Row pass, only the rows with a non-zero syndrome go through the corrector
+            rows = blocks.reshape(-1, n_r).copy()
+            bad_rows = (np.dot(rows, self.row_code.H.T) % 2).any(axis=1)
+            if bad_rows.any():
+                rows[bad_rows] = self.row_corrector(rows[bad_rows].reshape(-1)).reshape(-1, n_r)
+
+            # Column pass on the result of the row pass
+            columns = np.ascontiguousarray(rows.reshape(-1, n_c, n_r).transpose(0, 2, 1)).reshape(-1, n_c)
+            bad_columns = (np.dot(columns, self.col_code.H.T) % 2).any(axis=1)
+            if bad_columns.any():
+                columns[bad_columns] = self.col_corrector(columns[bad_columns].reshape(-1)).reshape(-1, n_c)
+            new_blocks = columns.reshape(-1, n_r, n_c).transpose(0, 2, 1)
+            corrected_array[active] = new_blocks
+
+            # A block is done once a pass finds no syndrome, and given up once a pass no longer changes it
+            dirty = bad_rows.reshape(len(active), -1).any(axis=1) | bad_columns.reshape(len(active), -1).any(axis=1)
+            changed = (new_blocks != blocks).any(axis=(1, 2))
+            stalled += np.count_nonzero(dirty & ~changed)
+            active = active[dirty & changed]
+
+        if instrument.enabled():
+            instrument.count('corrector_iterative.words', len(corrected_array))
+            instrument.count('corrector_iterative.passes', passes)
+            instrument.count('corrector_iterative.uncorrectable_words', stalled + len(active))
+
+        # Flatten corrected_array to match the shape of the input received_array
+        corrected_array = corrected_array.flatten()
+
+        return corrected_array
+
+
+
 class Channel:
     """
     Channel
+
+    The BSC errors of transmitted bits [j * NOISE_BLOCK_BITS, (j+1) * NOISE_BLOCK_BITS) are drawn from substream j,
+    spawned from the seed, so they depend only on the seed and the bit positions. A stream sent in one call, in chunks,
+    or split across processes (each passing the offset of its chunk) sees the same errors.
+
+    The Gilbert-Elliott channel keeps its state between calls. The exits from a state and the flips in it are drawn
+    like BSC errors over the bits spent in that state, so a stream sent in one call or in chunks sees the same errors.
     """
-    def binary_symmetric_channel(self, input_bits, p):
+    def __init__(self, seed=None):
+        """
+        @type  seed: None, int, SeedSequence or Generator
+        @param seed: seed of the random streams (default: None, fresh entropy from the OS)
+        """
+        if isinstance(seed, np.random.Generator):
+            seed = np.random.SeedSequence(seed.integers(1 << 62, size=4))
+        elif not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        # Generator of the sequential draws (AWGN noise, test messages)
+        self.rng = np.random.default_rng(seed)
+        # Position in the transmitted stream of the next bit, used when no offset is given
+        self.position = 0
+        # Last noise block drawn of every noise stream, as [block, p, generator, flip positions drawn so far],
+        # flips are drawn up to the end of each call and later calls within the block continue the draw
+        self._noise_blocks = {}
+        # State of the next bit of the Gilbert-Elliott channel (None before its first call), bits spent in the good and bad state
+        self.ge_bad = None
+        self.ge_time = [0, 0]
+
+
+    def substream(self, index, stream=()):
+        """
+        Random generator of the index-th substream, the same as the index-th child of seed_sequence.spawn()
+
+            @type  index: int
+            @param index: substream index
+
+            @type  stream: tuple
+            @param stream: key of the noise stream, appended to the spawn key (default: (), the BSC)
+
+            @rtype:   Generator
+            @return:  random number generator
+        """
+        child = np.random.SeedSequence(self.seed_sequence.entropy,
+                                       spawn_key=self.seed_sequence.spawn_key + (index,) + stream,
+                                       pool_size=self.seed_sequence.pool_size)
+        return np.random.default_rng(child)
+
+
+    def _block_flip_positions(self, block, p, end, stream=()):
+        """
+        Flip positions within a noise block of a stream, drawn at least up to end, relative to the start of the block
+        """
+        cached = self._noise_blocks.get(stream)
+        if cached is None or cached[:2] != [block, p]:
+            cached = [block, p, self.substream(block, stream), np.zeros(0, dtype=np.int64)]
+            self._noise_blocks[stream] = cached
+        if len(cached[3]) == 0 or cached[3][-1] < end:
+            cached[3] = extend_flip_positions(cached[3], end, p, cached[2])
+        return cached[3]
+
+
+    def _stream_flip_positions(self, length, p, offset, stream=()):
+        """
+        Flip positions of a BSC over the bits [offset, offset + length) of a noise stream, relative to offset
+        """
+        if p <= 0 or length == 0:
+            return np.zeros(0, dtype=np.int64)
+        if p >= 1:
+            return np.arange(length, dtype=np.int64)
+
+        positions = [np.zeros(0, dtype=np.int64)]
+        end = offset + length
+        for block in range(offset // NOISE_BLOCK_BITS, -(-end // NOISE_BLOCK_BITS)):
+            start = block * NOISE_BLOCK_BITS
+            stop = min(end - start, NOISE_BLOCK_BITS)
+            flips = self._block_flip_positions(block, p, stop, stream)
+            window = flips[np.searchsorted(flips, offset - start):np.searchsorted(flips, stop)]
+            positions.append(window + (start - offset))
+        return np.concatenate(positions)
+
+
+    def _bsc_flip_positions(self, length, p, offset):
+        """
+        Flip positions of a BSC over the transmitted bits [offset, offset + length), relative to offset
+        """
+        if offset is None:
+            offset = self.position
+        self.position = offset + length
+        return self._stream_flip_positions(length, p, offset)
+
+
+    def _ge_flip_positions(self, length, p_gb, p_bg, p_g, p_b):
+        """
+        Flip positions of the Gilbert-Elliott channel over the next length bits, continuing from its state
+        """
+        if self.ge_bad is None:
+            total = p_gb + p_bg
+            self.ge_bad = self.substream(0, GE_FIRST_STATE).random() < (p_gb / total if total > 0 else 0)
+        if length == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # A state is left at its exits, so its runs are the gaps between them; a last run past every exit outlasts the stream
+        sojourns = []
+        for bad, p in ((False, p_gb), (True, p_bg)):
+            exits = self._stream_flip_positions(length, p, self.ge_time[bad], GE_EXITS[bad])
+            sojourns.append(np.append(np.diff(exits, prepend=-1), length + 1))
+        first, second = sojourns[::-1] if self.ge_bad else sojourns
+        pairs = min(len(first), len(second))
+        runs = np.empty(2 * pairs, dtype=np.int64)
+        runs[0::2] = first[:pairs]
+        runs[1::2] = second[:pairs]
+        run_starts, run_lengths, run_bad = cut_runs(runs, length, self.ge_bad)
+
+        positions = []
+        for bad, p in ((False, p_g), (True, p_b)):
+            in_state = run_bad == bad
+            spent = int(run_lengths[in_state].sum())
+            local = self._stream_flip_positions(spent, p, self.ge_time[bad], GE_FLIPS[bad])
+            positions.append(runs_to_stream(run_starts[in_state], run_lengths[in_state], local))
+            self.ge_time[bad] += spent
+        # The next bit stays in the state of the last run, unless that run ended with the stream
+        if run_starts[-1] + runs[len(run_starts) - 1] == length:
+            self.ge_bad = not run_bad[-1]
+        else:
+            self.ge_bad = bool(run_bad[-1])
+        return np.sort(np.concatenate(positions))
+
+
+    def binary_symmetric_channel(self, input_bits, p, offset=None):
         """
         BSC - binary symmetric channel with adjustable error probability
 
@@ -285,21 +1528,95 @@ class Channel:
             @type  p: float
             @param p: error_probability
 
+            @type  offset: int
+            @param offset: position of the first bit in the transmitted stream (default: None, continue after the previous call)
+
             @rtype:   ndarray
             @return:  RX codewords
         """
-        # Generate a uniform random array of the same shape as input_bits
-        random_numbers = np.random.rand(*input_bits.shape)
-        
-        # Identify where the random array is less than p
-        mask = random_numbers < p
-        
-        # Use this mask to flip the bits at those indices
-        output_bits = np.where(mask, 1 - input_bits, input_bits)
+        # Draw only the flipped positions and XOR them into a copy
+        output_bits = input_bits.copy()
+        output_bits.reshape(-1)[self._bsc_flip_positions(output_bits.size, p, offset)] ^= 1
 
         return output_bits
 
 
+    def gilbert_elliott_channel(self, input_bits, p_gb, p_bg, p_g=0.0, p_b=0.5):
+        """
+        Gilbert-Elliott channel - two-state Markov channel with bursty errors.
+        Every bit the good state moves to the bad state with probability p_gb and the bad state to the good state with probability p_bg,
+        the bits are flipped with probability p_g in the good state and p_b in the bad state.
+        The first call starts from the stationary distribution, every later call continues from the state the previous one left.
+
+            @type  input_bits: ndarray
+            @param input_bits: TX codewords
+
+            @type  p_gb, p_bg: float
+            @param p_gb, p_bg: transition probability per bit from good to bad, from bad to good
+
+            @type  p_g, p_b: float
+            @param p_g, p_b: error probability in the good state, in the bad state (default: 0 and 0.5, the Gilbert channel)
+
+            @rtype:   ndarray
+            @return:  RX codewords
+        """
+        output_bits = input_bits.copy()
+        output_bits.reshape(-1)[self._ge_flip_positions(output_bits.size, p_gb, p_bg, p_g, p_b)] ^= 1
+
+        return output_bits
+
+
+    def awgn_channel(self, input_bits, ebn0_db, rate=1.0):
+        """
+        AWGN - BPSK (bit 0 as +1, bit 1 as -1) over the additive white Gaussian noise channel, soft output.
+        The hard decisions are (y < 0) and |y| is the reliability of every bit, e.g. for corrector_chase.
+
+            @type  input_bits: ndarray
+            @param input_bits: TX codewords
+
+            @type  ebn0_db: float
+            @param ebn0_db: Eb/N0 per message bit, in dB
+
+            @type  rate: float
+            @param rate: code rate k/n, the energy per coded bit is rate * Eb
+
+            @rtype:   ndarray
+            @return:  received values y = x + noise, float64
+        """
+        sigma = np.sqrt(1 / (2 * rate * 10 ** (ebn0_db / 10)))
+        symbols = 1.0 - 2.0 * input_bits
+        return symbols + self.rng.normal(0.0, sigma, size=symbols.shape)
+
+
+    def binary_symmetric_channel_packed(self, codewords, n, p, offset=None):
+        """
+        BSC - binary symmetric channel on packed codewords, flips bits of the n-bit codewords only.
+        Gives the same errors as binary_symmetric_channel on the unpacked codewords.
+
+            @type  codewords: ndarray
+            @param codewords: packed TX codewords
+
+            @type  n: int
+            @param n: number of bits per codeword
+
+            @type  p: float
+            @param p: error_probability
+
+            @type  offset: int
+            @param offset: position of the first bit in the transmitted stream (default: None, continue after the previous call)
+
+            @rtype:   ndarray
+            @return:  packed RX codewords
+        """
+        output_words = np.array(codewords, dtype=np.uint64)
+        row, bit = np.divmod(self._bsc_flip_positions(len(output_words) * n, p, offset), n)
+
+        # Several flips may hit the same word, so accumulate them unbuffered
+        np.bitwise_xor.at(output_words, (row, bit // 64), np.uint64(1) << (bit % 64).astype(np.uint64))
+
+        return output_words
+
+
 
 if __name__ == '__main__':
     # test
@@ -6,7 +6,7 @@ import os
 import source
 import channel
 import destination
-from Utils import plot_wav, stat_analysis
+from Utils import plot_wav, stat_analysis, instrument
 
 
 
@@ -17,11 +17,14 @@ from Utils import plot_wav, stat_analysis
 # FLAG_TRAPPING = False
 
 # Work with (15, 11, 1) (15, 7, 2) (15, 5, 3) (31, 26, 1) (31, 21, 2) (31, 16, 3) (31, 11, 5) (31, 6, 7) cyclic code
-# Trapping corrector
+# Trapping corrector | syndrome look-up table corrector (2^(n-k) * n bytes, at most 256 MB)
 N, K = 31, 6
 FLAG_SYNDROME = False
 FLAG_TRAPPING = True
 
+# Record per-stage wall/CPU time, throughput, allocations and corrector counters, written next to the log
+FLAG_PROFILE = False
+
 
 # Check if the directory exists
 if not os.path.exists(f'Result/Cyclic/{N}-{K}/'):
@@ -51,22 +54,25 @@ def cyclic_txt():
     dest = destination.Destination()
 
 
-    src.read_txt("Resource/hardcoded.txt")
+    with instrument.stage('read_txt') as record:
+        src.read_txt("Resource/hardcoded.txt")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
     padding_length = (- len(tx_msg)) % K
 
-    tx_codeword = cyclic_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = cyclic_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, N)
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(N).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
     nECC = cyclic_code.nECC
-    multiple_error_codewords = []
-    for i in range(1, nECC+1):
-        multiple_error_codewords.append(stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, i, N))
-    total_codewords = len(tx_codeword) // N
-    uncorrectable_codewords = total_codewords - correct_codewords - sum(multiple_error_codewords)
+    multiple_error_codewords = [channel_stats.num_blocks_with_t_errors(i) for i in range(1, nECC+1)]
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(nECC)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -76,31 +82,41 @@ def cyclic_txt():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
-    dest.write_txt(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output.txt")
+    with instrument.stage('write_txt', rx_msg.size):
+        dest.write_txt(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
     if FLAG_SYNDROME:
-        estimated_tx_codeword = cyclic_code.corrector_syndrome(rx_codeword)
+        with instrument.stage('corrector_syndrome_lookup', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_syndrome_lookup(rx_codeword)
     elif FLAG_TRAPPING:
-        estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
-    rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
+        with instrument.stage('corrector_trapping', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
     if FLAG_SYNDROME:
-        dest.write_txt(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.txt")
+        with instrument.stage('write_txt', rx_msg.size):
+            dest.write_txt(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.txt")
     elif FLAG_TRAPPING:
-        dest.write_txt(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.txt")
+        with instrument.stage('write_txt', rx_msg.size):
+            dest.write_txt(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     if FLAG_SYNDROME:
         logger.info("After correction (syndrome):")
     elif FLAG_TRAPPING:
@@ -108,6 +124,7 @@ def cyclic_txt():
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def cyclic_png():
@@ -123,22 +140,25 @@ def cyclic_png():
     dest = destination.Destination()
 
 
-    height, width, channels = src.read_png("Resource/image.png")
+    with instrument.stage('read_png') as record:
+        height, width, channels = src.read_png("Resource/image.png")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
     padding_length = (- len(tx_msg)) % K
 
-    tx_codeword = cyclic_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = cyclic_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, N)
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(N).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
     nECC = cyclic_code.nECC
-    multiple_error_codewords = []
-    for i in range(1, nECC+1):
-        multiple_error_codewords.append(stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, i, N))
-    total_codewords = len(tx_codeword) // N
-    uncorrectable_codewords = total_codewords - correct_codewords - sum(multiple_error_codewords)
+    multiple_error_codewords = [channel_stats.num_blocks_with_t_errors(i) for i in range(1, nECC+1)]
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(nECC)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -148,31 +168,41 @@ def cyclic_png():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
-    dest.write_png_from_digital(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output.png", height, width, channels)
+    with instrument.stage('write_png_from_digital', rx_msg.size):
+        dest.write_png_from_digital(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
     if FLAG_SYNDROME:
-        estimated_tx_codeword = cyclic_code.corrector_syndrome(rx_codeword)
+        with instrument.stage('corrector_syndrome_lookup', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_syndrome_lookup(rx_codeword)
     elif FLAG_TRAPPING:
-        estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
-    rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
+        with instrument.stage('corrector_trapping', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
     if FLAG_SYNDROME:
-        dest.write_png_from_digital(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.png", height, width, channels)
+        with instrument.stage('write_png_from_digital', rx_msg.size):
+            dest.write_png_from_digital(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.png", height, width, channels)
     elif FLAG_TRAPPING:
-        dest.write_png_from_digital(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.png", height, width, channels)
+        with instrument.stage('write_png_from_digital', rx_msg.size):
+            dest.write_png_from_digital(f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     if FLAG_SYNDROME:
         logger.info("After correction (syndrome):")
     elif FLAG_TRAPPING:
@@ -180,6 +210,7 @@ def cyclic_png():
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def cyclic_wav():
@@ -195,7 +226,9 @@ def cyclic_wav():
     dest = destination.Destination()
 
 
-    shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+    with instrument.stage('read_wav') as record:
+        shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+        record.bits = src.get_digital_data().size
     plot_wav.plot_wav_time_domain(src.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/wav-time-domain-TX.png")
     plot_wav.plot_wav_frequency_domain(src.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/wav-frequency-domain-TX.png")
 
@@ -210,18 +243,19 @@ def cyclic_wav():
     tx_msg = src.get_digital_data()
     padding_length = (- len(tx_msg)) % K
 
-    tx_codeword = cyclic_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = cyclic_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, N)
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(N).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
     nECC = cyclic_code.nECC
-    multiple_error_codewords = []
-    for i in range(1, nECC+1):
-        multiple_error_codewords.append(stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, i, N))
-    total_codewords = len(tx_codeword) // N
-    uncorrectable_codewords = total_codewords - correct_codewords - sum(multiple_error_codewords)
+    multiple_error_codewords = [channel_stats.num_blocks_with_t_errors(i) for i in range(1, nECC+1)]
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(nECC)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -231,41 +265,51 @@ def cyclic_wav():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
 
     dest.set_digital_data(rx_msg)
-    dest.write_wav_from_digital(shape, sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-output.wav")
+    with instrument.stage('write_wav_from_digital', rx_msg.size):
+        dest.write_wav_from_digital(shape, sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-output.wav")
 
     plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-wav-time-domain-RX.png")
     plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-wav-frequency-domain-RX.png")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
     if FLAG_SYNDROME:
-        estimated_tx_codeword = cyclic_code.corrector_syndrome(rx_codeword)
+        with instrument.stage('corrector_syndrome_lookup', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_syndrome_lookup(rx_codeword)
     elif FLAG_TRAPPING:
-        estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
-    rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
+        with instrument.stage('corrector_trapping', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
 
     dest.set_digital_data(rx_msg)
     if FLAG_SYNDROME:
-        dest.write_wav_from_digital(shape, sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.wav")
+        with instrument.stage('write_wav_from_digital', rx_msg.size):
+            dest.write_wav_from_digital(shape, sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.wav")
         plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-wav-time-domain-RX-syndrome-corrected.png")
         plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-wav-frequency-domain-RX-syndrome-corrected.png")
     elif FLAG_TRAPPING:
-        dest.write_wav_from_digital(shape, sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.wav")
+        with instrument.stage('write_wav_from_digital', rx_msg.size):
+            dest.write_wav_from_digital(shape, sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.wav")
         plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-wav-time-domain-RX-trapping-corrected.png")
         plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, f"Result/Cyclic/{N}-{K}/cyclic-bsc-wav-frequency-domain-RX-trapping-corrected.png")
 
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     if FLAG_SYNDROME:
         logger.info("After correction (syndrome):")
     elif FLAG_TRAPPING:
@@ -273,9 +317,14 @@ def cyclic_wav():
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 if __name__ == '__main__':
+    if FLAG_PROFILE:
+        instrument.enable(f'cyclic-{N}-{K}')
     cyclic_txt()
     cyclic_png()
-    cyclic_wav()
\ No newline at end of file
+    cyclic_wav()
+    if FLAG_PROFILE:
+        instrument.write_json(f'Result/Cyclic/{N}-{K}/profile-cyclic.json')
\ No newline at end of file
@@ -6,7 +6,7 @@ import os
 import source
 import channel
 import destination
-from Utils import plot_wav, stat_analysis
+from Utils import plot_wav, stat_analysis, instrument
 
 
 ''' 1st choose the code type '''
@@ -24,7 +24,7 @@ FLAG_SYSTEMATIC_CYCLIC_CODE = True
 # FLAG_TRAPPING = False
 
 # Encoder: (15, 11, 1) (15, 7, 2) (15, 5, 3) (31, 26, 1) (31, 21, 2) (31, 16, 3) (31, 11, 5) (31, 6, 7) cyclic code
-# Decoder: Trapping corrector
+# Decoder: Trapping corrector | syndrome look-up table corrector (2^(n-k) * n bytes, at most 256 MB)
 N, K = 31, 16
 FLAG_SYNDROME = False
 FLAG_TRAPPING = True
@@ -45,6 +45,10 @@ FLAG_WAV = False
 # PNG_PATH = "image3.png"
 PNG_PATH = "image4.png"
 
+''' 5th choose whether to profile '''
+# Record per-stage wall/CPU time, throughput, allocations and corrector counters, written to Result/Demo/profile.json
+FLAG_PROFILE = False
+
 
 
 
@@ -89,18 +93,23 @@ def linear_txt():
     dest = destination.Destination()
 
 
-    src.read_txt("Resource/hardcoded.txt")
+    with instrument.stage('read_txt') as record:
+        src.read_txt("Resource/hardcoded.txt")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
 
-    tx_codeword = linear_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = linear_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, 7)
-    one_error_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 1, 7)
-    total_codewords = len(tx_codeword) // 7
-    uncorrectable_codewords = total_codewords - correct_codewords - one_error_codewords
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(7).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
+    one_error_codewords = channel_stats.num_blocks_with_t_errors(1)
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(1)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -109,29 +118,38 @@ def linear_txt():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = linear_code.decoder_systematic(rx_codeword)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(rx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_txt("Result/Demo/Linear/linear-bsc-output.txt")
+    with instrument.stage('write_txt', rx_msg.size):
+        dest.write_txt("Result/Demo/Linear/linear-bsc-output.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
-    estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
-    rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
+    with instrument.stage('corrector_syndrome', rx_codeword.size):
+        estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_txt("Result/Demo/Linear/linear-bsc-output-syndrome-corrected.txt")
+    with instrument.stage('write_txt', rx_msg.size):
+        dest.write_txt("Result/Demo/Linear/linear-bsc-output-syndrome-corrected.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("After correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def linear_png():
@@ -147,18 +165,23 @@ def linear_png():
     dest = destination.Destination()
 
 
-    height, width, channels = src.read_png(f"Resource/{PNG_PATH}")
+    with instrument.stage('read_png') as record:
+        height, width, channels = src.read_png(f"Resource/{PNG_PATH}")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
 
-    tx_codeword = linear_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = linear_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, 7)
-    one_error_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 1, 7)
-    total_codewords = len(tx_codeword) // 7
-    uncorrectable_codewords = total_codewords - correct_codewords - one_error_codewords
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(7).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
+    one_error_codewords = channel_stats.num_blocks_with_t_errors(1)
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(1)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -167,29 +190,38 @@ def linear_png():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = linear_code.decoder_systematic(rx_codeword)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(rx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_png_from_digital("Result/Demo/Linear/linear-bsc-output.png", height, width, channels)
+    with instrument.stage('write_png_from_digital', rx_msg.size):
+        dest.write_png_from_digital("Result/Demo/Linear/linear-bsc-output.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
-    estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
-    rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
+    with instrument.stage('corrector_syndrome', rx_codeword.size):
+        estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_png_from_digital("Result/Demo/Linear/linear-bsc-output-syndrome-corrected.png", height, width, channels)
+    with instrument.stage('write_png_from_digital', rx_msg.size):
+        dest.write_png_from_digital("Result/Demo/Linear/linear-bsc-output-syndrome-corrected.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("After correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def linear_wav():
@@ -205,7 +237,9 @@ def linear_wav():
     dest = destination.Destination()
 
 
-    shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+    with instrument.stage('read_wav') as record:
+        shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+        record.bits = src.get_digital_data().size
     plot_wav.plot_wav_time_domain(src.get_analogue_data(), sample_rate, "Result/Demo/Linear/wav-time-domain-TX.png")
     plot_wav.plot_wav_frequency_domain(src.get_analogue_data(), sample_rate, "Result/Demo/Linear/wav-frequency-domain-TX.png")
 
@@ -219,15 +253,18 @@ def linear_wav():
 
     tx_msg = src.get_digital_data()
 
-    tx_codeword = linear_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = linear_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, 7)
-    one_error_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 1, 7)
-    total_codewords = len(tx_codeword) // 7
-    uncorrectable_codewords = total_codewords - correct_codewords - one_error_codewords
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(7).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
+    one_error_codewords = channel_stats.num_blocks_with_t_errors(1)
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(1)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -236,37 +273,46 @@ def linear_wav():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = linear_code.decoder_systematic(rx_codeword)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(rx_codeword)
 
     dest.set_digital_data(rx_msg)
-    dest.write_wav_from_digital(shape, sample_rate, "Result/Demo/Linear/linear-bsc-output.wav")
+    with instrument.stage('write_wav_from_digital', rx_msg.size):
+        dest.write_wav_from_digital(shape, sample_rate, "Result/Demo/Linear/linear-bsc-output.wav")
 
     plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, "Result/Demo/Linear/linear-bsc-wav-time-domain-RX.png")
     plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, "Result/Demo/Linear/linear-bsc-wav-frequency-domain-RX.png")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
-    estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
-    rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
+    with instrument.stage('corrector_syndrome', rx_codeword.size):
+        estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
 
     dest.set_digital_data(rx_msg)
-    dest.write_wav_from_digital(shape, sample_rate, "Result/Demo/Linear/linear-bsc-output-syndrome-corrected.wav")
+    with instrument.stage('write_wav_from_digital', rx_msg.size):
+        dest.write_wav_from_digital(shape, sample_rate, "Result/Demo/Linear/linear-bsc-output-syndrome-corrected.wav")
 
     plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, "Result/Demo/Linear/linear-bsc-wav-time-domain-RX-syndrome-corrected.png")
     plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, "Result/Demo/Linear/linear-bsc-wav-frequency-domain-RX-syndrome-corrected.png")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("After correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 
@@ -283,22 +329,25 @@ def cyclic_txt():
     dest = destination.Destination()
 
 
-    src.read_txt("Resource/hardcoded.txt")
+    with instrument.stage('read_txt') as record:
+        src.read_txt("Resource/hardcoded.txt")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
     padding_length = (- len(tx_msg)) % K
 
-    tx_codeword = cyclic_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = cyclic_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, N)
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(N).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
     nECC = cyclic_code.nECC
-    multiple_error_codewords = []
-    for i in range(1, nECC+1):
-        multiple_error_codewords.append(stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, i, N))
-    total_codewords = len(tx_codeword) // N
-    uncorrectable_codewords = total_codewords - correct_codewords - sum(multiple_error_codewords)
+    multiple_error_codewords = [channel_stats.num_blocks_with_t_errors(i) for i in range(1, nECC+1)]
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(nECC)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -308,31 +357,41 @@ def cyclic_txt():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
-    dest.write_txt(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output.txt")
+    with instrument.stage('write_txt', rx_msg.size):
+        dest.write_txt(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
     if FLAG_SYNDROME:
-        estimated_tx_codeword = cyclic_code.corrector_syndrome(rx_codeword)
+        with instrument.stage('corrector_syndrome_lookup', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_syndrome_lookup(rx_codeword)
     elif FLAG_TRAPPING:
-        estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
-    rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
+        with instrument.stage('corrector_trapping', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
     if FLAG_SYNDROME:
-        dest.write_txt(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.txt")
+        with instrument.stage('write_txt', rx_msg.size):
+            dest.write_txt(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.txt")
     elif FLAG_TRAPPING:
-        dest.write_txt(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.txt")
+        with instrument.stage('write_txt', rx_msg.size):
+            dest.write_txt(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     if FLAG_SYNDROME:
         logger.info("After correction (syndrome):")
     elif FLAG_TRAPPING:
@@ -340,6 +399,7 @@ def cyclic_txt():
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def cyclic_png():
@@ -355,22 +415,25 @@ def cyclic_png():
     dest = destination.Destination()
 
 
-    height, width, channels = src.read_png(f"Resource/{PNG_PATH}")
+    with instrument.stage('read_png') as record:
+        height, width, channels = src.read_png(f"Resource/{PNG_PATH}")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
     padding_length = (- len(tx_msg)) % K
 
-    tx_codeword = cyclic_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = cyclic_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, N)
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(N).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
     nECC = cyclic_code.nECC
-    multiple_error_codewords = []
-    for i in range(1, nECC+1):
-        multiple_error_codewords.append(stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, i, N))
-    total_codewords = len(tx_codeword) // N
-    uncorrectable_codewords = total_codewords - correct_codewords - sum(multiple_error_codewords)
+    multiple_error_codewords = [channel_stats.num_blocks_with_t_errors(i) for i in range(1, nECC+1)]
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(nECC)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -380,31 +443,41 @@ def cyclic_png():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
-    dest.write_png_from_digital(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output.png", height, width, channels)
+    with instrument.stage('write_png_from_digital', rx_msg.size):
+        dest.write_png_from_digital(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
     if FLAG_SYNDROME:
-        estimated_tx_codeword = cyclic_code.corrector_syndrome(rx_codeword)
+        with instrument.stage('corrector_syndrome_lookup', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_syndrome_lookup(rx_codeword)
     elif FLAG_TRAPPING:
-        estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
-    rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
+        with instrument.stage('corrector_trapping', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
     dest.set_digital_data(rx_msg)
     if FLAG_SYNDROME:
-        dest.write_png_from_digital(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.png", height, width, channels)
+        with instrument.stage('write_png_from_digital', rx_msg.size):
+            dest.write_png_from_digital(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.png", height, width, channels)
     elif FLAG_TRAPPING:
-        dest.write_png_from_digital(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.png", height, width, channels)
+        with instrument.stage('write_png_from_digital', rx_msg.size):
+            dest.write_png_from_digital(f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     if FLAG_SYNDROME:
         logger.info("After correction (syndrome):")
     elif FLAG_TRAPPING:
@@ -412,6 +485,7 @@ def cyclic_png():
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def cyclic_wav():
@@ -427,7 +501,9 @@ def cyclic_wav():
     dest = destination.Destination()
 
 
-    shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+    with instrument.stage('read_wav') as record:
+        shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+        record.bits = src.get_digital_data().size
     plot_wav.plot_wav_time_domain(src.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/wav-time-domain-TX.png")
     plot_wav.plot_wav_frequency_domain(src.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/wav-frequency-domain-TX.png")
 
@@ -442,18 +518,19 @@ def cyclic_wav():
     tx_msg = src.get_digital_data()
     padding_length = (- len(tx_msg)) % K
 
-    tx_codeword = cyclic_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = cyclic_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, ERROR_PROB)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, N)
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(N).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
     nECC = cyclic_code.nECC
-    multiple_error_codewords = []
-    for i in range(1, nECC+1):
-        multiple_error_codewords.append(stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, i, N))
-    total_codewords = len(tx_codeword) // N
-    uncorrectable_codewords = total_codewords - correct_codewords - sum(multiple_error_codewords)
+    multiple_error_codewords = [channel_stats.num_blocks_with_t_errors(i) for i in range(1, nECC+1)]
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(nECC)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -463,41 +540,51 @@ def cyclic_wav():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(rx_codeword, padding_length)
 
     dest.set_digital_data(rx_msg)
-    dest.write_wav_from_digital(shape, sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output.wav")
+    with instrument.stage('write_wav_from_digital', rx_msg.size):
+        dest.write_wav_from_digital(shape, sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output.wav")
 
     plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-wav-time-domain-RX.png")
     plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-wav-frequency-domain-RX.png")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
     if FLAG_SYNDROME:
-        estimated_tx_codeword = cyclic_code.corrector_syndrome(rx_codeword)
+        with instrument.stage('corrector_syndrome_lookup', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_syndrome_lookup(rx_codeword)
     elif FLAG_TRAPPING:
-        estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
-    rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
+        with instrument.stage('corrector_trapping', rx_codeword.size):
+            estimated_tx_codeword = cyclic_code.corrector_trapping(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = cyclic_code.decoder_systematic(estimated_tx_codeword, padding_length)
 
     dest.set_digital_data(rx_msg)
     if FLAG_SYNDROME:
-        dest.write_wav_from_digital(shape, sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.wav")
+        with instrument.stage('write_wav_from_digital', rx_msg.size):
+            dest.write_wav_from_digital(shape, sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-syndrome-corrected.wav")
         plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-wav-time-domain-RX-syndrome-corrected.png")
         plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-wav-frequency-domain-RX-syndrome-corrected.png")
     elif FLAG_TRAPPING:
-        dest.write_wav_from_digital(shape, sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.wav")
+        with instrument.stage('write_wav_from_digital', rx_msg.size):
+            dest.write_wav_from_digital(shape, sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-output-trapping-corrected.wav")
         plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-wav-time-domain-RX-trapping-corrected.png")
         plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, f"Result/Demo/Cyclic/{N}-{K}/cyclic-bsc-wav-frequency-domain-RX-trapping-corrected.png")
 
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(K).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     if FLAG_SYNDROME:
         logger.info("After correction (syndrome):")
     elif FLAG_TRAPPING:
@@ -505,10 +592,14 @@ def cyclic_wav():
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 
 if __name__ == '__main__':
+    if FLAG_PROFILE:
+        instrument.enable('demo')
+
     if FLAG_SYSTEMATIC_HAMMING_LINEAR_CODE:
         if FLAG_TXT:
             print("Linear: TXT")
@@ -529,4 +620,7 @@ if __name__ == '__main__':
             cyclic_png()
         if FLAG_WAV:
             print("Cyclic: WAV")
-            cyclic_wav()
\ No newline at end of file
+            cyclic_wav()
+
+    if FLAG_PROFILE:
+        instrument.write_json('Result/Demo/profile.json')
@@ -10,6 +10,32 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+
+def pack_blocks(blocks, unit_bytes=1):
+    """
+    Pack a stream of bit blocks into bytes, yield whole units of unit_bytes bytes, leftover bits are carried to the next block
+
+        @type  blocks: iterable
+        @param blocks: data bits of every block
+
+        @type  unit_bytes: int
+        @param unit_bytes: every yielded array holds a multiple of unit_bytes bytes (e.g. one audio frame)
+
+        @rtype:   generator
+        @return:  uint8 array of every block
+    """
+    unit_bits = 8 * unit_bytes
+    leftover = np.zeros(0, dtype=np.uint8)
+    for bits in blocks:
+        bits = np.concatenate((leftover, bits)) if len(leftover) else bits
+        whole = len(bits) - len(bits) % unit_bits
+        leftover = bits[whole:]
+        if whole:
+            yield np.packbits(bits[:whole])
+    if len(leftover):
+        logger.warning("Dropped %d trailing bits, not a whole unit of %d bytes", len(leftover), unit_bytes)
+
+
 class Destination:
     """
     The destination
@@ -158,6 +184,74 @@ class Destination:
         self._digital_data = bits
 
 
+    def write_txt_blocks(self, blocks, dest_path):
+        """
+        Write a stream of bit blocks to a text file, appending as blocks arrive
+
+            @type  blocks: iterable
+            @param blocks: data bits of every block
+
+            @type  dest_path: string
+            @param dest_path: destination file path, with extension
+        """
+        with open(dest_path, 'wb') as file:
+            for byte_array in pack_blocks(blocks):
+                file.write(byte_array.tobytes())
+
+
+    def write_png_blocks(self, blocks, dest_path, height, width, channels):
+        """
+        Write a stream of bit blocks to a png file.
+        The png encoder needs the whole image, so the blocks are packed into a preallocated pixel buffer.
+
+            @type  blocks: iterable
+            @param blocks: data bits of every block
+
+            @type  dest_path: string
+            @param dest_path: destination file path, with extension
+
+            @type  height: int
+            @param height: height of the image
+
+            @type  width: int
+            @param width: width of the image
+
+            @type  channels: int
+            @param channels: channels of the image
+        """
+        pixels = np.zeros(height * width * channels, dtype=np.uint8)
+        filled = 0
+        for byte_array in pack_blocks(blocks):
+            length = min(len(byte_array), len(pixels) - filled)
+            pixels[filled:filled + length] = byte_array[:length]
+            filled += length
+
+        Image.fromarray(pixels.reshape(height, width, channels)).save(dest_path)
+
+
+    def write_wav_blocks(self, blocks, shape, sample_rate, dest_path):
+        """
+        Write a stream of bit blocks to a wav file, appending as blocks arrive
+
+            @type  blocks: iterable
+            @param blocks: data bits of every block
+
+            @type  shape: tuple
+            @param shape: shape of the audio array, (frames,) or (frames, channels)
+
+            @type  sample_rate: int
+            @param sample_rate: sample rate of the audio
+
+            @type  dest_path: string
+            @param dest_path: destination file path, with extension
+        """
+        channels = shape[1] if len(shape) > 1 else 1
+        # 2 bytes per int16 sample
+        with sf.SoundFile(dest_path, 'w', sample_rate, channels, subtype='PCM_16') as file:
+            for byte_array in pack_blocks(blocks, 2 * channels):
+                file.write(byte_array.view(np.int16).reshape(-1, channels))
+
+
     # def write_mp3_from_digital(self, frame_rate, sample_width, channels, dest_path):
     #     """
     #     Write audio information in bits array to a mp3 file
@@ -0,0 +1,332 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import source
+import channel
+import destination
+import simulation
+from Utils import plot_wav, stat_analysis, instrument
+
+# Create a logger in this module
+logger = logging.getLogger(__name__)
+
+# Source files, the largest first so the longest jobs start early
+SOURCES = {
+    'wav': "Resource/file_example_WAV_1MG.wav",
+    'png': "Resource/image.png",
+    'txt': "Resource/hardcoded.txt",
+}
+# Codes of the Result/Cyclic tree, see parse_code
+CYCLIC_CODES = ['3-1', '7-4', '15-11', '15-7', '15-5', '31-26', '31-21', '31-16', '31-11', '31-6', '63-57']
+# Correctors tried on every code, the ones a code does not have (or cannot afford) are skipped
+CORRECTORS = ['syndrome_lookup', 'trapping']
+ERROR_PROBS = [0.01]
+
+
+
+def parse_code(text):
+    """
+    Code spec (see simulation.make_code) of a command line code name
+
+        @type  text: string
+        @param text: 'linear', 'N-K' or 'N-K-T' for a cyclic code, 'bch-N-T' for a BCH code
+
+        @rtype:   tuple
+        @return:  code spec
+    """
+    if text == 'linear':
+        return ('linear',)
+    fields = text.split('-')
+    if fields[0] == 'bch' and len(fields) == 3:
+        return ('bch', int(fields[1]), int(fields[2]))
+    if len(fields) in (2, 3) and all(field.isdigit() for field in fields):
+        return ('cyclic', int(fields[0]), int(fields[1]), int(fields[2]) if len(fields) == 3 else None)
+    raise argparse.ArgumentTypeError(f"Unknown code {text}, expected linear, N-K, N-K-T or bch-N-T")
+
+
+def code_directory(code, result_dir, p, several_probs):
+    """
+    Output directory and file name prefix of a code, the layout of the Result tree.
+    Every p gets its own sub-directory when several are run.
+
+        @rtype:   tuple
+        @return:  directory, prefix
+    """
+    if isinstance(code, channel.BCH_Code):
+        directory, prefix = os.path.join(result_dir, 'BCH', f'{code.n}-{code.k}'), 'bch'
+    elif isinstance(code, channel.Cyclic_Code):
+        directory, prefix = os.path.join(result_dir, 'Cyclic', f'{code.n}-{code.k}'), 'cyclic'
+    else:
+        directory, prefix = os.path.join(result_dir, 'Linear'), 'linear'
+    if several_probs:
+        directory = os.path.join(directory, f'p-{p:g}')
+    return directory, prefix
+
+
+def available_correctors(code, correctors):
+    """
+    The correctors of the list that the code has, the dense syndrome look-up is dropped when its array is too large
+    """
+    names = []
+    for name in correctors:
+        if not hasattr(code, 'corrector_' + name):
+            continue
+        if name == 'syndrome_lookup' and channel.syndrome_array_bytes(code.n, code.k) > channel.SYNDROME_ARRAY_MAX_BYTES:
+            continue
+        names.append(name)
+    return names
+
+
+def log_channel_statistics(cell_logger, stats, nECC):
+    """
+    Log the error weight histogram of the received codewords
+    """
+    total_codewords = stats.blocks
+    correct_codewords = stats.num_blocks_with_t_errors(0)
+    cell_logger.info("Channel statistic analysis:")
+    cell_logger.info("  Total codewords: %d", total_codewords)
+    cell_logger.info("  Correct codewords: %d", correct_codewords)
+    cell_logger.info("  Codeword error rate: %f", (total_codewords - correct_codewords) / total_codewords)
+    for i in range(1, nECC+1):
+        cell_logger.info("    %d error codewords: %d", i, stats.num_blocks_with_t_errors(i))
+    cell_logger.info("    Uncorrectable codewords: %d", stats.num_blocks_with_more_errors(nECC))
+
+
+def log_message_statistics(cell_logger, stats, title):
+    """
+    Log the bit and message errors of the received messages
+    """
+    cell_logger.info(title)
+    cell_logger.info("  Number of correct bits: %d", stats.bits - stats.bit_errors)
+    cell_logger.info("  Number of incorrect bits: %d", stats.bit_errors)
+    cell_logger.info("  Bit error rate: %f", stats.bit_error_rate())
+    cell_logger.info("  Message error rate: %f", stats.block_error_rate())
+
+
+def read_source(src, source_name):
+    """
+    Read a source file, returns what is needed to write the received data back in the same format
+    """
+    src_path = SOURCES[source_name]
+    if source_name == 'txt':
+        src.read_txt(src_path)
+        return ()
+    if source_name == 'png':
+        return src.read_png(src_path)
+    return src.read_wav(src_path)
+
+
+def write_destination(dest, source_name, info, directory, prefix, suffix, plots):
+    """
+    Write the received data of dest to directory/prefix-bsc-output + suffix, in the format of the source, with the wav plots next to it
+    """
+    stem = os.path.join(directory, f'{prefix}-bsc-output{suffix}')
+    if source_name == 'txt':
+        dest.write_txt(stem + '.txt')
+    elif source_name == 'png':
+        height, width, channels = info
+        dest.write_png_from_digital(stem + '.png', height, width, channels)
+    else:
+        shape, sample_rate = info
+        dest.write_wav_from_digital(shape, sample_rate, stem + '.wav')
+        if plots:
+            plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate,
+                                          os.path.join(directory, f'{prefix}-bsc-wav-time-domain-RX{suffix}.png'))
+            plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate,
+                                               os.path.join(directory, f'{prefix}-bsc-wav-frequency-domain-RX{suffix}.png'))
+
+
+def run_job(spec, source_name, error_probs, correctors, entropy, key, result_dir='Result', plots=True, profile=False):
+    """
+    Run every (p, corrector) cell of one code and one source.
+    The source is read and encoded once, every p gets one channel realization shared by all the correctors.
+
+        @type  spec: tuple
+        @param spec: code spec, see simulation.make_code
+
+        @type  source_name: string
+        @param source_name: 'txt', 'png' or 'wav'
+
+        @type  error_probs: list
+        @param error_probs: error probabilities of the BSC
+
+        @type  correctors: list
+        @param correctors: corrector names without the corrector_ prefix, the uncorrected output is always written
+
+        @type  entropy: int
+        @param entropy: entropy of the experiment seed
+
+        @type  key: tuple
+        @param key: spawn key of the job, the noise of p number i comes from the substream key + (i,)
+
+        @type  result_dir: string
+        @param result_dir: root of the result tree
+
+        @type  plots: bool
+        @param plots: plot the wav outputs
+
+        @type  profile: bool
+        @param profile: write a per-stage profile of the job to the directory of the code
+
+        @rtype:   list
+        @return:  result dict of every cell
+    """
+    code = simulation.make_code(spec)
+    src = source.Source()
+    dest = destination.Destination()
+    results = []
+    if profile:
+        instrument.enable(f'{spec}-{source_name}')
+
+    with instrument.stage('read_' + source_name) as record:
+        info = read_source(src, source_name)
+        record.bits = src.get_digital_data().size
+    tx_msg = src.get_digital_data()
+    padding_length = (- len(tx_msg)) % code.k
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = code.encoder_systematic(tx_msg)
+
+    for index, p in enumerate(error_probs):
+        directory, prefix = code_directory(code, result_dir, p, len(error_probs) > 1)
+        os.makedirs(directory, exist_ok=True)
+
+        # The jobs of a directory append to its logfile-<prefix>.log in parallel, each record is written whole
+        # and the logger name tells the jobs apart
+        cell_logger = logging.getLogger(f'{__name__}.{prefix}.{code.n}-{code.k}.p-{p:g}.{source_name}')
+        cell_logger.setLevel(logging.INFO)
+        cell_logger.propagate = False
+        handler = logging.FileHandler(os.path.join(directory, f'logfile-{prefix}.log'), mode='a')
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        cell_logger.addHandler(handler)
+
+        try:
+            cell_logger.info("***%s*** (%d, %d) code, p = %g", source_name.upper(), code.n, code.k, p)
+            if source_name == 'wav' and plots:
+                plot_wav.plot_wav_time_domain(src.get_analogue_data(), info[1], os.path.join(directory, 'wav-time-domain-TX.png'))
+                plot_wav.plot_wav_frequency_domain(src.get_analogue_data(), info[1], os.path.join(directory, 'wav-frequency-domain-TX.png'))
+
+            chl = channel.Channel(np.random.SeedSequence(entropy, spawn_key=key + (index,)))
+            with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+                rx_codeword = chl.binary_symmetric_channel(tx_codeword, p)
+            log_channel_statistics(cell_logger, stat_analysis.Error_Statistics(code.n).update(tx_codeword, rx_codeword).flush(), code.nECC)
+
+            for corrector in [None] + correctors:
+                if corrector is None:
+                    estimated_tx_codeword = rx_codeword
+                    title, suffix = "Before correction:", ''
+                else:
+                    with instrument.stage('corrector_' + corrector, rx_codeword.size):
+                        estimated_tx_codeword = getattr(code, 'corrector_' + corrector)(rx_codeword)
+                    name = corrector.split('_')[0]
+                    title, suffix = f"After correction ({name}):", f'-{name}-corrected'
+                with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+                    rx_msg = code.decoder_systematic(estimated_tx_codeword, padding_length)
+
+                dest.set_digital_data(rx_msg)
+                with instrument.stage('write_' + source_name, rx_msg.size):
+                    write_destination(dest, source_name, info, directory, prefix, suffix, plots)
+
+                msg_stats = stat_analysis.Error_Statistics(code.k).update(tx_msg, rx_msg).flush()
+                log_message_statistics(cell_logger, msg_stats, title)
+                results.append({
+                    'code': spec,
+                    'source': source_name,
+                    'p': p,
+                    'corrector': corrector,
+                    'directory': directory,
+                    'bits': msg_stats.bits,
+                    'bit_errors': msg_stats.bit_errors,
+                    'messages': msg_stats.blocks,
+                    'message_errors': msg_stats.block_errors,
+                })
+        finally:
+            cell_logger.removeHandler(handler)
+            handler.close()
+
+    if profile:
+        directory, prefix = code_directory(code, result_dir, None, False)
+        instrument.write_json(os.path.join(directory, f'profile-{prefix}-{source_name}.json'))
+        instrument.disable()
+    return results
+
+
+def run(codes, correctors=CORRECTORS, sources=tuple(SOURCES), error_probs=ERROR_PROBS, seed=None,
+        processes=None, result_dir='Result', plots=True, profile=False):
+    """
+    Run the matrix codes x correctors x sources x error_probs, one job per (code, source) in a process pool
+
+        @type  codes: list
+        @param codes: code specs, see simulation.make_code
+
+        @type  correctors: list
+        @param correctors: corrector names without the corrector_ prefix, skipped on the codes that do not have them
+
+        @type  sources: list
+        @param sources: source names, keys of SOURCES
+
+        @type  error_probs: list
+        @param error_probs: error probabilities of the BSC
+
+        @type  seed: int
+        @param seed: seed of the experiment, None for a fresh one
+
+        @type  processes: int
+        @param processes: number of worker processes (default: number of CPUs)
+
+        @rtype:   list
+        @return:  result dict of every cell, see run_job
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    logger.info("Experiment seed %d", entropy)
+    sources = sorted(sources, key=list(SOURCES).index)
+
+    results = []
+    with ProcessPoolExecutor(processes) as executor:
+        futures = {}
+        # Sources outside, so the large sources of every code start first
+        for source_index, source_name in enumerate(sources):
+            for code_index, spec in enumerate(codes):
+                names = available_correctors(simulation.make_code(spec), correctors)
+                future = executor.submit(run_job, spec, source_name, error_probs, names, entropy,
+                                         (code_index, list(SOURCES).index(source_name)), result_dir, plots, profile)
+                futures[future] = (spec, source_name)
+        for future in as_completed(futures):
+            spec, source_name = futures[future]
+            logger.info("%s %s done", spec, source_name)
+            results.extend(future.result())
+
+    # Same order as the matrix, whatever job finished first
+    order = {(spec, name): (i, j) for i, spec in enumerate(codes) for j, name in enumerate(sources)}
+    results.sort(key=lambda r: (order[r['code'], r['source']], error_probs.index(r['p'])))
+    return results
+
+
+
+if __name__ == '__main__':
+    # Run from the repository root, e.g. python Code/experiment.py --codes 31-16 31-6 --correctors trapping --error-probs 0.01 0.02
+    parser = argparse.ArgumentParser(description='Run a codes x correctors x sources x p experiment matrix')
+    parser.add_argument('--codes', type=parse_code, nargs='+', default=[parse_code(code) for code in CYCLIC_CODES],
+                        help='linear, N-K or N-K-T (cyclic), bch-N-T (default: the Result/Cyclic codes)')
+    parser.add_argument('--correctors', nargs='+', default=CORRECTORS,
+                        help='corrector names without the corrector_ prefix, e.g. syndrome_lookup trapping meggitt bch')
+    parser.add_argument('--sources', nargs='+', choices=list(SOURCES), default=list(SOURCES), help='sources to send')
+    parser.add_argument('--error-probs', type=float, nargs='+', default=ERROR_PROBS, help='error probabilities of the BSC')
+    parser.add_argument('--seed', type=int, help='seed of the channel noise (default: a fresh seed)')
+    parser.add_argument('--processes', type=int, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--result-dir', default='Result', help='root of the result tree')
+    parser.add_argument('--no-plots', action='store_true', help='do not plot the wav outputs')
+    parser.add_argument('--profile', action='store_true', help='write a per-stage profile of every job')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    results = run(args.codes, args.correctors, args.sources, args.error_probs, args.seed,
+                  args.processes, args.result_dir, not args.no_plots, args.profile)
+    for r in results:
+        print(f"{str(r['code']):24} {r['source']:4} p={r['p']:<6g} {str(r['corrector']):16} "
+              f"BER={r['bit_errors'] / r['bits']:.3e} MER={r['message_errors'] / r['messages']:.3e}  {r['directory']}")
@@ -0,0 +1,195 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import logging
+
+import numpy as np
+
+import channel
+
+# Create a logger in this module
+logger = logging.getLogger(__name__)
+
+
+
+class Block_Interleaver:
+    """
+    (rows x columns) Block Interleaver
+
+    Bits are written row by row and read column by column, so bits adjacent on the channel are columns bits
+    apart in the stream and a burst of up to rows bits on the channel hits every row (codeword, for columns = n)
+    at most once. Every block is independent, a stream may be interleaved in chunks of any number of whole blocks;
+    the last chunk may end with a shortened block.
+    """
+    def __init__(self, rows, columns):
+        """
+        @type  rows, columns: int
+        @param rows, columns: number of rows and columns of a block
+        """
+        self.rows = rows
+        self.columns = columns
+        self.size = rows * columns
+        # A block interleaver adds no delay, see Convolutional_Interleaver
+        self.delay = 0
+        # Permutations of the shortened last blocks, by length
+        self._tails = {}
+
+
+    def _tail_permutation(self, length):
+        """
+        Read order of a shortened block of length bits, rows written up to length and read column by column
+        """
+        if length not in self._tails:
+            rows = -(-length // self.columns)
+            order = np.arange(rows * self.columns).reshape(rows, self.columns).T.reshape(-1)
+            self._tails[length] = order[order < length]
+        return self._tails[length]
+
+
+    def interleave(self, bits):
+        """
+        Interleave the bits, block by block
+
+            @type  bits: ndarray
+            @param bits: TX codewords
+
+            @rtype:   ndarray
+            @return:  interleaved bits
+        """
+        bits = bits.reshape(-1)
+        whole = len(bits) - len(bits) % self.size
+        output = np.empty_like(bits)
+        # Whole blocks through a transposed view, written straight into the output
+        output[:whole].reshape(-1, self.columns, self.rows)[...] = bits[:whole].reshape(-1, self.rows, self.columns).transpose(0, 2, 1)
+        if whole < len(bits):
+            output[whole:] = bits[whole:][self._tail_permutation(len(bits) - whole)]
+        return output
+
+
+    def deinterleave(self, bits):
+        """
+        Undo interleave, the bits must be chunked like the interleaved ones
+
+            @type  bits: ndarray
+            @param bits: interleaved bits
+
+            @rtype:   ndarray
+            @return:  RX codewords
+        """
+        bits = bits.reshape(-1)
+        whole = len(bits) - len(bits) % self.size
+        output = np.empty_like(bits)
+        output[:whole].reshape(-1, self.rows, self.columns)[...] = bits[:whole].reshape(-1, self.columns, self.rows).transpose(0, 2, 1)
+        if whole < len(bits):
+            output[whole:][self._tail_permutation(len(bits) - whole)] = bits[whole:]
+        return output
+
+
+
+class Convolutional_Interleaver:
+    """
+    (branches, depth) Convolutional (Forney) Interleaver
+
+    Bit t goes through branch t % branches, branch i delays it by i * depth bits of that branch
+    (i * depth * branches bits of the stream); the deinterleaver delays branch i by (branches - 1 - i) * depth.
+    Bits that are adjacent on the channel are about depth * branches bits apart in the stream, with half the
+    memory and delay of a block interleaver of the same spread. Both directions keep their delay line between
+    calls, so a stream may be processed in chunks of any length; every output lags its input by delay bits.
+    """
+    def __init__(self, branches, depth):
+        """
+        @type  branches: int
+        @param branches: number of branches
+
+        @type  depth: int
+        @param depth: delay increment between branches, in bits of a branch
+        """
+        self.branches = branches
+        self.depth = depth
+        # End-to-end delay of interleave + deinterleave, also the length of both delay lines
+        self.delay = (branches - 1) * depth * branches
+        # Delay of every branch in bits of the stream
+        self.interleave_delays = np.arange(branches) * depth * branches
+        self.deinterleave_delays = self.interleave_delays[::-1].copy()
+        self.reset()
+
+
+    def reset(self):
+        """
+        Empty both delay lines, the next bit is bit 0 of a new stream
+        """
+        self._interleave_history = None
+        self._deinterleave_history = None
+        self._interleave_position = 0
+        self._deinterleave_position = 0
+
+
+    def _delay_line(self, bits, delays, history, position):
+        """
+        Delay bit t of the chunk by delays[(position + t) % branches], history holds the previous delay bits of the stream
+        """
+        if history is None:
+            history = np.zeros(self.delay, dtype=bits.dtype)
+        B = self.branches
+        output = np.empty_like(bits)
+        # Every branch delay is a multiple of branches, so the bits of a branch are a strided slice of history then of bits
+        for j in range(min(B, len(bits))):
+            d = delays[(position + j) % B]
+            out = output[j::B]
+            old = min(len(out), d // B)
+            out[:old] = history[self.delay + j - d::B][:old]
+            out[old:] = bits[j + B * old - d::B][:len(out) - old]
+
+        if len(bits) >= self.delay:
+            history = bits[len(bits) - self.delay:].copy()
+        else:
+            history = np.concatenate((history[len(bits):], bits))
+        return output, history
+
+
+    def interleave(self, bits):
+        """
+        Interleave the next chunk of the stream
+
+            @type  bits: ndarray
+            @param bits: TX codewords
+
+            @rtype:   ndarray
+            @return:  interleaved bits, as many as the input
+        """
+        bits = bits.reshape(-1)
+        output, self._interleave_history = self._delay_line(bits, self.interleave_delays, self._interleave_history, self._interleave_position)
+        self._interleave_position += len(bits)
+        return output
+
+
+    def deinterleave(self, bits):
+        """
+        Deinterleave the next chunk of the stream, the first delay bits of the stream are the fill of the delay lines
+
+            @type  bits: ndarray
+            @param bits: interleaved bits
+
+            @rtype:   ndarray
+            @return:  RX codewords, as many as the input
+        """
+        bits = bits.reshape(-1)
+        output, self._deinterleave_history = self._delay_line(bits, self.deinterleave_delays, self._deinterleave_history, self._deinterleave_position)
+        self._deinterleave_position += len(bits)
+        return output
+
+
+
+if __name__ == '__main__':
+    # A burst channel against the (15, 7) cyclic code, with and without a (15 x 64) block interleaver
+    chl = channel.Channel(0)
+    cyclic_code = channel.Cyclic_Code(15, 7, None)
+    block = Block_Interleaver(cyclic_code.n, 64)
+
+    tx_msg = chl.rng.integers(0, 2, 7 * 15 * 64 * 100, dtype=np.uint8)
+    tx_codeword = cyclic_code.encoder_systematic(tx_msg)
+    for name, stage in (('none', None), ('block', block)):
+        sent = tx_codeword if stage is None else stage.interleave(tx_codeword)
+        received = chl.gilbert_elliott_channel(sent, 0.001, 0.2)
+        rx_codeword = received if stage is None else stage.deinterleave(received)
+        rx_msg = cyclic_code.decoder_systematic(cyclic_code.corrector_trapping(rx_codeword))
+        print(f"{name:6} bit error rate {np.mean(rx_msg != tx_msg):.3e}")
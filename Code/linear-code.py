@@ -6,7 +6,11 @@ import os
 import source
 import channel
 import destination
-from Utils import plot_wav, stat_analysis
+from Utils import plot_wav, stat_analysis, instrument
+
+
+# Record per-stage wall/CPU time, throughput, allocations and corrector counters, written next to the log
+FLAG_PROFILE = False
 
 
 # Check if the directory exists
@@ -37,18 +41,23 @@ def linear_txt():
     dest = destination.Destination()
 
 
-    src.read_txt("Resource/hardcoded.txt")
+    with instrument.stage('read_txt') as record:
+        src.read_txt("Resource/hardcoded.txt")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
 
-    tx_codeword = linear_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = linear_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, 7)
-    one_error_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 1, 7)
-    total_codewords = len(tx_codeword) // 7
-    uncorrectable_codewords = total_codewords - correct_codewords - one_error_codewords
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(7).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
+    one_error_codewords = channel_stats.num_blocks_with_t_errors(1)
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(1)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -57,29 +66,38 @@ def linear_txt():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = linear_code.decoder_systematic(rx_codeword)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(rx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_txt("Result/Linear/linear-bsc-output.txt")
+    with instrument.stage('write_txt', rx_msg.size):
+        dest.write_txt("Result/Linear/linear-bsc-output.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
-    estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
-    rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
+    with instrument.stage('corrector_syndrome', rx_codeword.size):
+        estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_txt("Result/Linear/linear-bsc-output-syndrome-corrected.txt")
+    with instrument.stage('write_txt', rx_msg.size):
+        dest.write_txt("Result/Linear/linear-bsc-output-syndrome-corrected.txt")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("After correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def linear_png():
@@ -95,18 +113,23 @@ def linear_png():
     dest = destination.Destination()
 
 
-    height, width, channels = src.read_png("Resource/image.png")
+    with instrument.stage('read_png') as record:
+        height, width, channels = src.read_png("Resource/image.png")
+        record.bits = src.get_digital_data().size
     tx_msg = src.get_digital_data()
 
-    tx_codeword = linear_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = linear_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, 7)
-    one_error_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 1, 7)
-    total_codewords = len(tx_codeword) // 7
-    uncorrectable_codewords = total_codewords - correct_codewords - one_error_codewords
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(7).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
+    one_error_codewords = channel_stats.num_blocks_with_t_errors(1)
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(1)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -115,29 +138,38 @@ def linear_png():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = linear_code.decoder_systematic(rx_codeword)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(rx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_png_from_digital("Result/Linear/linear-bsc-output.png", height, width, channels)
+    with instrument.stage('write_png_from_digital', rx_msg.size):
+        dest.write_png_from_digital("Result/Linear/linear-bsc-output.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
-    estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
-    rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
+    with instrument.stage('corrector_syndrome', rx_codeword.size):
+        estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
     dest.set_digital_data(rx_msg)
-    dest.write_png_from_digital("Result/Linear/linear-bsc-output-syndrome-corrected.png", height, width, channels)
+    with instrument.stage('write_png_from_digital', rx_msg.size):
+        dest.write_png_from_digital("Result/Linear/linear-bsc-output-syndrome-corrected.png", height, width, channels)
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("After correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 def linear_wav():
@@ -153,7 +185,9 @@ def linear_wav():
     dest = destination.Destination()
 
 
-    shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+    with instrument.stage('read_wav') as record:
+        shape, sample_rate = src.read_wav("Resource/file_example_WAV_1MG.wav")
+        record.bits = src.get_digital_data().size
     plot_wav.plot_wav_time_domain(src.get_analogue_data(), sample_rate, "Result/Linear/wav-time-domain-TX.png")
     plot_wav.plot_wav_frequency_domain(src.get_analogue_data(), sample_rate, "Result/Linear/wav-frequency-domain-TX.png")
 
@@ -167,15 +201,18 @@ def linear_wav():
 
     tx_msg = src.get_digital_data()
 
-    tx_codeword = linear_code.encoder_systematic(tx_msg)
+    with instrument.stage('encoder_systematic', tx_msg.size):
+        tx_codeword = linear_code.encoder_systematic(tx_msg)
 
-    rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
+    with instrument.stage('binary_symmetric_channel', tx_codeword.size):
+        rx_codeword = chl.binary_symmetric_channel(tx_codeword, 0.01)
 
-    # Statistic analysis
-    correct_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 0, 7)
-    one_error_codewords = stat_analysis.num_codeword_with_t_errors(tx_codeword, rx_codeword, 1, 7)
-    total_codewords = len(tx_codeword) // 7
-    uncorrectable_codewords = total_codewords - correct_codewords - one_error_codewords
+    # Statistic analysis, error weight histogram of the codewords in one pass
+    channel_stats = stat_analysis.Error_Statistics(7).update(tx_codeword, rx_codeword).flush()
+    correct_codewords = channel_stats.num_blocks_with_t_errors(0)
+    one_error_codewords = channel_stats.num_blocks_with_t_errors(1)
+    total_codewords = channel_stats.blocks
+    uncorrectable_codewords = channel_stats.num_blocks_with_more_errors(1)
     logger.info("Channel statistic analysis:")
     logger.info("  Total codewords: %d", total_codewords)
     logger.info("  Correct codewords: %d", correct_codewords)
@@ -184,41 +221,54 @@ def linear_wav():
     logger.info("    Uncorrectable codewords: %d", uncorrectable_codewords)
 
     # without error correction
-    rx_msg = linear_code.decoder_systematic(rx_codeword)
+    with instrument.stage('decoder_systematic', rx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(rx_codeword)
 
     dest.set_digital_data(rx_msg)
-    dest.write_wav_from_digital(shape, sample_rate, "Result/Linear/linear-bsc-output.wav")
+    with instrument.stage('write_wav_from_digital', rx_msg.size):
+        dest.write_wav_from_digital(shape, sample_rate, "Result/Linear/linear-bsc-output.wav")
 
     plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, "Result/Linear/linear-bsc-wav-time-domain-RX.png")
     plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, "Result/Linear/linear-bsc-wav-frequency-domain-RX.png")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("Before correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
     # with error correction
-    estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
-    rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
+    with instrument.stage('corrector_syndrome', rx_codeword.size):
+        estimated_tx_codeword = linear_code.corrector_syndrome(rx_codeword)
+    with instrument.stage('decoder_systematic', estimated_tx_codeword.size):
+        rx_msg = linear_code.decoder_systematic(estimated_tx_codeword)
 
     dest.set_digital_data(rx_msg)
-    dest.write_wav_from_digital(shape, sample_rate, "Result/Linear/linear-bsc-output-syndrome-corrected.wav")
+    with instrument.stage('write_wav_from_digital', rx_msg.size):
+        dest.write_wav_from_digital(shape, sample_rate, "Result/Linear/linear-bsc-output-syndrome-corrected.wav")
 
     plot_wav.plot_wav_time_domain(dest.get_analogue_data(), sample_rate, "Result/Linear/linear-bsc-wav-time-domain-RX-syndrome-corrected.png")
     plot_wav.plot_wav_frequency_domain(dest.get_analogue_data(), sample_rate, "Result/Linear/linear-bsc-wav-frequency-domain-RX-syndrome-corrected.png")
 
     # Statistic analysis
-    correct_bits = stat_analysis.num_correct_bits(tx_msg, rx_msg)
+    msg_stats = stat_analysis.Error_Statistics(4).update(tx_msg, rx_msg).flush()
+    correct_bits = msg_stats.bits - msg_stats.bit_errors
     logger.info("After correction:")
     logger.info("  Number of correct bits: %d", correct_bits)
     logger.info("  Number of incorrect bits: %d", len(tx_msg) - correct_bits)
     logger.info("  Bit error rate: %f", (len(tx_msg) - correct_bits) / len(tx_msg))
+    logger.info("  Message error rate: %f", msg_stats.block_error_rate())
 
 
 
 if __name__ == '__main__':
+    if FLAG_PROFILE:
+        instrument.enable('linear')
     linear_txt()
     linear_png()
-    linear_wav()
\ No newline at end of file
+    linear_wav()
+    if FLAG_PROFILE:
+        instrument.write_json('Result/Linear/profile-linear.json')
\ No newline at end of file
@@ -0,0 +1,259 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from statistics import NormalDist
+
+import numpy as np
+
+import channel
+
+# Create a logger in this module
+logger = logging.getLogger(__name__)
+
+# Number of codewords simulated by one work unit
+BATCH_CODEWORDS = 1 << 14
+# A point stops once it has counted this many frame errors ...
+TARGET_FRAME_ERRORS = 100
+# ... or once the confidence interval of its FER is narrower than this fraction of the FER ...
+TARGET_RELATIVE_WIDTH = 0.2
+# ... or once it has simulated this many codewords
+MAX_CODEWORDS = 1 << 24
+
+# Codes already built in this process, by spec
+_codes = {}
+
+
+
+def make_code(spec):
+    """
+    Build the code described by spec, once per process
+
+        @type  spec: tuple
+        @param spec: ('linear',) for the (7,4) linear code, ('cyclic', n, k, nECC) or ('bch', n, t)
+
+        @rtype:   Linear_Code
+        @return:  the code
+    """
+    if spec not in _codes:
+        kind, *params = spec
+        if kind == 'linear':
+            _codes[spec] = channel.Linear_Code(*params)
+        elif kind == 'cyclic':
+            _codes[spec] = channel.Cyclic_Code(*params)
+        elif kind == 'bch':
+            _codes[spec] = channel.BCH_Code(*params)
+        else:
+            raise ValueError(f"Unknown code {spec}")
+    return _codes[spec]
+
+
+def wilson_interval(errors, trials, confidence=0.95):
+    """
+    Wilson score confidence interval of an error probability
+
+        @type  errors: int
+        @param errors: number of errors
+
+        @type  trials: int
+        @param trials: number of trials
+
+        @type  confidence: float
+        @param confidence: confidence level
+
+        @rtype:   tuple
+        @return:  lower and upper bound
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    rate = errors / trials
+    center = (rate + z * z / (2 * trials)) / (1 + z * z / trials)
+    half_width = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / (1 + z * z / trials)
+    return max(center - half_width, 0.0), min(center + half_width, 1.0)
+
+
+def simulate_batch(spec, corrector, p, seed, point, batch, batch_codewords=BATCH_CODEWORDS):
+    """
+    Send batch_codewords random messages through the code and the BSC, count the errors left after correction.
+    The messages and the errors come from the substream (point, batch) of the seed, so every batch is reproducible on its own.
+
+        @type  spec: tuple
+        @param spec: code spec, see make_code
+
+        @type  corrector: string
+        @param corrector: name of the corrector method without the corrector_ prefix, e.g. 'trapping', None for no correction
+
+        @type  p: float
+        @param p: error probability of the BSC
+
+        @type  seed: int
+        @param seed: seed of the sweep
+
+        @type  point, batch: int
+        @param point, batch: index of the sweep point, index of the batch within the point
+
+        @type  batch_codewords: int
+        @param batch_codewords: number of codewords
+
+        @rtype:   tuple
+        @return:  bit errors, frame errors, number of codewords
+    """
+    code = make_code(spec)
+    chl = channel.Channel(np.random.SeedSequence(seed, spawn_key=(point, batch)))
+
+    tx_msg = chl.rng.integers(0, 2, batch_codewords * code.k, dtype=np.uint8)
+    rx_codeword = chl.binary_symmetric_channel(code.encoder_systematic(tx_msg), p)
+    if corrector is not None:
+        rx_codeword = getattr(code, 'corrector_' + corrector)(rx_codeword)
+    rx_msg = code.decoder_systematic(rx_codeword)
+
+    errors = (rx_msg != tx_msg).reshape(-1, code.k)
+    return int(np.count_nonzero(errors)), int(np.count_nonzero(errors.any(axis=1))), batch_codewords
+
+
+class Sweep_Point:
+    """
+    Running error counts of one (code, corrector, p) point of a sweep
+    """
+    def __init__(self, spec, corrector, p):
+        self.spec = spec
+        self.corrector = corrector
+        self.p = p
+        self.bit_errors = 0
+        self.frame_errors = 0
+        self.codewords = 0
+        # Batches are counted in index order, so the result does not depend on which worker finishes first
+        self.next_batch = 0
+        self.finished = {}
+        self.submitted = 0
+        self.done = False
+
+
+    def add(self, batch, result, target_frame_errors, target_relative_width, max_codewords, confidence=0.95):
+        """
+        Record the result of a batch, count every finished batch that is next in order until the point is done
+        """
+        self.finished[batch] = result
+        while not self.done and self.next_batch in self.finished:
+            bit_errors, frame_errors, codewords = self.finished.pop(self.next_batch)
+            self.bit_errors += bit_errors
+            self.frame_errors += frame_errors
+            self.codewords += codewords
+            self.next_batch += 1
+
+            low, high = wilson_interval(self.frame_errors, self.codewords, confidence)
+            self.done = (self.frame_errors >= target_frame_errors
+                         or (self.frame_errors > 0 and high - low <= target_relative_width * self.frame_errors / self.codewords)
+                         or self.codewords >= max_codewords)
+
+
+    def result(self, k, confidence=0.95):
+        """
+        BER and FER of the point with their confidence intervals
+
+            @type  k: int
+            @param k: number of message bits per codeword
+
+            @type  confidence: float
+            @param confidence: confidence level
+
+            @rtype:   dict
+            @return:  counts, ber, ber_ci, fer, fer_ci
+        """
+        bits = self.codewords * k
+        return {
+            'code': self.spec,
+            'corrector': self.corrector,
+            'p': self.p,
+            'codewords': self.codewords,
+            'bit_errors': self.bit_errors,
+            'frame_errors': self.frame_errors,
+            'ber': self.bit_errors / bits,
+            # Bit errors within a frame are not independent, so the BER interval is only indicative
+            'ber_ci': wilson_interval(self.bit_errors, bits, confidence),
+            'fer': self.frame_errors / self.codewords,
+            'fer_ci': wilson_interval(self.frame_errors, self.codewords, confidence),
+        }
+
+
+def sweep(codes, correctors, error_probs, seed=0, processes=None,
+          target_frame_errors=TARGET_FRAME_ERRORS, target_relative_width=TARGET_RELATIVE_WIDTH,
+          max_codewords=MAX_CODEWORDS, batch_codewords=BATCH_CODEWORDS, confidence=0.95):
+    """
+    Monte Carlo BER/FER of every code x corrector x p point, batches of all points share one process pool.
+    Every point stops on its own once it has target_frame_errors frame errors, a FER confidence interval
+    narrower than target_relative_width * FER, or max_codewords codewords.
+
+        @type  codes: list
+        @param codes: code specs, see make_code
+
+        @type  correctors: dict or list
+        @param correctors: corrector names (see simulate_batch) for every code, or a dict from code spec to corrector names
+
+        @type  error_probs: list
+        @param error_probs: error probabilities of the BSC
+
+        @type  seed: int
+        @param seed: seed of the sweep, the results only depend on the seed and the arguments
+
+        @type  processes: int
+        @param processes: number of worker processes (default: number of CPUs)
+
+        @rtype:   list
+        @return:  result dict of every point, see Sweep_Point.result
+    """
+    points = []
+    for spec in codes:
+        for corrector in (correctors[spec] if isinstance(correctors, dict) else correctors):
+            for p in error_probs:
+                points.append(Sweep_Point(spec, corrector, p))
+
+    # Keep every worker busy with a couple of batches queued
+    max_pending = 2 * (processes or os.cpu_count())
+    with ProcessPoolExecutor(processes) as executor:
+        pending = {}
+        while True:
+            active = [index for index, point in enumerate(points) if not point.done]
+            if not active and not pending:
+                break
+            # Submit batches round-robin over the points that are not done yet
+            for index in active:
+                if len(pending) >= max_pending:
+                    break
+                point = points[index]
+                # Never run too far ahead of the batches already counted
+                if point.submitted - point.next_batch >= max_pending:
+                    continue
+                future = executor.submit(simulate_batch, point.spec, point.corrector, point.p,
+                                         seed, index, point.submitted, batch_codewords)
+                pending[future] = (index, point.submitted)
+                point.submitted += 1
+            if not pending:
+                continue
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, batch = pending.pop(future)
+                points[index].add(batch, future.result(), target_frame_errors, target_relative_width, max_codewords, confidence)
+                if points[index].done:
+                    logger.info('%s %s p=%g done after %d codewords', points[index].spec, points[index].corrector,
+                                points[index].p, points[index].codewords)
+
+    return [point.result(make_code(point.spec).k, confidence) for point in points]
+
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    results = sweep([('linear',), ('cyclic', 15, 7, None), ('cyclic', 31, 16, None)],
+                    {('linear',): [None, 'syndrome_lookup'],
+                     ('cyclic', 15, 7, None): [None, 'trapping'],
+                     ('cyclic', 31, 16, None): [None, 'trapping']},
+                    [0.1, 0.05, 0.02, 0.01])
+    for r in results:
+        print(f"{str(r['code']):24} {str(r['corrector']):16} p={r['p']:<5} codewords={r['codewords']:<9} "
+              f"BER={r['ber']:.3e} [{r['ber_ci'][0]:.3e}, {r['ber_ci'][1]:.3e}] "
+              f"FER={r['fer']:.3e} [{r['fer_ci'][0]:.3e}, {r['fer_ci'][1]:.3e}]")
@@ -9,6 +9,13 @@ import logging
 # Create a logger in this module
 logger = logging.getLogger(__name__)
 
+# Number of bytes read at once by read_txt_blocks
+BLOCK_BYTES = 1 << 16
+# Number of audio frames read at once by read_wav_blocks
+BLOCK_FRAMES = 1 << 14
+# Number of image rows yielded at once by read_png_blocks
+BLOCK_ROWS = 64
+
 
 class Source:
     """
@@ -89,6 +96,93 @@ class Source:
         return shape, sample_rate
     
 
+    def read_txt_blocks(self, src_path, block_bytes=BLOCK_BYTES):
+        """
+        Read the text file incrementally, yield the binary bits of every block of block_bytes bytes
+
+            @type  src_path: string
+            @param src_path: source file path, with extension
+
+            @type  block_bytes: int
+            @param block_bytes: number of bytes per block
+
+            @rtype:   generator
+            @return:  data bits of every block
+        """
+        with open(src_path, 'rb') as file:
+            while True:
+                chunk = file.read(block_bytes)
+                if not chunk:
+                    break
+                yield np.unpackbits(np.frombuffer(chunk, dtype=np.uint8))
+
+
+    def png_info(self, src_path):
+        """
+        Read the header of the png file, without decoding the pixels
+
+            @type  src_path: string
+            @param src_path: source file path, with extension
+
+            @rtype:   tuple
+            @return:  height, width, channels
+        """
+        with Image.open(src_path) as image:
+            return image.height, image.width, len(image.getbands())
+
+
+    def read_png_blocks(self, src_path, block_rows=BLOCK_ROWS):
+        """
+        Read the png file, yield the color information of every band of block_rows rows as binary bits.
+        The png decoder needs the whole image, only the bit expansion is done per block.
+
+            @type  src_path: string
+            @param src_path: source file path, with extension
+
+            @type  block_rows: int
+            @param block_rows: number of image rows per block
+
+            @rtype:   generator
+            @return:  data bits of every block
+        """
+        with Image.open(src_path) as image:
+            img_array = np.asarray(image, dtype=np.uint8)
+        for start in range(0, img_array.shape[0], block_rows):
+            yield np.unpackbits(img_array[start:start + block_rows])
+
+
+    def wav_info(self, src_path):
+        """
+        Read the header of the wav file, without reading the samples
+
+            @type  src_path: string
+            @param src_path: source file path, with extension
+
+            @rtype:   tuple, int
+            @return:  shape, sample_rate (same as read_wav)
+        """
+        info = sf.info(src_path)
+        shape = (info.frames, info.channels) if info.channels > 1 else (info.frames,)
+        return shape, info.samplerate
+
+
+    def read_wav_blocks(self, src_path, block_frames=BLOCK_FRAMES):
+        """
+        Read the wav file incrementally, yield the audio information of every block of block_frames frames as binary bits
+
+            @type  src_path: string
+            @param src_path: source file path, with extension
+
+            @type  block_frames: int
+            @param block_frames: number of frames per block
+
+            @rtype:   generator
+            @return:  data bits of every block
+        """
+        for audio_block in sf.blocks(src_path, blocksize=block_frames, dtype='int16'):
+            yield np.unpackbits(np.ascontiguousarray(audio_block).view(np.uint8))
+
+
     # def read_mp3(self, src_path):
     #     """
     #     Read the mp3 file,
@@ -0,0 +1,228 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import logging
+import os
+
+import numpy as np
+
+import source
+import channel
+import destination
+
+# Create a logger in this module
+logger = logging.getLogger(__name__)
+
+# Number of codewords per block, a multiple of 8 so every block but the last holds whole bytes
+BLOCK_CODEWORDS = 1 << 14
+
+
+
+def rechunk(blocks, block_bits):
+    """
+    Regroup a stream of bit blocks of any length into blocks of exactly block_bits bits, the last block may be shorter
+
+        @type  blocks: iterable
+        @param blocks: data bits of every block
+
+        @type  block_bits: int
+        @param block_bits: number of bits per output block
+
+        @rtype:   generator
+        @return:  data bits of every output block
+    """
+    pending = []
+    pending_bits = 0
+    for bits in blocks:
+        pending.append(bits)
+        pending_bits += len(bits)
+        if pending_bits < block_bits:
+            continue
+        bits = np.concatenate(pending)
+        whole = len(bits) - len(bits) % block_bits
+        for start in range(0, whole, block_bits):
+            yield bits[start:start + block_bits]
+        pending = [bits[whole:]]
+        pending_bits = len(pending[0])
+    if pending_bits:
+        yield np.concatenate(pending)
+
+
+def encode_blocks(code, blocks):
+    """
+    Encode every message block, only the last block needs padding
+
+        @type  code: Linear_Code
+        @param code: the channel code
+
+        @type  blocks: iterable
+        @param blocks: TX message of every block, lengths divisible by k except the last
+
+        @rtype:   generator
+        @return:  (TX codewords, padding length) of every block
+    """
+    for bits in blocks:
+        yield code.encoder_systematic(bits), (- len(bits)) % code.k
+
+
+def transmit_blocks(chl, blocks, p):
+    """
+    Pass every codeword block through the binary symmetric channel
+
+        @type  chl: Channel
+        @param chl: the channel
+
+        @type  blocks: iterable
+        @param blocks: (TX codewords, padding length) of every block
+
+        @type  p: float
+        @param p: error probability of the BSC
+
+        @rtype:   generator
+        @return:  (RX codewords, padding length) of every block
+    """
+    for codewords, padding_length in blocks:
+        yield chl.binary_symmetric_channel(codewords, p), padding_length
+
+
+def interleave_blocks(interleaver, blocks):
+    """
+    Interleave every codeword block, the delay of the interleaver is flushed with zeros after the last block
+
+        @type  interleaver: Block_Interleaver or Convolutional_Interleaver
+        @param interleaver: the interleaver
+
+        @type  blocks: iterable
+        @param blocks: (TX codewords, padding length) of every block
+
+        @rtype:   generator
+        @return:  (interleaved bits, padding length) of every block
+    """
+    previous = None
+    for block in blocks:
+        if previous is not None:
+            yield interleaver.interleave(previous[0]), previous[1]
+        previous = block
+    if previous is not None:
+        codewords, padding_length = previous
+        if interleaver.delay:
+            codewords = np.concatenate((codewords, np.zeros(interleaver.delay, dtype=codewords.dtype)))
+        yield interleaver.interleave(codewords), padding_length
+
+
+def deinterleave_blocks(interleaver, blocks, n):
+    """
+    Deinterleave every received block, drop the delay of the interleaver and regroup the bits into whole codewords
+
+        @type  interleaver: Block_Interleaver or Convolutional_Interleaver
+        @param interleaver: the interleaver, the same one as interleave_blocks or one with the same parameters
+
+        @type  blocks: iterable
+        @param blocks: (interleaved bits, padding length) of every block
+
+        @type  n: int
+        @param n: number of bits per codeword
+
+        @rtype:   generator
+        @return:  (RX codewords, padding length) of every block
+    """
+    skip = interleaver.delay
+    pending = None
+    for bits, padding_length in blocks:
+        bits = interleaver.deinterleave(bits)
+        drop = min(skip, len(bits))
+        skip -= drop
+        bits = bits[drop:] if pending is None else np.concatenate((pending, bits[drop:]))
+        whole = len(bits) - len(bits) % n
+        pending = bits[whole:]
+        yield bits[:whole], padding_length
+
+
+def correct_blocks(corrector, blocks):
+    """
+    Correct every codeword block
+
+        @type  corrector: callable
+        @param corrector: corrector of the code, e.g. code.corrector_trapping, None for no correction
+
+        @type  blocks: iterable
+        @param blocks: (RX codewords, padding length) of every block
+
+        @rtype:   generator
+        @return:  (estimated TX codewords, padding length) of every block
+    """
+    for codewords, padding_length in blocks:
+        yield (codewords if corrector is None else corrector(codewords)), padding_length
+
+
+def decode_blocks(code, blocks):
+    """
+    Decode every codeword block and remove the padding
+
+        @type  code: Linear_Code
+        @param code: the channel code
+
+        @type  blocks: iterable
+        @param blocks: (codewords, padding length) of every block
+
+        @rtype:   generator
+        @return:  RX message of every block
+    """
+    for codewords, padding_length in blocks:
+        yield code.decoder_systematic(codewords, padding_length)
+
+
+def pipeline(blocks, code, chl, p, corrector=None, block_codewords=BLOCK_CODEWORDS, interleaver=None):
+    """
+    Source blocks - Channel encoder - (Interleaver) - Channel - (Deinterleaver) - Channel decoder, one block of block_codewords codewords at a time.
+    Peak memory depends on the block size only, not on the size of the source.
+
+        @type  blocks: iterable
+        @param blocks: TX message bits of every source block, of any length
+
+        @type  code: Linear_Code
+        @param code: the channel code
+
+        @type  chl: Channel
+        @param chl: the channel
+
+        @type  p: float
+        @param p: error probability of the BSC
+
+        @type  corrector: callable
+        @param corrector: corrector of the code, e.g. code.corrector_trapping, None for no correction
+
+        @type  block_codewords: int
+        @param block_codewords: number of codewords per block
+
+        @type  interleaver: Block_Interleaver or Convolutional_Interleaver
+        @param interleaver: interleaver between the encoder and the channel, None for no interleaving.
+                            A Block_Interleaver keeps every block but the last whole if its size divides block_codewords * n.
+
+        @rtype:   generator
+        @return:  RX message bits of every block
+    """
+    message_blocks = rechunk(blocks, block_codewords * code.k)
+    codeword_blocks = encode_blocks(code, message_blocks)
+    if interleaver is None:
+        received_blocks = transmit_blocks(chl, codeword_blocks, p)
+    else:
+        received_blocks = deinterleave_blocks(interleaver, transmit_blocks(chl, interleave_blocks(interleaver, codeword_blocks), p), code.n)
+    corrected_blocks = correct_blocks(corrector, received_blocks)
+    return decode_blocks(code, corrected_blocks)
+
+
+
+if __name__ == '__main__':
+    # Stream the wav and txt resources through the (31, 16) cyclic code, corrected by trapping
+    os.makedirs('Result/Stream/', exist_ok=True)
+    src = source.Source()
+    chl = channel.Channel()
+    cyclic_code = channel.Cyclic_Code(31, 16, None)
+    dest = destination.Destination()
+
+    received = pipeline(src.read_txt_blocks("Resource/hardcoded.txt"), cyclic_code, chl, 0.02, cyclic_code.corrector_trapping)
+    dest.write_txt_blocks(received, "Result/Stream/cyclic-bsc-output-trapping-corrected.txt")
+
+    shape, sample_rate = src.wav_info("Resource/file_example_WAV_1MG.wav")
+    received = pipeline(src.read_wav_blocks("Resource/file_example_WAV_1MG.wav"), cyclic_code, chl, 0.02, cyclic_code.corrector_trapping)
+    dest.write_wav_blocks(received, shape, sample_rate, "Result/Stream/cyclic-bsc-output-trapping-corrected.wav")
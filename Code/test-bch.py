@@ -0,0 +1,30 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+bch_codes = [channel.BCH_Code(15, 2), channel.BCH_Code(31, 3), channel.BCH_Code(63, 2)]
+
+
+# Every error pattern of weight up to t is corrected, each one added to a random codeword
+for code in bch_codes:
+    for weight in range(1, code.nECC + 1):
+        for positions in channel.error_pattern_chunks(range(code.n), weight):
+            patterns = np.zeros((len(positions), code.n), dtype=np.uint8)
+            patterns[np.arange(len(positions))[:, None], positions] = 1
+            tx_codewords = code.encoder_systematic(rng.integers(0, 2, len(patterns) * code.k, dtype=np.uint8))
+            estimated = code.corrector_bch(tx_codewords ^ patterns.flatten())
+            assert np.array_equal(estimated, tx_codewords), f"({code.n}, {code.k}) corrector_bch, {weight} errors"
+    print(f"({code.n}, {code.k}) BCH code: every pattern of up to {code.nECC} errors corrected")
+
+
+# BCH codewords have zero syndromes S_j = c(alpha^j)
+for code in bch_codes:
+    tx_codewords = code.encoder_systematic(rng.integers(0, 2, 1000 * code.k, dtype=np.uint8)).reshape(-1, code.n)
+    assert not np.any((tx_codewords @ code.syndrome_matrix) % 2), f"({code.n}, {code.k}) BCH syndromes"
+    assert not np.any((tx_codewords @ code.HT) % 2), f"({code.n}, {code.k}) parity checks"
+    print(f"({code.n}, {code.k}) BCH code: syndromes of {len(tx_codewords)} codewords are zero")
@@ -0,0 +1,60 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+from Utils import bitpack as bp
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+# Lengths of the chunks a stream is split into, some cross the noise blocks
+chunk_sizes = [1, 7, 1000, 100_000, channel.NOISE_BLOCK_BITS + 3]
+
+
+def random_chunks(length):
+    """
+    Split range(length) at random points, chunk lengths drawn from chunk_sizes
+    """
+    cuts = np.cumsum(rng.choice(chunk_sizes, length))
+    return np.split(np.arange(length), cuts[cuts < length])
+
+
+tx_bits = np.zeros(3 * channel.NOISE_BLOCK_BITS + 12345, dtype=np.uint8)
+
+
+# BSC: the errors depend only on the seed and the bit positions, not on how the stream is chunked or split
+for p in [0.0, 0.001, 0.1, 1.0]:
+    whole = channel.Channel(7).binary_symmetric_channel(tx_bits, p)
+
+    chl = channel.Channel(7)
+    chunked = np.concatenate([chl.binary_symmetric_channel(tx_bits[chunk], p) for chunk in random_chunks(len(tx_bits))])
+    assert np.array_equal(chunked, whole), f"BSC p = {p} in chunks"
+
+    # Chunks sent out of order, each with its offset, as by separate processes
+    chunks = random_chunks(len(tx_bits))
+    split = np.empty_like(tx_bits)
+    for index in rng.permutation(len(chunks)):
+        chunk = chunks[index]
+        if len(chunk):
+            split[chunk] = channel.Channel(7).binary_symmetric_channel(tx_bits[chunk], p, offset=chunk[0])
+    assert np.array_equal(split, whole), f"BSC p = {p} with offsets"
+
+    # Packed codewords see the same errors
+    n = 100
+    packed = channel.Channel(7).binary_symmetric_channel_packed(bp.pack_bits(tx_bits[:n * 20000], n), n, p)
+    assert np.array_equal(bp.unpack_bits(packed, n), whole[:n * 20000]), f"BSC p = {p} packed"
+
+    if 0 < p < 1:
+        assert not np.array_equal(channel.Channel(8).binary_symmetric_channel(tx_bits, p), whole), f"BSC p = {p} another seed"
+    print(f"BSC p = {p}: {np.count_nonzero(whole)} errors, the same in chunks, with offsets and packed")
+
+
+# Gilbert-Elliott: the state continues across calls, so chunks see the errors of a single call
+for p_gb, p_bg, p_g, p_b in [(0.001, 0.2, 0.0, 0.5), (0.01, 0.1, 0.001, 0.3), (0.0, 0.1, 0.0, 0.5), (0.3, 0.0, 0.0, 0.4)]:
+    whole = channel.Channel(3).gilbert_elliott_channel(tx_bits, p_gb, p_bg, p_g, p_b)
+
+    chl = channel.Channel(3)
+    chunked = np.concatenate([chl.gilbert_elliott_channel(tx_bits[chunk], p_gb, p_bg, p_g, p_b) for chunk in random_chunks(len(tx_bits))])
+    assert np.array_equal(chunked, whole), f"Gilbert-Elliott {p_gb, p_bg, p_g, p_b} in chunks"
+    print(f"Gilbert-Elliott {p_gb, p_bg, p_g, p_b}: {np.count_nonzero(whole)} errors, the same in chunks")
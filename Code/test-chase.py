@@ -0,0 +1,32 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+
+def frame_error_rate(tx_codewords, estimated, n):
+    """
+    Fraction of the codewords with at least one wrong bit
+    """
+    return np.mean(np.any((estimated != tx_codewords).reshape(-1, n), axis=1))
+
+
+# Over AWGN, Chase-II on top of a hard-decision corrector has a clearly lower FER than that corrector alone
+for code, corrector_name in [(channel.Linear_Code(), 'corrector_syndrome_lookup'), (channel.Cyclic_Code(15, 7, None), 'corrector_syndrome_lookup'),
+                             (channel.Cyclic_Code(15, 7, None), 'corrector_trapping'), (channel.BCH_Code(31, 2), 'corrector_bch')]:
+    corrector = getattr(code, corrector_name)
+    tx_codewords = code.encoder_systematic(rng.integers(0, 2, 20000 * code.k, dtype=np.uint8))
+    for ebn0_db in [3.0, 5.0]:
+        received = channel.Channel(1).awgn_channel(tx_codewords, ebn0_db, code.k / code.n)
+        rx_codewords = (received < 0).astype(np.uint8)
+        hard = frame_error_rate(tx_codewords, corrector(rx_codewords), code.n)
+        chase = frame_error_rate(tx_codewords, code.corrector_chase(rx_codewords, np.abs(received), corrector), code.n)
+        assert chase < 0.7 * hard, f"({code.n}, {code.k}) {corrector_name} at {ebn0_db} dB, FER {chase} against {hard}"
+        print(f"({code.n}, {code.k}) {corrector_name} at Eb/N0 = {ebn0_db} dB: FER {hard:.4f}, with Chase-II {chase:.4f}")
+
+    # Noiseless words pass unchanged
+    assert np.array_equal(code.corrector_chase(tx_codewords, np.ones(len(tx_codewords)), corrector), tx_codewords), f"({code.n}, {code.k}) codewords"
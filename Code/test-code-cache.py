@@ -0,0 +1,44 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import os
+import tempfile
+
+import channel
+from Utils import code_cache
+
+
+os.environ['EEC269A_CACHE_DIR'] = tempfile.mkdtemp()
+cache_dir = os.environ['EEC269A_CACHE_DIR']
+
+
+# Cache writes turned off by the constructor or the environment keep the code in memory only
+channel.Cyclic_Code(7, 4, write_cache=False)
+assert os.listdir(cache_dir) == [], f"cache files {os.listdir(cache_dir)} with write_cache=False"
+os.environ['EEC269A_CACHE_WRITE'] = '0'
+channel.Cyclic_Code(15, 11)
+assert os.listdir(cache_dir) == [], f"cache files {os.listdir(cache_dir)} with EEC269A_CACHE_WRITE=0"
+assert code_cache.load(15, 11, 1) is not None, "(15, 11) code not kept in memory"
+del os.environ['EEC269A_CACHE_WRITE']
+print("Cache writes turned off: no cache file written")
+
+
+# A written code is read back by another process' cache
+code = channel.Cyclic_Code(15, 7, None)
+code_cache._memory.clear()
+assert code_cache.load(15, 7, None)['genPoly'] == code.genPoly, "(15, 7) code not read back from the cache file"
+print(f"(15, 7) code written to {code_cache.cache_path()} and read back")
+
+
+# A failed write leaves the cache file as it was and no temporary file behind
+with open(code_cache.cache_path()) as file:
+    content = file.read()
+try:
+    code_cache.store(31, 26, 1, {'G_dec': object()})
+except TypeError:
+    pass
+else:
+    assert False, "storing an entry that is not JSON did not raise"
+assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')], f"temporary files left in {os.listdir(cache_dir)}"
+with open(code_cache.cache_path()) as file:
+    assert file.read() == content, "cache file changed by a failed write"
+print("Failed cache write: no temporary file left behind")
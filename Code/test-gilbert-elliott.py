@@ -0,0 +1,42 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+import numpy as np
+
+
+tx_bits = np.zeros(1 << 22, dtype=np.uint8)
+
+
+# With p_g = 0 and p_b = 1 every bit in the bad state is flipped, so the errors show the state sequence
+for p_gb, p_bg in [(0.01, 0.1), (0.001, 0.2), (0.2, 0.3)]:
+    bad = channel.Channel(1).gilbert_elliott_channel(tx_bits, p_gb, p_bg, 0.0, 1.0).astype(bool)
+
+    # Stationary fraction of the bits in the bad state
+    expected = p_gb / (p_gb + p_bg)
+    assert abs(bad.mean() - expected) < 0.05 * expected, f"{p_gb, p_bg} bad state fraction {bad.mean()}"
+
+    # Runs are geometric, the mean run of a state is 1 / (probability of leaving it); the first and last runs are cut by the stream
+    edges = np.flatnonzero(np.diff(bad.astype(np.int8))) + 1
+    runs = np.diff(edges)
+    run_bad = bad[edges[:-1]]
+    for state, p_leave in [(True, p_bg), (False, p_gb)]:
+        mean = runs[run_bad == state].mean()
+        assert abs(mean * p_leave - 1) < 0.05, f"{p_gb, p_bg} mean {'bad' if state else 'good'} run {mean}"
+    print(f"p_gb = {p_gb}, p_bg = {p_bg}: bad state fraction {bad.mean():.4f} (expected {expected:.4f}), "
+          f"mean bad run {runs[run_bad].mean():.1f}, mean good run {runs[~run_bad].mean():.1f}")
+
+
+# The error rate is the average of the error probabilities of both states, weighted by the stationary distribution
+p_gb, p_bg, p_g, p_b = 0.01, 0.1, 0.001, 0.3
+rx_bits = channel.Channel(2).gilbert_elliott_channel(tx_bits, p_gb, p_bg, p_g, p_b)
+expected = (p_bg * p_g + p_gb * p_b) / (p_gb + p_bg)
+assert abs(rx_bits.mean() - expected) < 0.05 * expected, f"error rate {rx_bits.mean()}"
+print(f"Error rate {rx_bits.mean():.5f} (expected {expected:.5f})")
+
+
+# Empty input gives empty output
+chl = channel.Channel(3)
+assert chl.gilbert_elliott_channel(np.zeros(0, dtype=np.uint8), 0.01, 0.1).shape == (0,), "empty input"
+assert chl.gilbert_elliott_channel(np.zeros((0, 7), dtype=np.uint8), 0.01, 0.1).shape == (0, 7), "empty 2D input"
+print("Empty input gives empty output")
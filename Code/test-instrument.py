@@ -0,0 +1,34 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+from Utils import instrument
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+code = channel.BCH_Code(15, 2)
+tx_codewords = code.encoder_systematic(rng.integers(0, 2, 2000 * code.k, dtype=np.uint8))
+rx_codewords = channel.Channel(0).binary_symmetric_channel(tx_codewords, 0.1)
+nonzero_syndromes = np.count_nonzero(np.any((rx_codewords.reshape(-1, code.n) @ code.HT) % 2, axis=1))
+
+
+# Words with a nonzero syndrome are either corrected or uncorrectable, lookup only corrects those with a coset leader
+for corrector in ['syndrome_lookup', 'trapping', 'meggitt', 'bch']:
+    instrument.enable(corrector)
+    estimated = getattr(code, 'corrector_' + corrector)(rx_codewords)
+    counters = instrument.report()['counters']
+    instrument.disable()
+    corrected, uncorrectable = counters[f'corrector_{corrector}.corrected_words'], counters[f'corrector_{corrector}.uncorrectable_words']
+    assert counters[f'corrector_{corrector}.words'] == len(rx_codewords) // code.n, f"{corrector} words"
+    assert corrected + uncorrectable == nonzero_syndromes, f"{corrector}: {corrected} + {uncorrectable} words, {nonzero_syndromes} nonzero syndromes"
+    assert uncorrectable > 0, f"{corrector}: no uncorrectable words at p = 0.1"
+    print(f"(15, 7) corrector_{corrector}: {corrected} corrected, {uncorrectable} uncorrectable of {nonzero_syndromes} words in error")
+
+
+# Disabled, the correctors count nothing
+for corrector in ['syndrome_lookup', 'trapping', 'meggitt', 'bch']:
+    getattr(code, 'corrector_' + corrector)(rx_codewords)
+    assert instrument.report() is None, f"{corrector} counted while disabled"
+print("Correctors count nothing while instrumentation is disabled")
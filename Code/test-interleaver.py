@@ -0,0 +1,55 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import interleaver
+import stream
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+
+def random_chunks(bits, sizes):
+    """
+    Split the bits at random points, chunk lengths drawn from sizes
+    """
+    cuts = np.cumsum(rng.choice(sizes, len(bits)))
+    return np.split(bits, cuts[cuts < len(bits)])
+
+
+# Block interleaver: whole blocks and a shortened last block come back unchanged
+for rows, columns in [(15, 64), (7, 3), (1, 5), (5, 1)]:
+    block = interleaver.Block_Interleaver(rows, columns)
+    for length in [0, block.size, 10 * block.size, 10 * block.size + 1, 10 * block.size + block.size - 1]:
+        bits = rng.integers(0, 2, length, dtype=np.uint8)
+        interleaved = block.interleave(bits)
+        assert np.array_equal(block.deinterleave(interleaved), bits), f"({rows} x {columns}) block round trip of {length} bits"
+
+    # Bits adjacent on the channel within a column are columns bits apart in the stream
+    order = block.interleave(np.arange(block.size)).reshape(columns, rows)
+    assert np.all(np.diff(order, axis=1) == columns), f"({rows} x {columns}) spread"
+    print(f"({rows} x {columns}) block interleaver: round trips")
+
+
+# Convolutional interleaver: chunks of any length give the output of one call, the round trip delays the stream by delay bits
+for branches, depth in [(15, 4), (7, 1), (1, 3), (4, 0)]:
+    bits = rng.integers(0, 2, 20000, dtype=np.uint8)
+    convolutional = interleaver.Convolutional_Interleaver(branches, depth)
+    interleaved = convolutional.interleave(bits)
+    convolutional.reset()
+    chunked = np.concatenate([convolutional.interleave(chunk) for chunk in random_chunks(bits, [0, 1, 7, 100, 5000])])
+    assert np.array_equal(chunked, interleaved), f"({branches}, {depth}) chunked interleave"
+
+    deinterleaved = np.concatenate([convolutional.deinterleave(chunk) for chunk in random_chunks(interleaved, [1, 13, 3000])])
+    delay = convolutional.delay
+    assert np.array_equal(deinterleaved[delay:], bits[:len(bits) - delay]), f"({branches}, {depth}) convolutional round trip"
+    print(f"({branches}, {depth}) convolutional interleaver: round trips with a delay of {delay} bits")
+
+
+# Streams of codeword blocks through either interleaver come back as the same codewords
+n = 15
+for stage in [interleaver.Block_Interleaver(n, 64), interleaver.Convolutional_Interleaver(15, 4)]:
+    blocks = [(rng.integers(0, 2, n * size, dtype=np.uint8), 0) for size in [64, 128, 64, 37]]
+    received = list(stream.deinterleave_blocks(stage, stream.interleave_blocks(stage, blocks), n))
+    assert np.array_equal(np.concatenate([bits for bits, _ in received]), np.concatenate([bits for bits, _ in blocks])), f"{type(stage).__name__} stream round trip"
+    print(f"{type(stage).__name__}: stream of {len(blocks)} blocks round trips")
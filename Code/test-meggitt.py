@@ -0,0 +1,34 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+# Codes correcting 1, 2 and 3 errors
+codes = [channel.Cyclic_Code(7, 4), channel.Cyclic_Code(15, 11), channel.Cyclic_Code(15, 7, None),
+         channel.Cyclic_Code(23, 12, None), channel.BCH_Code(31, 3), channel.BCH_Code(63, 2)]
+
+
+# Every error pattern of weight up to t is corrected, each one added to a random codeword
+for code in codes:
+    for weight in range(1, code.nECC + 1):
+        for positions in channel.error_pattern_chunks(range(code.n), weight):
+            patterns = np.zeros((len(positions), code.n), dtype=np.uint8)
+            patterns[np.arange(len(positions))[:, None], positions] = 1
+            tx_codewords = code.encoder_systematic(rng.integers(0, 2, len(patterns) * code.k, dtype=np.uint8))
+            estimated = code.corrector_meggitt(tx_codewords ^ patterns.flatten())
+            assert np.array_equal(estimated, tx_codewords), f"({code.n}, {code.k}) corrector_meggitt, {weight} errors"
+    print(f"({code.n}, {code.k}) code: every pattern of up to {code.nECC} errors corrected")
+
+
+# Beyond t errors the Meggitt decoder corrects what the syndrome look-up array corrects
+for code in codes:
+    tx_codewords = code.encoder_systematic(rng.integers(0, 2, 5000 * code.k, dtype=np.uint8))
+    rx_codewords = channel.Channel(2).binary_symmetric_channel(tx_codewords, 0.1)
+    meggitt = np.all((code.corrector_meggitt(rx_codewords) == tx_codewords).reshape(-1, code.n), axis=1)
+    lookup = np.all((code.corrector_syndrome_lookup(rx_codewords) == tx_codewords).reshape(-1, code.n), axis=1)
+    assert np.array_equal(meggitt, lookup), f"({code.n}, {code.k}) corrected codewords"
+    print(f"({code.n}, {code.k}) code: {np.count_nonzero(meggitt)} of {len(meggitt)} noisy codewords corrected, as by the look-up array")
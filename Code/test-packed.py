@@ -0,0 +1,41 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+from Utils import bitpack as bp
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+# Codes of one and of several packed words per codeword
+codes = [channel.Linear_Code(), channel.Cyclic_Code(15, 7, None), channel.BCH_Code(63, 2), channel.BCH_Code(127, 2)]
+
+
+for code in codes:
+    tx_msg = rng.integers(0, 2, 1000 * code.k, dtype=np.uint8)
+    tx_codewords = code.encoder_systematic(tx_msg)
+
+    # Packing round trip
+    packed_msg = bp.pack_bits(tx_msg, code.k)
+    assert np.array_equal(bp.unpack_bits(packed_msg, code.k), tx_msg), f"({code.n}, {code.k}) pack_bits"
+
+    # Encoder and decoder
+    packed_codewords = code.encoder_systematic_packed(packed_msg)
+    assert np.array_equal(packed_codewords, bp.pack_bits(tx_codewords, code.n)), f"({code.n}, {code.k}) encoder_systematic_packed"
+    assert np.array_equal(code.decoder_systematic_packed(packed_codewords), packed_msg), f"({code.n}, {code.k}) decoder_systematic_packed"
+
+    # Channel, the same seed flips the same bits
+    rx_codewords = channel.Channel(1).binary_symmetric_channel(tx_codewords, 0.02)
+    packed_rx = channel.Channel(1).binary_symmetric_channel_packed(packed_codewords, code.n, 0.02)
+    assert np.array_equal(packed_rx, bp.pack_bits(rx_codewords, code.n)), f"({code.n}, {code.k}) binary_symmetric_channel_packed"
+
+    # Syndromes and correctors
+    syndromes = (rx_codewords.reshape(-1, code.n) @ code.H.T) % 2
+    assert np.array_equal(code.syndrome_packed(packed_rx), channel.pack_syndromes(syndromes)), f"({code.n}, {code.k}) syndrome_packed"
+    estimated = code.corrector_syndrome_lookup(rx_codewords)
+    assert np.array_equal(code.corrector_syndrome_packed(packed_rx), bp.pack_bits(estimated, code.n)), f"({code.n}, {code.k}) corrector_syndrome_packed"
+    if isinstance(code, channel.Cyclic_Code):
+        estimated = code.corrector_trapping(rx_codewords)
+        assert np.array_equal(code.corrector_trapping_packed(packed_rx), bp.pack_bits(estimated, code.n)), f"({code.n}, {code.k}) corrector_trapping_packed"
+    print(f"({code.n}, {code.k}) code: packed encoder, decoder, channel and correctors match the unpacked ones")
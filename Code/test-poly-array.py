@@ -0,0 +1,36 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import random
+
+from Utils import polyTools as pt
+from Utils import polyArray as pa
+
+import numpy as np
+
+
+random.seed(0)
+
+# Random polynomials of every degree up to 31, so every product fits in 63 bits
+a = [random.getrandbits(random.randint(1, 32)) for _ in range(2000)]
+b = [random.getrandbits(random.randint(1, 32)) | 1 for _ in range(2000)]
+a_array, b_array = np.array(a, dtype=np.uint64), np.array(b, dtype=np.uint64)
+
+
+# The batched functions give the scalar results, elementwise
+assert pt.order(a_array).tolist() == [pt.order(p) for p in a], "order"
+assert pt.weight(a_array).tolist() == [pt.weight(p) for p in a], "weight"
+assert pt.bitRev(a_array, 40).tolist() == [pt.bitRev(p, 40) for p in a], "bitRev"
+assert pt.polyMul(a_array, b_array).tolist() == [pt.polyMul(p, q) for p, q in zip(a, b)], "polyMul"
+quotients, remainders = pt.polyDiv(a_array, b_array)
+assert list(zip(quotients.tolist(), remainders.tolist())) == [pt.polyDiv(p, q) for p, q in zip(a, b)], "polyDiv"
+assert pa.xPowMod(100, b_array[b_array > 1]).tolist() == [pt.polyDiv(1 << 100, q)[1] for q in b if q > 1], "xPowMod"
+print(f"polyArray matches polyTools on {len(a)} polynomial pairs")
+
+
+# Bit reversal of Python ints and numpy integer scalars
+for p, pOrder in [(0b1011, None), (0b1011, 5), (1, 0), (0, None), ((1 << 70) | 3, None)]:
+    expected = int(bin(p)[2:].zfill((pOrder or pt.order(p)) + 1)[::-1], 2)
+    assert pt.bitRev(p, pOrder) == expected, f"bitRev({p})"
+    if p < (1 << 63):
+        assert pt.bitRev(np.int64(p), pOrder) == expected, f"bitRev(np.int64({p}))"
+print("bitRev matches the reversed binary strings")
@@ -0,0 +1,23 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+
+# Every corrector of a code can be prepared, which builds its tables up front
+for code_type, arguments in [(channel.Cyclic_Code, (15, 7, None)), (channel.BCH_Code, (31, 3))]:
+    names = [name[len('corrector_'):] for name in dir(code_type) if name.startswith('corrector_')]
+    for name in names:
+        code = code_type(*arguments, correctors=[name])
+        built = {table for table in ['G', 'H', 'HT', 'syndrome_table', 'syndrome_array', 'packed_H', 'packed_syndrome_array',
+                                     'meggitt_table', 'syndrome_matrix'] if table in vars(code)}
+        assert set(code.CORRECTOR_TABLES[name]) <= built, f"{code_type.__name__} {name}: built {sorted(built)}"
+    print(f"{code_type.__name__}: every corrector prepared,", ', '.join(sorted(names)))
+
+
+# An unknown corrector is refused
+try:
+    channel.Cyclic_Code(15, 7, None, correctors=['unknown'])
+except ValueError:
+    print("Unknown corrector raises ValueError")
+else:
+    raise AssertionError("unknown corrector accepted")
@@ -0,0 +1,36 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+row_code = channel.Cyclic_Code(15, 5, None)
+product_codes = [channel.Product_Code(channel.Linear_Code(), channel.Linear_Code()),
+                 channel.Product_Code(channel.Cyclic_Code(15, 11), channel.Cyclic_Code(7, 4)),
+                 channel.Product_Code(row_code, channel.Cyclic_Code(3, 1))]
+
+
+# Every error pattern of weight up to nECC is corrected, each one added to a random codeword
+for code in product_codes:
+    for weight in range(1, code.nECC + 1):
+        for positions in channel.error_pattern_chunks(range(code.n), weight):
+            patterns = np.zeros((len(positions), code.n), dtype=np.uint8)
+            patterns[np.arange(len(positions))[:, None], positions] = 1
+            tx_codewords = code.encoder_systematic(rng.integers(0, 2, len(patterns) * code.k, dtype=np.uint8))
+            estimated = code.corrector_iterative(tx_codewords ^ patterns.flatten())
+            assert np.array_equal(estimated, tx_codewords), f"({code.n}, {code.k}) product code, {weight} errors"
+    print(f"({code.n}, {code.k}) product code: every pattern of up to {code.nECC} errors corrected")
+
+
+# Error trapping of the (15, 5) code misses 3 errors spread evenly over a row, so it lowers nECC of the product code.
+# Two such rows are 6 errors: left by the trapping rows, they outvote the (3, 1) columns; meggitt rows correct them.
+trapping, meggitt = product_codes[2], channel.Product_Code(row_code, channel.Cyclic_Code(3, 1), row_code.corrector_meggitt)
+assert (trapping.nECC, meggitt.nECC) == (5, 7), f"nECC {trapping.nECC} with trapping rows, {meggitt.nECC} with meggitt rows"
+pattern = np.zeros((3, 15), dtype=np.uint8)
+pattern[:2, [0, 5, 10]] = 1
+assert np.any(trapping.corrector_iterative(pattern.flatten())), "6 errors corrected with trapping rows"
+assert not np.any(meggitt.corrector_iterative(pattern.flatten())), "6 errors not corrected with meggitt rows"
+print(f"(15, 5) x (3, 1) product code: nECC {trapping.nECC} with trapping rows, {meggitt.nECC} with meggitt rows")
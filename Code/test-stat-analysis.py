@@ -0,0 +1,69 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+from Utils import stat_analysis
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+n = 15
+original = rng.integers(0, 2, 1000 * n + 7, dtype=np.uint8)
+corrupted = original ^ (rng.random(len(original)) < 0.05).astype(np.uint8)
+errors = original != corrupted
+
+
+def reference_histogram(errors, n):
+    """
+    Error weight histogram of every block of n bits, the last one shortened
+    """
+    weights = [np.count_nonzero(errors[start:start + n]) for start in range(0, len(errors), n)]
+    return np.bincount(weights, minlength=n + 1)
+
+
+# One pass over the whole stream
+whole = stat_analysis.Error_Statistics(n).update(original, corrupted).flush()
+assert np.array_equal(whole.histogram, reference_histogram(errors, n)), "histogram"
+assert whole.bits == len(original) and whole.bit_errors == np.count_nonzero(errors), "bit counts"
+assert whole.blocks == 1001, "blocks, the last one shortened"
+assert whole.block_errors == whole.blocks - reference_histogram(errors, n)[0], "block errors"
+assert whole.num_blocks_with_more_errors(1) == reference_histogram(errors, n)[2:].sum(), "blocks with more than 1 error"
+print(f"Whole stream: {whole.bits} bits, {whole.bit_errors} bit errors, {whole.block_errors} of {whole.blocks} blocks in error")
+
+
+# Chunks that end inside a block carry their last bits into the next update
+chunked = stat_analysis.Error_Statistics(n)
+cuts = np.sort(rng.choice(len(original), 50, replace=False))
+for original_chunk, corrupted_chunk in zip(np.split(original, cuts), np.split(corrupted, cuts)):
+    chunked.update(original_chunk, corrupted_chunk)
+chunked.flush()
+assert np.array_equal(chunked.histogram, whole.histogram), "chunked histogram"
+assert (chunked.bits, chunked.bit_errors) == (whole.bits, whole.bit_errors), "chunked bit counts"
+print("Chunks cut inside blocks give the counts of the whole stream")
+
+
+# Rows of a 2D array are counted bit by bit, not row by row
+matrix = stat_analysis.Error_Statistics(8).update(np.zeros((4, 8), dtype=np.uint8), np.eye(4, 8, dtype=np.uint8) * (np.arange(4) == 0)[:, None]).flush()
+assert (matrix.bits, matrix.bit_errors, matrix.blocks, matrix.block_errors) == (32, 1, 4, 1), "2D input"
+assert matrix.bit_error_rate() == 1 / 32, "2D bit error rate"
+print("A 4 x 8 array with one error gives a bit error rate of 1/32")
+
+
+# Workers that each count whole blocks merge into the counts of the whole stream
+merged = stat_analysis.Error_Statistics(n)
+bounds = [0, 300 * n, 301 * n, 700 * n, len(original)]
+for start, end in zip(bounds[:-1], bounds[1:]):
+    merged.merge(stat_analysis.Error_Statistics(n).update(original[start:end], corrupted[start:end]).flush())
+assert np.array_equal(merged.histogram, whole.histogram), "merged histogram"
+assert (merged.bits, merged.bit_errors) == (whole.bits, whole.bit_errors), "merged bit counts"
+print("Workers merged on block boundaries give the counts of the whole stream")
+
+
+# Merging an unfinished block or another block length is refused
+for other in [stat_analysis.Error_Statistics(n).update(original[:n + 1], corrupted[:n + 1]), stat_analysis.Error_Statistics(n + 1)]:
+    try:
+        stat_analysis.Error_Statistics(n).merge(other)
+    except ValueError:
+        continue
+    raise AssertionError("merge accepted an unfinished block or another block length")
+print("Merging an unfinished block or another block length raises ValueError")
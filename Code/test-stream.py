@@ -0,0 +1,35 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+import interleaver
+import stream
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+# Source blocks of uneven lengths, some empty, so the message blocks are regrouped across them
+source_blocks = [rng.integers(0, 2, length, dtype=np.uint8) for length in [0, 1, 1000, 8, 0, 12345, 3, 50000]]
+tx_bits = np.concatenate(source_blocks)
+
+
+# At p = 0 the pipeline gives back the source bits exactly, whatever the code, block size, corrector and interleaver
+cyclic_code = channel.Cyclic_Code(15, 7, None)
+bch_code = channel.BCH_Code(31, 2)
+for code, corrector, block_codewords, stage in [(channel.Linear_Code(), None, 64, None),
+                                               (channel.Linear_Code(), channel.Linear_Code().corrector_syndrome_lookup, 1, None),
+                                               (cyclic_code, cyclic_code.corrector_trapping, 100, None),
+                                               (cyclic_code, cyclic_code.corrector_meggitt, 64, interleaver.Block_Interleaver(15, 64)),
+                                               (bch_code, bch_code.corrector_bch, 1000, interleaver.Convolutional_Interleaver(31, 2)),
+                                               (bch_code, None, stream.BLOCK_CODEWORDS, None)]:
+    received = list(stream.pipeline(iter(source_blocks), code, channel.Channel(0), 0.0, corrector, block_codewords, stage))
+    assert np.array_equal(np.concatenate(received), tx_bits), f"({code.n}, {code.k}) pipeline, {block_codewords} codewords per block"
+    assert all(len(bits) <= block_codewords * code.k for bits in received), f"({code.n}, {code.k}) block size"
+    print(f"({code.n}, {code.k}) code, {block_codewords} codewords per block, {type(stage).__name__ if stage else 'no interleaver'}: "
+          f"{len(tx_bits)} bits round trip in {len(received)} blocks")
+
+
+# Empty sources give no blocks
+assert list(stream.pipeline(iter([]), cyclic_code, channel.Channel(0), 0.0)) == [], "empty source"
+print("Empty source gives no blocks")
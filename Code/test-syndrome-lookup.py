@@ -0,0 +1,32 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+# Codes correcting 1, 2 and 3 errors
+codes = [channel.Linear_Code(), channel.Cyclic_Code(15, 11), channel.Cyclic_Code(15, 7, None),
+         channel.Cyclic_Code(23, 12, None), channel.BCH_Code(31, 3), channel.BCH_Code(63, 2)]
+
+
+# Every error pattern of weight up to t is corrected, each one added to a random codeword
+for code in codes:
+    for weight in range(1, code.nECC + 1):
+        for positions in channel.error_pattern_chunks(range(code.n), weight):
+            patterns = np.zeros((len(positions), code.n), dtype=np.uint8)
+            patterns[np.arange(len(positions))[:, None], positions] = 1
+            tx_codewords = code.encoder_systematic(rng.integers(0, 2, len(patterns) * code.k, dtype=np.uint8))
+            estimated = code.corrector_syndrome_lookup(tx_codewords ^ patterns.flatten())
+            assert np.array_equal(estimated, tx_codewords), f"({code.n}, {code.k}) corrector_syndrome_lookup, {weight} errors"
+    print(f"({code.n}, {code.k}) code: every pattern of up to {code.nECC} errors corrected")
+
+
+# Every non-zero coset leader has the syndrome of its index and at most nECC errors
+for code in codes:
+    leaders = code.syndrome_array
+    assert np.array_equal(channel.pack_syndromes((leaders @ code.H.T) % 2)[leaders.any(axis=1)], np.flatnonzero(leaders.any(axis=1))), f"({code.n}, {code.k}) leader syndromes"
+    assert leaders.sum(axis=1).max() <= code.nECC, f"({code.n}, {code.k}) leader weights"
+    print(f"({code.n}, {code.k}) code: {np.count_nonzero(leaders.any(axis=1))} coset leaders of up to {code.nECC} errors")
@@ -0,0 +1,21 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import channel
+
+import numpy as np
+
+
+rng = np.random.default_rng(0)
+
+# Codes whose trapping corrector is complete up to nECC and codes where it misses some patterns
+codes = [channel.Cyclic_Code(7, 4), channel.Cyclic_Code(15, 11), channel.Cyclic_Code(15, 7, None),
+         channel.Cyclic_Code(23, 12, None), channel.BCH_Code(31, 3)]
+
+
+# The batched trapping corrector gives the output of the codeword-by-codeword one, bit for bit
+for code in codes:
+    tx_codewords = code.encoder_systematic(rng.integers(0, 2, 2000 * code.k, dtype=np.uint8))
+    for p in [0.01, 0.05, 0.2]:
+        rx_codewords = channel.Channel(1).binary_symmetric_channel(tx_codewords, p)
+        assert np.array_equal(code.corrector_trapping(rx_codewords), code.corrector_trapping_old(rx_codewords)), f"({code.n}, {code.k}) p = {p}"
+    print(f"({code.n}, {code.k}) code: corrector_trapping matches corrector_trapping_old")
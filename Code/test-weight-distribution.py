@@ -0,0 +1,42 @@
+# Copyright (c) 2023 Chenye Yang, Pranav Kharche
+
+import itertools
+
+from Utils import polyTools as pt
+
+
+def brute_force_weights(n, k, genMatrix):
+    """
+    Weight distribution from the XOR of the generator rows of every message
+    """
+    weights = [0] * (n + 1)
+    for message in itertools.product((0, 1), repeat=k):
+        codeword = 0
+        for bit, row in zip(message, genMatrix):
+            if bit:
+                codeword ^= row
+        weights[pt.weight(codeword)] += 1
+    return weights
+
+
+# Codes with a larger dual (n-k >= k) are enumerated directly, the others through the MacWilliams identity
+for n, k in [(7, 4), (15, 5), (15, 7), (15, 11), (21, 9), (23, 12), (31, 16), (31, 21)]:
+    genMatrix = pt.buildGenMatrix(n, k, pt.findGen(n, k))
+    weights = pt.weightDistribution(n, k, genMatrix)
+    assert weights == brute_force_weights(n, k, genMatrix), f"({n}, {k}) weightDistribution"
+    d_min = next(w for w in range(1, n + 1) if weights[w])
+    assert pt.minimumWeight(n, k, genMatrix) == d_min, f"({n}, {k}) minimumWeight"
+    assert pt.minimumDistance(n, k, genMatrix) == d_min, f"({n}, {k}) minimumDistance"
+    print(f"({n}, {k}) code: weight distribution matches brute force, d_min = {d_min}")
+
+
+
+# Codes whose minimum weight the search by message weight finds within the budget of a full enumeration
+for n, k in [(63, 45), (63, 39), (63, 27)]:
+    genMatrix = pt.buildGenMatrix(n, k, next(iter(pt.findGenerators(n, k))))
+    G = pt.genMatrixDecmial2Ndarray(genMatrix, n)
+    d_min = pt._lightestCodeword(G, 1 << min(k, n - k))
+    assert d_min is not None, f"({n}, {k}) search by message weight over budget"
+    weights = pt.weightDistribution(n, k, genMatrix)
+    assert d_min == next(w for w in range(1, n + 1) if weights[w]) == pt.minimumWeight(n, k, genMatrix), f"({n}, {k}) minimumWeight"
+    print(f"({n}, {k}) code: search by message weight matches the weight distribution, d_min = {d_min}")